@@ -0,0 +1,3 @@
+"""
+Backend del database con pool delle connessioni (vedi ``api_collaborativa.db.connessioni``).
+"""
@@ -0,0 +1,252 @@
+"""
+Pool delle connessioni al database, condiviso dai thread del processo.
+
+Con ``CONN_MAX_AGE = 0`` Django apre una connessione per ogni richiesta e la chiude al
+termine. I backend di ``api_collaborativa.db`` (es. ``api_collaborativa.db.postgresql``)
+usano invece `PoolMixin`: la connessione "chiusa" da Django torna nel pool del database
+e la richiesta successiva, di qualsiasi thread, la riusa senza ripetere la connessione.
+Il pool si configura con la chiave ``POOL`` del database::
+
+    'POOL': {'DIMENSIONE': 20, 'ATTESA': 10, 'DURATA': 300}
+
+- ``DIMENSIONE``: connessioni aperte al massimo (in uso o libere); ``0`` disattiva il pool.
+  Una richiesta che non trova connessioni libere attende che un'altra la restituisca,
+  per al massimo ``ATTESA`` secondi, poi fallisce con ``OperationalError``.
+- ``DURATA``: secondi dopo i quali una connessione viene chiusa e sostituita.
+- Al prelievo una connessione libera viene verificata (``SELECT 1``): se il server l'ha
+  chiusa viene scartata e sostituita da una nuova.
+
+Con ``CONN_MAX_AGE > 0`` la connessione resta assegnata al thread tra una richiesta e
+l'altra, come in Django, e torna nel pool solo quando Django la chiude.
+"""
+import logging
+import threading
+import time
+import weakref
+from functools import partial
+
+_lock = threading.Lock()
+_pool = {}
+
+
+class Pool:
+    """Connessioni libere di un database, con il conteggio di quelle aperte"""
+
+    def __init__(self, parametri, dimensione, attesa, durata):
+        self.parametri = parametri
+        self.dimensione = dimensione
+        self.attesa = attesa
+        self.durata = durata
+        self._condizione = threading.Condition()
+        # Coppie (connessione, creata_il); le ultime restituite sono le prime riusate
+        self._libere = []
+        self._aperte = 0
+        self._chiuso = False
+        self._metriche = {
+            'prelievi': 0, 'attese': 0, 'attesa_totale_ms': 0.0, 'attesa_massima_ms': 0.0,
+            'scaduti': 0, 'riusate': 0, 'create': 0, 'chiuse': 0, 'riciclate': 0, 'scartate': 0,
+        }
+
+    def _scaduta(self, creata_il):
+        return time.monotonic() - creata_il >= self.durata
+
+    def prendi(self, crea, verifica):
+        """
+        Preleva una connessione libera e valida o ne crea una nuova con `crea()`.
+        :return: coppia (connessione, creata_il) da restituire con `rilascia`
+        :raises TimeoutError: nessuna connessione disponibile entro `attesa` secondi
+        """
+        inizio = time.monotonic()
+        with self._condizione:
+            attesa = False
+            while not self._libere and self._aperte >= self.dimensione:
+                attesa = True
+                rimanente = inizio + self.attesa - time.monotonic()
+                if rimanente <= 0:
+                    self._metriche['scaduti'] += 1
+                    raise TimeoutError(f"Nessuna connessione al database libera entro {self.attesa} s "
+                                       f"({self.dimensione} aperte)")
+                self._condizione.wait(rimanente)
+            attesa_ms = (time.monotonic() - inizio) * 1000
+            self._metriche['prelievi'] += 1
+            self._metriche['attese'] += attesa
+            self._metriche['attesa_totale_ms'] += attesa_ms
+            self._metriche['attesa_massima_ms'] = max(self._metriche['attesa_massima_ms'], attesa_ms)
+            voce = self._libere.pop() if self._libere else None
+            if voce is None:
+                self._aperte += 1
+
+        if voce is not None:
+            connessione, creata_il = voce
+            if self._scaduta(creata_il):
+                motivo = 'riciclate'
+            elif not verifica(connessione):
+                motivo = 'scartate'
+                logging.warning("Connessione al database non valida al prelievo, ne apro una nuova")
+            else:
+                with self._condizione:
+                    self._metriche['riusate'] += 1
+                return voce
+            # La nuova connessione prende il posto di quella chiusa
+            self._chiudi(connessione, motivo)
+
+        try:
+            connessione = crea()
+        except Exception:
+            with self._condizione:
+                self._aperte -= 1
+                self._condizione.notify()
+            raise
+        with self._condizione:
+            self._metriche['create'] += 1
+        return connessione, time.monotonic()
+
+    def rilascia(self, connessione, creata_il, riusabile=True):
+        """Restituisce al pool una connessione di `prendi`; se non è riusabile la chiude"""
+        scaduta = self._scaduta(creata_il)
+        with self._condizione:
+            if riusabile and not scaduta and not self._chiuso:
+                self._libere.append((connessione, creata_il))
+                self._condizione.notify()
+                return
+            self._aperte -= 1
+            self._condizione.notify()
+        self._chiudi(connessione, 'riciclate' if scaduta else None)
+
+    def svuota(self):
+        """Chiude le connessioni libere; quelle in uso restano valide"""
+        with self._condizione:
+            libere, self._libere = self._libere, []
+            self._aperte -= len(libere)
+            self._condizione.notify_all()
+        for connessione, _ in libere:
+            self._chiudi(connessione)
+
+    def chiudi(self):
+        """Svuota il pool e chiude le connessioni in uso quando vengono restituite"""
+        with self._condizione:
+            self._chiuso = True
+        self.svuota()
+
+    def _chiudi(self, connessione, motivo=None):
+        try:
+            connessione.close()
+        except Exception as exc:
+            logging.warning(f"Errore nella chiusura di una connessione al database: {exc}")
+        with self._condizione:
+            self._metriche['chiuse'] += 1
+            if motivo:
+                self._metriche[motivo] += 1
+
+    def metriche(self):
+        """Stato del pool e contatori dall'avvio del processo, con le attese in millisecondi"""
+        with self._condizione:
+            metriche = dict(self._metriche)
+            prelievi = metriche['prelievi']
+            attesa_totale_ms = metriche.pop('attesa_totale_ms')
+            metriche['attesa_media_ms'] = round(attesa_totale_ms / prelievi, 2) if prelievi else None
+            metriche['attesa_massima_ms'] = round(metriche['attesa_massima_ms'], 2)
+            return {'dimensione': self.dimensione, 'aperte': self._aperte, 'libere': len(self._libere), **metriche}
+
+
+def pool_per(alias, settings_dict):
+    """
+    Pool del database `alias`, creato al primo uso; None se il pool è disattivato.
+    Se cambiano i parametri di connessione (es. il database di test) il pool precedente
+    viene chiuso e sostituito.
+    """
+    opzioni = settings_dict.get('POOL') or {}
+    dimensione = int(opzioni.get('DIMENSIONE', 0))
+    if dimensione <= 0:
+        return None
+    parametri = (
+        settings_dict['NAME'], settings_dict['HOST'], settings_dict['PORT'], settings_dict['USER'],
+        dimensione, float(opzioni.get('ATTESA', 10)), float(opzioni.get('DURATA', 300)),
+    )
+    precedente = None
+    with _lock:
+        pool = _pool.get(alias)
+        if pool is None or pool.parametri != parametri:
+            precedente = pool
+            pool = _pool[alias] = Pool(parametri, *parametri[-3:])
+    if precedente is not None:
+        precedente.chiudi()
+    return pool
+
+
+def svuota():
+    """Chiude le connessioni libere di tutti i pool (es. prima di eliminare un database)"""
+    with _lock:
+        pool = list(_pool.values())
+    for p in pool:
+        p.svuota()
+
+
+def metriche():
+    """Metriche dei pool del processo, per alias del database"""
+    with _lock:
+        pool = dict(_pool)
+    return {alias: p.metriche() for alias, p in pool.items()}
+
+
+class PoolMixin:
+    """
+    Mixin del ``DatabaseWrapper`` di un backend Django: preleva le connessioni dal pool
+    del database e ve le restituisce alla chiusura (vedi modulo).
+    """
+    _pool = None
+    _creata_il = None
+    _finalizzatore = None
+
+    def get_new_connection(self, conn_params):
+        crea = partial(super().get_new_connection, conn_params)
+        pool = pool_per(self.alias, self.settings_dict)
+        # Un database SQLite in memoria esiste solo finché la sua connessione resta aperta
+        if pool is None or getattr(self, 'is_in_memory_db', lambda: False)():
+            self._pool = None
+            return crea()
+        try:
+            connessione, self._creata_il = pool.prendi(crea, self._verifica)
+        except TimeoutError as exc:
+            logging.error(str(exc))
+            raise self.Database.OperationalError(str(exc)) from exc
+        self._pool = pool
+        # Se il wrapper viene eliminato senza chiudere la connessione (es. alla fine di un
+        # thread fuori dalle richieste) la connessione viene chiusa e il suo posto liberato
+        self._finalizzatore = weakref.finalize(self, pool.rilascia, connessione, self._creata_il, False)
+        return connessione
+
+    def _verifica(self, connessione):
+        """Health check di una connessione libera, eseguito al prelievo"""
+        try:
+            cursore = connessione.cursor()
+            try:
+                cursore.execute('SELECT 1')
+            finally:
+                cursore.close()
+        except self.Database.Error:
+            return False
+        return True
+
+    def _close(self):
+        pool, self._pool = self._pool, None
+        if pool is None or self.connection is None:
+            return super()._close()
+        self._finalizzatore.detach()
+        # Chiusa dentro una transazione Django continua a riferire la connessione: non si riusa
+        riusabile = not self.in_atomic_block
+        if riusabile:
+            try:
+                # Annulla un'eventuale transazione lasciata aperta
+                self.connection.rollback()
+            except self.Database.Error:
+                riusabile = False
+        pool.rilascia(self.connection, self._creata_il, riusabile)
+
+
+class PoolCreationMixin:
+    """Mixin del ``DatabaseCreation``: le connessioni libere al database di test vengono chiuse prima di eliminarlo"""
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        svuota()
+        return super()._destroy_test_db(test_database_name, verbosity)
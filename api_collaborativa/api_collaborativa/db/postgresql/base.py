@@ -0,0 +1,14 @@
+"""
+Backend PostgreSQL di Django con il pool delle connessioni.
+"""
+from django.db.backends.postgresql import base, creation
+
+from ..connessioni import PoolCreationMixin, PoolMixin
+
+
+class DatabaseCreation(PoolCreationMixin, creation.DatabaseCreation):
+    pass
+
+
+class DatabaseWrapper(PoolMixin, base.DatabaseWrapper):
+    creation_class = DatabaseCreation
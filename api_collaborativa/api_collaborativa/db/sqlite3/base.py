@@ -0,0 +1,14 @@
+"""
+Backend SQLite di Django con il pool delle connessioni, per lo sviluppo locale e i test.
+"""
+from django.db.backends.sqlite3 import base, creation
+
+from ..connessioni import PoolCreationMixin, PoolMixin
+
+
+class DatabaseCreation(PoolCreationMixin, creation.DatabaseCreation):
+    pass
+
+
+class DatabaseWrapper(PoolMixin, base.DatabaseWrapper):
+    creation_class = DatabaseCreation
@@ -90,15 +90,127 @@ WSGI_APPLICATION = 'api_collaborativa.wsgi.application'
 #Database PostgreSQL
 DATABASES = {
    'default': {
-       'ENGINE': 'django.db.backends.postgresql',
+       # Backend PostgreSQL con il pool delle connessioni (vedi api_collaborativa.db.connessioni)
+       'ENGINE': 'api_collaborativa.db.postgresql',
        'NAME': os.getenv('DB_NAME', 'collaborative_db'),
        'USER': os.getenv('DB_USER', 'postgres'),
        'PASSWORD': os.getenv('DB_PASSWORD', 'password'),
        'HOST': os.getenv('DB_HOST', 'localhost'),
        'PORT': os.getenv('DB_PORT', '5432'),
+       # Secondi in cui una connessione resta assegnata al thread dopo la richiesta
+       # (0: torna nel pool al termine di ogni richiesta)
+       'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0)),
+       # Verifica delle connessioni assegnate al thread prima di riusarle in una nuova richiesta
+       'CONN_HEALTH_CHECKS': True,
+       'POOL': {
+           # Connessioni aperte al massimo per processo (0 disattiva il pool)
+           'DIMENSIONE': int(os.getenv('DB_POOL_DIMENSIONE', 20)),
+           # Secondi di attesa massima di una connessione libera
+           'ATTESA': int(os.getenv('DB_POOL_ATTESA', 10)),
+           # Secondi dopo i quali una connessione viene chiusa e sostituita
+           'DURATA': int(os.getenv('DB_POOL_DURATA', 300)),
+       },
    }
 }
 
+# Repliche in sola lettura (es. "replica1,replica2:5433"), con le stesse credenziali di default:
+# le GET di progetti, task e profilo leggono da una replica (vedi progetti.repliche).
+# Nei test le repliche puntano al database di test di default.
+DATABASE_REPLICHE = []
+for numero, replica in enumerate(filter(None, os.getenv('DB_REPLICHE', '').split(',')), 1):
+    host, _, port = replica.strip().partition(':')
+    DATABASES[f'replica_{numero}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICHE.append(f'replica_{numero}')
+
+DATABASE_ROUTERS = ['progetti.repliche.ReplicaRouter']
+
+# Secondi in cui le letture di un utente restano su default dopo una sua scrittura; è
+# anche il ritardo massimo ammesso per le repliche: i dati letti da una replica entrano
+# nelle cache dei membri e delle risposte solo se non cambiati da almeno questi secondi
+REPLICA_STICKY_SECONDI = int(os.getenv('REPLICA_STICKY_SECONDI', 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# Utenti autenticati con JWT memorizzati per processo (vedi autenticazione.utenti):
+# durata in secondi (0 disabilita la cache) e numero massimo di utenti
+UTENTI_CACHE_TIMEOUT = int(os.getenv('UTENTI_CACHE_TIMEOUT', 60))
+UTENTI_CACHE_DIMENSIONE = int(os.getenv('UTENTI_CACHE_DIMENSIONE', 10000))
+
+# Risposte di lista progetti e statistiche memorizzate per utente (vedi progetti.risposte):
+# durata in secondi (0 disabilita la cache) e numero massimo di voci
+RISPOSTE_CACHE_TIMEOUT = int(os.getenv('RISPOSTE_CACHE_TIMEOUT', 300))
+RISPOSTE_CACHE_DIMENSIONE = int(os.getenv('RISPOSTE_CACHE_DIMENSIONE', 10000))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'utenti': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'utenti',
+        'TIMEOUT': UTENTI_CACHE_TIMEOUT,
+        'OPTIONS': {'MAX_ENTRIES': UTENTI_CACHE_DIMENSIONE},
+    },
+    'risposte': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'risposte',
+        'TIMEOUT': RISPOSTE_CACHE_TIMEOUT,
+        'OPTIONS': {'MAX_ENTRIES': RISPOSTE_CACHE_DIMENSIONE},
+    },
+}
+
+# Cache condivisa tra i processi del server (es. "redis://localhost:6379/0", richiede il
+# pacchetto redis), usata dalle notifiche degli eventi SSE (vedi progetti.eventi), dalle
+# versioni dei dati in cache (vedi progetti.versioni) e della blacklist dei token.
+# Senza valore è una cache locale del processo: il server deve avere un solo processo.
+CACHE_CONDIVISA_URL = os.getenv('CACHE_CONDIVISA_URL', '')
+CACHES['condivisa'] = {
+    'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+    'LOCATION': CACHE_CONDIVISA_URL,
+} if CACHE_CONDIVISA_URL else {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'condivisa',
+}
+
+# Durata (secondi) della cache dei membri di progetto condivisa tra request; 0 la disabilita.
+# Attiva di default solo con la cache condivisa, che propaga le invalidazioni ai processi
+MEMBERSHIP_CACHE_TIMEOUT = int(os.getenv('MEMBERSHIP_CACHE_TIMEOUT', 300 if CACHE_CONDIVISA_URL else 0))
+
+# Secondi di attesa massima di una richiesta per il calcolo condiviso con una richiesta
+# identica già in corso (vedi progetti.coalescenza); 0 disattiva la coalescenza
+COALESCENZA_ATTESA = float(os.getenv('COALESCENZA_ATTESA', 30))
+
+# Righe lette per blocco durante l'export in streaming dei task (NDJSON/CSV)
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
+# Flusso SSE degli eventi dei progetti: secondi tra due controlli della cache, tra due
+# keepalive (con verifica dell'appartenenza al progetto) e durata massima della connessione
+EVENTI_SSE_INTERVALLO = float(os.getenv('EVENTI_SSE_INTERVALLO', 1))
+EVENTI_SSE_KEEPALIVE = int(os.getenv('EVENTI_SSE_KEEPALIVE', 15))
+EVENTI_SSE_DURATA = int(os.getenv('EVENTI_SSE_DURATA', 300))
+
+# Giorni di conservazione delle rimozioni (tombstone) della sincronizzazione incrementale:
+# un client fermo da più tempo deve eseguire una sincronizzazione completa
+RIMOZIONI_GIORNI = int(os.getenv('RIMOZIONI_GIORNI', 30))
+
+
+# Pool per l'hashing delle password (vedi autenticazione.hashing): thread, operazioni
+# in corso o in attesa oltre le quali le request ricevono 503, attesa massima in secondi
+HASHING_WORKERS = int(os.getenv('HASHING_WORKERS', os.cpu_count() or 2))
+HASHING_CODA_MASSIMA = int(os.getenv('HASHING_CODA_MASSIMA', 4 * HASHING_WORKERS))
+HASHING_ATTESA_MASSIMA = float(os.getenv('HASHING_ATTESA_MASSIMA', 10))
+
+AUTHENTICATION_BACKENDS = [
+    'autenticazione.backends.HashingPoolBackend',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -121,12 +233,16 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'autenticazione.authentication.CachedUserJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
         #'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'progetti.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
@@ -138,8 +254,15 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_REFRESH_SERIALIZER': 'autenticazione.serializers.TokenRefreshSerializer',
 }
 
+# Filtro in memoria della blacklist dei refresh token (vedi autenticazione.blacklist):
+# secondi tra due ricostruzioni complete (0 disabilita il filtro) e token revocati previsti.
+# Attivo di default solo con la cache condivisa, che notifica le revoche agli altri processi
+BLACKLIST_FILTRO_DURATA = int(os.getenv('BLACKLIST_FILTRO_DURATA', 30 if CACHE_CONDIVISA_URL else 0))
+BLACKLIST_FILTRO_CAPACITA = int(os.getenv('BLACKLIST_FILTRO_CAPACITA', 100000))
+
 
 SWAGGER_SETTINGS = {
     'LOGIN_URL': None,
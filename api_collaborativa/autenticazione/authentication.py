@@ -0,0 +1,36 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from . import utenti
+
+
+class CachedUserJWTAuthentication(JWTAuthentication):
+    """
+    Autenticazione JWT che legge l'utente dalla cache degli utenti (vedi `autenticazione.utenti`)
+    invece di una query per request.
+
+    Con `CHECK_REVOKE_TOKEN` attivo serve l'hash della password, che non è in cache:
+    l'utente è letto dal database come in `JWTAuthentication`.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != 'id':
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        return self.verifica_utente(utenti.leggi(user_id))
+
+    @staticmethod
+    def verifica_utente(user):
+        """Stessi controlli di `JWTAuthentication.get_user` sull'utente letto"""
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
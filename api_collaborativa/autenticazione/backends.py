@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from . import hashing
+
+
+class HashingPoolBackend(ModelBackend):
+    """
+    `ModelBackend` che verifica la password nel pool limitato di `autenticazione.hashing`.
+    La lettura dell'utente resta nel thread della request.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Come ModelBackend: calcola comunque un hash per non rivelare dai tempi
+            # di risposta quali utenti esistono
+            hashing.cifra_password(password)
+            return None
+        if hashing.verifica_password(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
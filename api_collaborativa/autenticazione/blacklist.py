@@ -0,0 +1,156 @@
+"""
+Filtro in memoria dei refresh token revocati (blacklist di simplejwt).
+
+Ogni refresh e logout verifica che il token non sia nella blacklist, con una query su
+``BlacklistedToken``. Qui ogni processo mantiene un filtro di Bloom dei `jti` revocati
+e non ancora scaduti: se il `jti` non è nel filtro il token non è revocato e la query
+è evitata; altrimenti (revocato o falso positivo) decide il database.
+
+Il filtro è aggiornato:
+
+- a ogni revoca nel processo corrente, subito;
+- quando cambia la versione della blacklist nella cache ``condivisa`` (vedi
+  ``CACHE_CONDIVISA_URL``), rigenerata al commit di ogni revoca in qualsiasi processo:
+  sono letti solo i token revocati dopo l'ultimo letto;
+- da zero ogni ``BLACKLIST_FILTRO_DURATA`` secondi, scartando i token scaduti.
+
+Le letture dal database avvengono fuori dal lock del filtro: una ricostruzione non
+blocca le verifiche degli altri thread. Il filtro è attivo di default solo con
+``CACHE_CONDIVISA_URL``: con una cache locale al processo un altro processo del server
+accetterebbe un token revocato fino alla ricostruzione successiva.
+"""
+import hashlib
+import math
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+
+class FiltroBloom:
+    """Filtro di Bloom di stringhe: nessun falso negativo, falsi positivi con probabilità `errore`"""
+
+    def __init__(self, capacita, errore=0.01):
+        self.capacita = max(capacita, 1)
+        self.bit = math.ceil(-self.capacita * math.log(errore) / math.log(2) ** 2)
+        self.funzioni = max(1, round(self.bit / self.capacita * math.log(2)))
+        self.elementi = 0
+        self._bit = bytearray((self.bit + 7) // 8)
+
+    def _posizioni(self, valore):
+        # Doppio hashing: le k posizioni sono combinazioni lineari di due hash a 64 bit
+        digest = hashlib.blake2b(valore.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.bit for i in range(self.funzioni)]
+
+    def aggiungi(self, valore):
+        for posizione in self._posizioni(valore):
+            self._bit[posizione >> 3] |= 1 << (posizione & 7)
+        self.elementi += 1
+
+    def __contains__(self, valore):
+        return all(self._bit[p >> 3] & (1 << (p & 7)) for p in self._posizioni(valore))
+
+
+class _Stato:
+    """Filtro del processo, con l'ultimo token revocato letto e la versione della blacklist"""
+
+    def __init__(self, filtro, ultimo_id, versione):
+        self.filtro = filtro
+        self.ultimo_id = ultimo_id
+        self.versione = versione
+        self.creato = time.monotonic()
+
+
+_lock = threading.Lock()
+_stato = None
+
+
+def _cache():
+    return caches['condivisa']
+
+
+def _chiave_versione():
+    return 'autenticazione:blacklist:versione'
+
+
+def _versione():
+    """Versione corrente della blacklist; se assente dalla cache ne genera una nuova"""
+    cache = _cache()
+    versione = cache.get(_chiave_versione())
+    if versione is None:
+        cache.add(_chiave_versione(), uuid.uuid4().hex, None)
+        versione = cache.get(_chiave_versione())
+    return versione
+
+
+def _ricostruisci(versione):
+    """Filtro dei token revocati e non scaduti, dimensionato con margine per le revoche successive"""
+    revocati = list(
+        BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()).values_list('pk', 'token__jti')
+    )
+    filtro = FiltroBloom(max(settings.BLACKLIST_FILTRO_CAPACITA, 2 * len(revocati)))
+    for _, jti in revocati:
+        filtro.aggiungi(jti)
+    return _Stato(filtro, max((pk for pk, _ in revocati), default=0), versione)
+
+
+def _aggiorna(stato, versione):
+    """Aggiunge al filtro i token revocati dopo l'ultimo letto; la query è eseguita fuori dal lock"""
+    nuovi = list(BlacklistedToken.objects.filter(
+        pk__gt=stato.ultimo_id, token__expires_at__gt=timezone.now()
+    ).values_list('pk', 'token__jti'))
+    with _lock:
+        for pk, jti in nuovi:
+            stato.filtro.aggiungi(jti)
+            stato.ultimo_id = max(stato.ultimo_id, pk)
+        stato.versione = versione
+
+
+def _da_ricostruire(stato, durata):
+    return (stato is None or time.monotonic() - stato.creato > durata
+            or stato.filtro.elementi > stato.filtro.capacita)
+
+
+def forse_revocato(jti) -> bool:
+    """
+    False se il token non è certamente nella blacklist, True se va verificato sul database.
+    """
+    global _stato
+    durata = settings.BLACKLIST_FILTRO_DURATA
+    if not durata:
+        return True
+
+    versione = _versione()
+    with _lock:
+        stato = _stato
+    if not _da_ricostruire(stato, durata) and stato.versione != versione:
+        _aggiorna(stato, versione)
+    if _da_ricostruire(stato, durata):
+        # Ricostruito fuori dal lock; le revoche successive alla lettura cambiano la versione
+        stato = _ricostruisci(versione)
+        with _lock:
+            _stato = stato
+    with _lock:
+        return jti in stato.filtro
+
+
+def registra_revoca(jti):
+    """Aggiunge il token al filtro del processo e, al commit, notifica la revoca agli altri processi"""
+    with _lock:
+        if _stato is not None:
+            _stato.filtro.aggiungi(jti)
+    transaction.on_commit(lambda: _cache().set(_chiave_versione(), uuid.uuid4().hex, None))
+
+
+def azzera():
+    """Scarta il filtro del processo: sarà ricostruito alla prossima verifica"""
+    global _stato
+    with _lock:
+        _stato = None
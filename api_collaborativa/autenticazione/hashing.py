@@ -0,0 +1,139 @@
+"""
+Pool limitato di thread per l'hashing delle password (registrazione e login).
+
+PBKDF2 è volutamente costoso: eseguito nei worker delle request, un picco di login
+occupa tutta la CPU e rallenta ogni altro endpoint. Qui al più ``HASHING_WORKERS``
+hash sono calcolati insieme (`hashlib` rilascia il GIL) e al più ``HASHING_CODA_MASSIMA``
+operazioni possono essere in corso o in attesa: oltre questo limite, o dopo
+``HASHING_ATTESA_MASSIMA`` secondi, la request riceve subito 503 invece di accodarsi.
+
+Nel pool sono eseguiti solo i calcoli degli hash, senza accessi al database: letture e
+scritture restano nel thread della request e nella sua transazione.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingSovraccarico(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Troppe richieste di autenticazione in corso, riprovare tra poco.'
+    default_code = 'hashing_sovraccarico'
+
+
+_lock = threading.Lock()
+_pool = None
+_in_corso = 0
+_metriche = {
+    'eseguiti': 0,
+    'rifiutati': 0,
+    'scaduti': 0,
+    'picco_in_corso': 0,
+    'attesa_totale_ms': 0.0,
+    'durata_totale_ms': 0.0,
+}
+
+
+def _executor():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=settings.HASHING_WORKERS, thread_name_prefix='hashing')
+        return _pool
+
+
+def _completato(future):
+    global _in_corso
+    with _lock:
+        _in_corso -= 1
+
+
+def esegui(funzione, *args):
+    """
+    Esegue `funzione(*args)` nel pool e ne restituisce il risultato.
+    :raise HashingSovraccarico: se la coda è piena o l'attesa supera HASHING_ATTESA_MASSIMA
+    """
+    global _in_corso
+    with _lock:
+        if _in_corso >= settings.HASHING_CODA_MASSIMA:
+            _metriche['rifiutati'] += 1
+            logging.warning(f"Hashing rifiutato: {_in_corso} operazioni in corso")
+            raise HashingSovraccarico()
+        _in_corso += 1
+        _metriche['picco_in_corso'] = max(_metriche['picco_in_corso'], _in_corso)
+
+    accodato = time.perf_counter()
+    tempi = {}
+
+    def misurata():
+        tempi['inizio'] = time.perf_counter()
+        try:
+            return funzione(*args)
+        finally:
+            tempi['fine'] = time.perf_counter()
+
+    future = _executor().submit(misurata)
+    future.add_done_callback(_completato)
+    try:
+        risultato = future.result(timeout=settings.HASHING_ATTESA_MASSIMA)
+    except TimeoutError:
+        future.cancel()
+        with _lock:
+            _metriche['scaduti'] += 1
+        logging.warning("Hashing scaduto: attesa massima superata")
+        raise HashingSovraccarico()
+
+    with _lock:
+        _metriche['eseguiti'] += 1
+        _metriche['attesa_totale_ms'] += (tempi['inizio'] - accodato) * 1000
+        _metriche['durata_totale_ms'] += (tempi['fine'] - tempi['inizio']) * 1000
+    return risultato
+
+
+def metriche():
+    """Contatori del pool dall'avvio del processo, con attesa e durata medie in millisecondi"""
+    with _lock:
+        eseguiti = _metriche['eseguiti']
+        return {
+            'workers': settings.HASHING_WORKERS,
+            'coda_massima': settings.HASHING_CODA_MASSIMA,
+            'in_corso': _in_corso,
+            'picco_in_corso': _metriche['picco_in_corso'],
+            'eseguiti': eseguiti,
+            'rifiutati': _metriche['rifiutati'],
+            'scaduti': _metriche['scaduti'],
+            'attesa_media_ms': round(_metriche['attesa_totale_ms'] / eseguiti, 2) if eseguiti else None,
+            'durata_media_ms': round(_metriche['durata_totale_ms'] / eseguiti, 2) if eseguiti else None,
+        }
+
+
+def cifra_password(password):
+    """Hash della password calcolato nel pool (come `make_password`)"""
+    return esegui(make_password, password)
+
+
+def verifica_password(user, password):
+    """
+    Verifica la password nel pool (come `user.check_password`). Se l'hash memorizzato usa
+    un algoritmo o parametri superati viene ricalcolato e salvato, nel thread della request.
+    """
+    corretta = esegui(check_password, password, user.password)
+    if corretta and _da_aggiornare(user.password):
+        user.password = cifra_password(password)
+        user.save(update_fields=['password'])
+    return corretta
+
+
+def _da_aggiornare(encoded):
+    preferito = get_hasher('default')
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferito.algorithm or preferito.must_update(encoded)
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+
+class Command(BaseCommand):
+    """
+    Elimina i token JWT scaduti dalle tabelle della blacklist (OutstandingToken e, a cascata,
+    BlacklistedToken).
+
+    A differenza di `flushexpiredtokens` elimina a blocchi, ognuno nella propria transazione:
+    i lock durano poco e il comando interrotto riprende dal punto in cui si è fermato.
+    Un token scaduto è rifiutato comunque dalla verifica della firma: eliminarlo non riapre
+    l'accesso.
+    """
+
+    help = "Elimina a blocchi i token JWT scaduti da OutstandingToken e BlacklistedToken"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blocco', type=int, default=1000, help="Token eliminati per transazione")
+        parser.add_argument('--pausa', type=float, default=0, help="Secondi di pausa tra due blocchi")
+
+    def handle(self, *args, **options):
+        limite = timezone.now()
+        eliminati = 0
+        while True:
+            with transaction.atomic():
+                ids = list(
+                    OutstandingToken.objects.filter(expires_at__lte=limite)
+                    .order_by('expires_at').values_list('pk', flat=True)[:options['blocco']]
+                )
+                if not ids:
+                    break
+                OutstandingToken.objects.filter(pk__in=ids).delete()
+            eliminati += len(ids)
+            self.stdout.write(f"Token eliminati: {eliminati}")
+            if options['pausa']:
+                time.sleep(options['pausa'])
+
+        self.stdout.write(self.style.SUCCESS(f"Compattazione completata: {eliminati} token scaduti eliminati"))
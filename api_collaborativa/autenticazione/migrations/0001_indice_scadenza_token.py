@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Indice su `expires_at` dei token della blacklist di simplejwt, usato dal comando
+    `compatta_token` e dalla ricostruzione del filtro della blacklist.
+    """
+
+    dependencies = [
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS token_outstanding_scad_idx '
+            'ON token_blacklist_outstandingtoken (expires_at)',
+            'DROP INDEX IF EXISTS token_outstanding_scad_idx',
+        ),
+    ]
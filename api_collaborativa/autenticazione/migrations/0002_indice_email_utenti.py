@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Indice su `UPPER(email)` degli utenti: serve il controllo di unicità dell'email
+    senza distinzione tra maiuscole e minuscole (`email__iexact`) in registrazione e profilo.
+    """
+
+    dependencies = [
+        ('autenticazione', '0001_indice_scadenza_token'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS auth_user_email_upper_idx ON auth_user (UPPER(email))',
+            'DROP INDEX IF EXISTS auth_user_email_upper_idx',
+        ),
+    ]
@@ -1,6 +1,10 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt import serializers as jwt_serializers
+
+from . import hashing
+from .tokens import RefreshToken
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -34,17 +38,23 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return attrs
 
     def validate_email(self, value):
-        """Verifica che l'email non sia già in uso"""
-        if User.objects.filter(email=value).exists():
+        """Verifica che l'email non sia già in uso (senza distinzione tra maiuscole e minuscole)"""
+        if User.objects.filter(email__iexact=value).exists():
             raise serializers.ValidationError(
                 'Un utente con questa email esiste già'
             )
         return value
 
     def create(self, validated_data):
-        """Crea l'utente con password hashata"""
+        """Crea l'utente con password hashata (come `create_user`, con l'hash calcolato
+        nel pool di `autenticazione.hashing`)"""
         validated_data.pop('password_confirm')
-        user = User.objects.create_user(**validated_data)
+        password = validated_data.pop('password')
+        validated_data['username'] = User.normalize_username(validated_data['username'])
+        validated_data['email'] = User.objects.normalize_email(validated_data['email'])
+        user = User(**validated_data)
+        user.password = hashing.cifra_password(password)
+        user.save()
         return user
 
 
@@ -62,10 +72,17 @@ class UserProfileSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'username', 'date_joined', 'last_login']
 
     def validate_email(self, value):
-        """Verifica che l'email non sia già in uso da altri"""
+        """Verifica che l'email non sia già in uso da altri (senza distinzione tra maiuscole e minuscole)"""
         user = self.instance
-        if user and User.objects.filter(email=value).exclude(id=user.id).exists():
+        if user and User.objects.filter(email__iexact=value).exclude(id=user.id).exists():
             raise serializers.ValidationError(
                 'Un utente con questa email esiste già'
             )
-        return value
\ No newline at end of file
+        return value
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Refresh dei token JWT con il filtro in memoria della blacklist.
+    """
+    token_class = RefreshToken
@@ -0,0 +1,20 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from . import blacklist, utenti
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalida_utente(sender, instance, **kwargs):
+    """Ogni modifica o eliminazione dell'utente (es. disattivazione) rimuove la sua voce dalla cache"""
+    utenti.invalida(instance.pk)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def registra_token_revocato(sender, instance, created, **kwargs):
+    """Aggiorna il filtro in memoria della blacklist (vedi `autenticazione.blacklist`)"""
+    if created:
+        blacklist.registra_revoca(instance.token.jti)
@@ -0,0 +1,15 @@
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.settings import api_settings
+
+from . import blacklist
+
+
+class RefreshToken(tokens.RefreshToken):
+    """
+    Refresh token che interroga la blacklist nel database solo se il filtro in memoria
+    non esclude che sia revocato (vedi `autenticazione.blacklist`).
+    """
+
+    def check_blacklist(self):
+        if blacklist.forse_revocato(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
@@ -11,4 +11,5 @@ urlpatterns = [
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('profile/', views.profile, name='profile'),
+    path('metrics/', views.metrics, name='metrics'),
 ]
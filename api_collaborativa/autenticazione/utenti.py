@@ -0,0 +1,76 @@
+"""
+Cache degli utenti autenticati con JWT.
+
+Il token contiene solo l'ID dell'utente: senza cache ogni request autenticata legge
+la riga di ``auth_user``. Qui i campi pubblici dell'utente (``CAMPI``) sono memorizzati
+nella cache ``utenti`` (LocMemCache dedicata, limitata a ``UTENTI_CACHE_DIMENSIONE``
+utenti per processo) per ``UTENTI_CACHE_TIMEOUT`` secondi, e l'utente della request è
+ricostruito da questi valori senza query. La password resta un campo differito,
+letto solo se usato.
+
+La voce è invalidata dal salvataggio o dall'eliminazione dell'utente (vedi
+``autenticazione.signals``). Con una cache locale al processo gli altri processi
+vedono la modifica (es. disattivazione) entro la durata della cache; le modifiche
+con ``QuerySet.update`` non inviano segnali e attendono la scadenza.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+
+# Alias della cache in settings.CACHES
+ALIAS = 'utenti'
+
+# Campi memorizzati: tutti tranne l'hash della password
+CAMPI = (
+    'id', 'username', 'email', 'first_name', 'last_name',
+    'is_active', 'is_staff', 'is_superuser', 'last_login', 'date_joined',
+)
+
+
+def _timeout():
+    """Durata in secondi della cache; 0 o None la disabilita"""
+    return getattr(settings, 'UTENTI_CACHE_TIMEOUT', 60)
+
+
+def _chiave(user_id):
+    return f'autenticazione:utente:{user_id}'
+
+
+def _utente(valori):
+    """Utente ricostruito dai valori memorizzati, come se fosse letto con `only(*CAMPI)`"""
+    campi = [f.attname for f in User._meta.concrete_fields if f.attname in valori]
+    return User.from_db(User.objects.db, campi, [valori[campo] for campo in campi])
+
+
+def leggi(user_id):
+    """
+    Utente con l'ID indicato, dalla cache o in mancanza dal database.
+    :return: l'utente, oppure None se non esiste
+    """
+    timeout = _timeout()
+    valori = caches[ALIAS].get(_chiave(user_id)) if timeout else None
+    if valori is None:
+        valori = User.objects.filter(pk=user_id).values(*CAMPI).first()
+        if valori is None:
+            return None
+        if timeout:
+            caches[ALIAS].set(_chiave(user_id), valori, timeout)
+    return _utente(valori)
+
+
+async def aleggi(user_id):
+    """Versione asincrona di `leggi`"""
+    timeout = _timeout()
+    valori = await caches[ALIAS].aget(_chiave(user_id)) if timeout else None
+    if valori is None:
+        valori = await User.objects.filter(pk=user_id).values(*CAMPI).afirst()
+        if valori is None:
+            return None
+        if timeout:
+            await caches[ALIAS].aset(_chiave(user_id), valori, timeout)
+    return _utente(valori)
+
+
+def invalida(user_id):
+    """Rimuove l'utente dalla cache"""
+    caches[ALIAS].delete(_chiave(user_id))
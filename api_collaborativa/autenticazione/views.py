@@ -2,8 +2,12 @@
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from api_collaborativa.db import connessioni
+from progetti import coalescenza, risposte
+from progetti.repliche import legge_da_replica
+from . import hashing
 from .serializers import UserRegistrationSerializer, UserProfileSerializer
+from .tokens import RefreshToken
 import logging
 
 
@@ -79,13 +83,8 @@ def register(request):
     ## Note
     Dopo la registrazione, l'utente riceve automaticamente una coppia di token JWT (refresh e access).
     """
-    logging.info("Dati ricevuti:", request.data)  # Debug
-
     serializer = UserRegistrationSerializer(data=request.data)
 
-    logging.info("Serializer valido:", serializer.is_valid())  # Debug
-    logging.info("Errori serializer:", serializer.errors)  # Debug
-
     if serializer.is_valid():
         user = serializer.save()
 
@@ -108,6 +107,7 @@ def register(request):
         }, status=status.HTTP_201_CREATED)
 
     # Restituisce gli errori dettagliati
+    logging.info(f"Registrazione non valida: {serializer.errors}")
     return Response({
         'errors': serializer.errors,
         'received_data': request.data
@@ -164,6 +164,7 @@ def logout(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@legge_da_replica
 def profile(request):
     """
     Restituisce il profilo dell'utente autenticato.
@@ -195,3 +196,49 @@ def profile(request):
     serializer = UserProfileSerializer(request.user)
     return Response(serializer.data)
 
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def metrics(request):
+    """
+    Metriche del processo che risponde: pool di hashing delle password, cache delle
+    risposte dei progetti, coalescenza delle richieste concorrenti e pool delle connessioni
+    al database (per alias).
+
+    ## Metodo
+    GET
+
+    ## Autenticazione
+    Richiesta, solo amministratori (`is_staff`)
+
+    ## Risposte
+    - **200 OK**
+        ```json
+        {
+            "hashing": {
+                "workers": 4, "coda_massima": 16, "in_corso": 0, "picco_in_corso": 5,
+                "eseguiti": 120, "rifiutati": 3, "scaduti": 0,
+                "attesa_media_ms": 12.5, "durata_media_ms": 310.2
+            },
+            "risposte": {
+                "dimensione": 10000, "timeout": 300, "hit": 940, "miss": 60,
+                "invalidazioni": 25, "hit_ratio": 0.94
+            },
+            "coalescenza": {"eseguite": 60, "condivise": 140, "scadute": 0, "in_corso": 1},
+            "connessioni": {
+                "default": {
+                    "dimensione": 20, "aperte": 6, "libere": 4, "prelievi": 5200, "attese": 12,
+                    "scaduti": 0, "riusate": 5190, "create": 10, "chiuse": 4, "riciclate": 4,
+                    "scartate": 0, "attesa_media_ms": 0.03, "attesa_massima_ms": 41.7
+                }
+            }
+        }
+        ```
+    """
+    return Response({
+        'hashing': hashing.metriche(),
+        'risposte': risposte.metriche(),
+        'coalescenza': coalescenza.metriche(),
+        'connessioni': connessioni.metriche(),
+    })
@@ -7,6 +7,7 @@ class ProgettoAdmin(admin.ModelAdmin):
     search_fields = ('nome', 'descrizione')
     list_filter = ('data_creazione',)
     filter_horizontal = ('collaboratori',)
+    readonly_fields = ('conteggio_todo', 'conteggio_in_progress', 'conteggio_done')
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
@@ -0,0 +1,219 @@
+"""
+Analytics dei progetti (burndown, throughput e tempo di ciclo).
+
+Le transizioni di stato registrate in `TransizioneTask` sono aggregate in modo incrementale
+dal comando `rollup` in `SnapshotProgetto`, una riga per progetto e giorno con transizioni.
+Gli endpoint leggono solo gli snapshot: il costo dipende dal numero di giorni richiesti
+e non dal numero di task del progetto.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, OuterRef, Q, Subquery
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import CAMPI_CONTATORE, Progetto, SnapshotProgetto, Task, TransizioneTask
+
+# Stati da cui il passaggio a DONE conta come completamento
+STATI_APERTI = ('TODO', 'IN_PROGRESS')
+
+# Grandezze giornaliere degli snapshot, sommate alle transizioni del giorno
+CAMPI_FLUSSO = ('aggiunti', 'completati', 'tempo_ciclo_secondi', 'tempo_ciclo_task')
+
+# Le transizioni più recenti di questo margine sono lasciate al rollup successivo:
+# una transazione ancora aperta può avere ID più bassi non ancora visibili
+MARGINE_ROLLUP = timedelta(seconds=60)
+
+
+def aggiorna_snapshot(margine=MARGINE_ROLLUP):
+    """
+    Aggrega negli snapshot giornalieri le transizioni non ancora elaborate.
+
+    Il punto di ripresa è il massimo `ultima_transizione` degli snapshot; il comando
+    non deve essere eseguito in parallelo con sé stesso.
+    :param margine: età minima delle transizioni elaborate
+    :return: numero di transizioni elaborate
+    """
+    ultima = SnapshotProgetto.objects.aggregate(m=Max('ultima_transizione'))['m'] or 0
+    limite = TransizioneTask.objects.filter(
+        pk__gt=ultima, data__lte=timezone.now() - margine
+    ).aggregate(m=Max('pk'))['m']
+    if limite is None:
+        return 0
+
+    nuove = TransizioneTask.objects.filter(pk__gt=ultima, pk__lte=limite)
+    variazioni, elaborate = _variazioni(nuove)
+    with transaction.atomic():
+        _applica(variazioni, limite)
+    return elaborate
+
+
+def _variazioni(nuove):
+    """
+    Variazioni prodotte dalle transizioni, raggruppate per `(progetto_id, giorno)`.
+    :return: coppia (dizionario `(progetto_id, giorno) -> Counter dei campi`, numero di transizioni)
+    """
+    variazioni = defaultdict(Counter)
+    elaborate = 0
+    righe = nuove.annotate(giorno=TruncDate('data')).order_by().values(
+        'progetto_id', 'giorno', 'stato_precedente', 'stato'
+    ).annotate(n=Count('id'))
+    for riga in righe:
+        variazione = variazioni[(riga['progetto_id'], riga['giorno'])]
+        n = riga['n']
+        elaborate += n
+        if riga['stato_precedente']:
+            variazione[CAMPI_CONTATORE[riga['stato_precedente']]] -= n
+        else:
+            variazione['aggiunti'] += n
+        if riga['stato']:
+            variazione[CAMPI_CONTATORE[riga['stato']]] += n
+        if riga['stato'] == 'DONE' and riga['stato_precedente'] in STATI_APERTI:
+            variazione['completati'] += n
+
+    for chiave, (secondi, task) in _tempi_ciclo(nuove).items():
+        variazioni[chiave]['tempo_ciclo_secondi'] += secondi
+        variazioni[chiave]['tempo_ciclo_task'] += task
+    return variazioni, elaborate
+
+
+def _tempi_ciclo(nuove):
+    """
+    Tempi di ciclo dei task completati: dal primo passaggio a IN_PROGRESS (o, se assente,
+    dalla creazione del task) al completamento.
+    :return: dizionario `(progetto_id, giorno) -> (secondi totali, task misurati)`
+    """
+    completamenti = list(
+        nuove.filter(stato='DONE', stato_precedente__in=STATI_APERTI)
+        .values_list('progetto_id', 'task_id', 'data')
+    )
+    if not completamenti:
+        return {}
+
+    task_ids = {task_id for _, task_id, _ in completamenti}
+    inizi = dict(
+        Task.objects.filter(pk__in=task_ids).values_list('pk', 'data_creazione')
+    )
+    inizi.update(
+        TransizioneTask.objects.filter(task_id__in=task_ids, stato='IN_PROGRESS').order_by()
+        .values('task_id').annotate(inizio=Min('data')).values_list('task_id', 'inizio')
+    )
+
+    tempi = defaultdict(lambda: (0, 0))
+    for progetto_id, task_id, data in completamenti:
+        inizio = inizi.get(task_id)
+        if inizio is None or inizio > data:
+            continue
+        chiave = (progetto_id, timezone.localdate(data))
+        secondi, task = tempi[chiave]
+        tempi[chiave] = (secondi + int((data - inizio).total_seconds()), task + 1)
+    return tempi
+
+
+def _applica(variazioni, ultima_transizione):
+    """
+    Somma le variazioni agli snapshot: crea quelli dei giorni nuovi a partire dall'ultimo
+    snapshot precedente e propaga le variazioni dei conteggi agli snapshot dei giorni successivi.
+    """
+    per_progetto = defaultdict(dict)
+    for (progetto_id, giorno), variazione in variazioni.items():
+        per_progetto[progetto_id][giorno] = variazione
+    primo_giorno = min(giorno for _, giorno in variazioni)
+
+    esistenti = defaultdict(dict)
+    for snapshot in SnapshotProgetto.objects.filter(progetto_id__in=per_progetto, giorno__gte=primo_giorno):
+        esistenti[snapshot.progetto_id][snapshot.giorno] = snapshot
+    precedenti = SnapshotProgetto.objects.filter(
+        progetto_id=OuterRef('pk'), giorno__lt=primo_giorno
+    ).order_by('-giorno').values('pk')[:1]
+    basi = {
+        snapshot.progetto_id: snapshot for snapshot in SnapshotProgetto.objects.filter(
+            pk__in=Progetto.objects.filter(pk__in=per_progetto)
+            .annotate(snapshot_id=Subquery(precedenti)).values('snapshot_id')
+        )
+    }
+
+    nuovi, modificati = [], []
+    for progetto_id in sorted(per_progetto):
+        giorni_variati = per_progetto[progetto_id]
+        snapshot_progetto = esistenti[progetto_id]
+        base = basi.get(progetto_id)
+        # Conteggi già memorizzati nell'ultimo snapshot incontrato e variazioni cumulate dei nuovi
+        memorizzati = {campo: getattr(base, campo, 0) for campo in CAMPI_CONTATORE.values()}
+        cumulate = Counter()
+
+        for giorno in sorted(giorni_variati.keys() | snapshot_progetto.keys()):
+            variazione = giorni_variati.get(giorno, Counter())
+            for campo in CAMPI_CONTATORE.values():
+                cumulate[campo] += variazione[campo]
+
+            snapshot = snapshot_progetto.get(giorno)
+            if snapshot is None:
+                snapshot = SnapshotProgetto(progetto_id=progetto_id, giorno=giorno, **memorizzati)
+                nuovi.append(snapshot)
+            else:
+                memorizzati = {campo: getattr(snapshot, campo) for campo in CAMPI_CONTATORE.values()}
+                if giorno not in giorni_variati and not any(cumulate.values()):
+                    continue
+                modificati.append(snapshot)
+
+            for campo in CAMPI_CONTATORE.values():
+                setattr(snapshot, campo, getattr(snapshot, campo) + cumulate[campo])
+            for campo in CAMPI_FLUSSO:
+                setattr(snapshot, campo, getattr(snapshot, campo) + variazione[campo])
+            if giorno in giorni_variati:
+                snapshot.ultima_transizione = ultima_transizione
+
+    SnapshotProgetto.objects.bulk_create(nuovi)
+    SnapshotProgetto.objects.bulk_update(
+        modificati, [*CAMPI_CONTATORE.values(), *CAMPI_FLUSSO, 'ultima_transizione']
+    )
+
+
+def serie_giornaliera(progetto_id, dal, al):
+    """
+    Serie giornaliera dal giorno `dal` al giorno `al` (inclusi), letta dagli snapshot
+    con una sola query: gli snapshot dell'intervallo e l'ultimo precedente.
+
+    I giorni senza snapshot riportano i conteggi del giorno precedente e flussi nulli.
+    :return: lista di dizionari, uno per giorno
+    """
+    precedente = SnapshotProgetto.objects.filter(
+        progetto_id=progetto_id, giorno__lt=dal
+    ).order_by('-giorno').values('pk')[:1]
+    snapshot = SnapshotProgetto.objects.filter(progetto_id=progetto_id).filter(
+        Q(giorno__range=(dal, al)) | Q(pk=Subquery(precedente))
+    ).order_by('giorno')
+
+    conteggi = {campo: 0 for campo in CAMPI_CONTATORE.values()}
+    per_giorno = {}
+    for riga in snapshot:
+        if riga.giorno < dal:
+            conteggi = {campo: getattr(riga, campo) for campo in CAMPI_CONTATORE.values()}
+        else:
+            per_giorno[riga.giorno] = riga
+
+    serie = []
+    giorno = dal
+    while giorno <= al:
+        riga = per_giorno.get(giorno)
+        if riga is not None:
+            conteggi = {campo: getattr(riga, campo) for campo in CAMPI_CONTATORE.values()}
+        flussi = {campo: getattr(riga, campo) if riga is not None else 0 for campo in CAMPI_FLUSSO}
+        serie.append({
+            'giorno': giorno,
+            'todo_tasks': conteggi['conteggio_todo'],
+            'in_progress_tasks': conteggi['conteggio_in_progress'],
+            'done_tasks': conteggi['conteggio_done'],
+            'task_rimanenti': conteggi['conteggio_todo'] + conteggi['conteggio_in_progress'],
+            'aggiunti': flussi['aggiunti'],
+            'completati': flussi['completati'],
+            'tempo_ciclo_medio_ore': (
+                round(flussi['tempo_ciclo_secondi'] / flussi['tempo_ciclo_task'] / 3600, 2)
+                if flussi['tempo_ciclo_task'] else None
+            ),
+        })
+        giorno += timedelta(days=1)
+    return serie
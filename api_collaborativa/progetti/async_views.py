@@ -0,0 +1,224 @@
+"""
+View asincrone (ASGI) del progetto: il flusso SSE degli eventi dei task di un progetto.
+
+Servita dall'applicazione ASGI una connessione inattiva occupa solo una coroutine e non
+un thread del server. Le altre GET restano sui viewset di DRF, che applicano GET
+condizionali, cache delle risposte, coalescenza, repliche e liste rapide.
+
+I serializer ricevono oggetti già caricati (join e prefetch da `ottimizza_queryset`) e
+non accedono al database; i controlli che possono farlo (appartenenza al progetto) sono
+eseguiti con `sync_to_async`.
+"""
+import asyncio
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponseBase, JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import exceptions, permissions
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound, PermissionDenied
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from autenticazione import utenti
+from autenticazione.authentication import CachedUserJWTAuthentication
+
+from . import eventi, membership
+from .models import EventoTask, Progetto, Task
+from .serializers import TaskSerializer
+from .views import SparseFieldsetMixin
+
+
+class AsyncReadView(SparseFieldsetMixin, View):
+    """
+    Base delle view asincrone di sola lettura.
+
+    Autentica la richiesta con il token JWT (utente letto con `aget`), verifica i permessi
+    di `permission_classes` e converte le eccezioni di DRF nelle stesse risposte di errore
+    del percorso sincrono. Le sottoclassi implementano `leggi`, che restituisce i dati
+    da serializzare in JSON oppure una risposta già costruita.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            self.request = Request(request)
+            self.request.user = await self.autentica(request)
+            for permission in self.get_permissions():
+                if not permission.has_permission(self.request, self):
+                    raise NotAuthenticated() if not self.request.user.is_authenticated else PermissionDenied()
+            dati = await self.leggi(**kwargs)
+        except APIException as exc:
+            return self.risposta_errore(exc)
+        if isinstance(dati, HttpResponseBase):
+            return dati
+        return JsonResponse(dati, safe=False, encoder=JSONEncoder, json_dumps_params={'ensure_ascii': False})
+
+    async def leggi(self, **kwargs):
+        raise NotImplementedError
+
+    def get_permissions(self):
+        return [permission() for permission in self.permission_classes]
+
+    def get_serializer_context(self):
+        return {
+            'request': self.request, 'view': self,
+            'fields': self.campi_richiesti(), 'expand': self.espansioni_richieste(),
+        }
+
+    async def autentica(self, request):
+        """
+        Valida l'header `Authorization` come `JWTAuthentication` e legge l'utente dalla cache
+        degli utenti o, in mancanza, con l'ORM asincrono.
+        :return: l'utente autenticato, oppure AnonymousUser se l'header è assente
+        """
+        autenticazione = JWTAuthentication()
+        header = autenticazione.get_header(request)
+        raw_token = autenticazione.get_raw_token(header) if header is not None else None
+        if raw_token is None:
+            return AnonymousUser()
+
+        token = autenticazione.get_validated_token(raw_token)
+        try:
+            user_id = token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+        return CachedUserJWTAuthentication.verifica_utente(await utenti.aleggi(user_id))
+
+    async def verifica_oggetto(self, obj):
+        """Controlli dei permessi sul singolo oggetto, eseguiti in un thread (possono usare cache e DB)"""
+        for permission in self.get_permissions():
+            consentito = await sync_to_async(permission.has_object_permission)(self.request, self, obj)
+            if not consentito:
+                raise PermissionDenied()
+
+    @staticmethod
+    def risposta_errore(exc):
+        dati = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        headers = {}
+        if isinstance(exc, (NotAuthenticated, exceptions.AuthenticationFailed)):
+            headers['WWW-Authenticate'] = JWTAuthentication().authenticate_header(None)
+        logging.error(f"Richiesta asincrona rifiutata: {exc.status_code}")
+        return JsonResponse(dati, safe=False, encoder=JSONEncoder, status=exc.status_code, headers=headers)
+
+
+class AsyncProgettoMixin:
+    """Lettura del progetto indicato nell'URL tra quelli accessibili all'utente"""
+
+    async def progetto(self, pk, queryset=None):
+        queryset = queryset if queryset is not None else Progetto.objects.all()
+        try:
+            progetto = await queryset.accessibili_a(self.request.user).aget(pk=pk)
+        except Progetto.DoesNotExist:
+            raise NotFound()
+        await self.verifica_oggetto(progetto)
+        return progetto
+
+
+class AsyncProjectEventsView(AsyncProgettoMixin, AsyncReadView):
+    """
+    Flusso Server-Sent Events delle modifiche ai task di un progetto (`GET /projects/{id}/events/`).
+
+    Ogni evento ha come `id` l'ID di `EventoTask`, come `event` il tipo (`creato`,
+    `modificato`, `eliminato`) e come `data` il JSON dell'evento con il task serializzato
+    come in `GET /tasks/{id}/` (`null` se eliminato o non più nel progetto). Il client
+    riprende dall'header `Last-Event-ID` (o dal parametro `last_event_id`); senza, riceve
+    solo gli eventi successivi all'apertura.
+
+    Il database è interrogato solo quando la cache segnala un evento più recente
+    dell'ultimo inviato e a ogni keepalive, quando è verificata anche l'appartenenza
+    dell'utente al progetto. Dopo `EVENTI_SSE_DURATA` secondi il flusso si chiude e il
+    client si riconnette riprendendo dall'ultimo evento.
+    """
+
+    # Eventi letti per query
+    BLOCCO = 100
+
+    async def leggi(self, pk):
+        progetto = await self.progetto(pk, Progetto.objects.only('id'))
+        ultimo_id = self.ultimo_evento_ricevuto()
+        if ultimo_id is None:
+            ultimo_id = await EventoTask.objects.filter(progetto_id=progetto.pk).order_by('-pk').values_list(
+                'pk', flat=True
+            ).afirst() or 0
+
+        response = StreamingHttpResponse(self.flusso(progetto.pk, ultimo_id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def ultimo_evento_ricevuto(self):
+        valore = self.request.headers.get('Last-Event-ID') or self.request.query_params.get('last_event_id')
+        if valore is None:
+            return None
+        try:
+            ultimo_id = int(valore)
+        except ValueError:
+            ultimo_id = -1
+        if ultimo_id < 0:
+            raise exceptions.ValidationError({'last_event_id': "Deve essere un ID evento valido."})
+        return ultimo_id
+
+    async def flusso(self, progetto_id, ultimo_id):
+        loop = asyncio.get_running_loop()
+        inizio = ultimo_controllo = loop.time()
+        yield f'retry: {int(settings.EVENTI_SSE_INTERVALLO * 1000) or 1000}\n\n'
+
+        while True:
+            adesso = loop.time()
+            keepalive = adesso - ultimo_controllo >= settings.EVENTI_SSE_KEEPALIVE
+            pubblicato = await eventi.ultimo_evento(progetto_id)
+            if keepalive or pubblicato is None or pubblicato > ultimo_id:
+                async for messaggio, evento_id in self.messaggi(progetto_id, ultimo_id):
+                    ultimo_id = evento_id
+                    yield messaggio
+                if pubblicato is None:
+                    await eventi.memorizza_se_assente(progetto_id, ultimo_id)
+
+            if keepalive:
+                ultimo_controllo = adesso
+                if not await sync_to_async(membership.is_member_id)(progetto_id, self.request.user):
+                    logging.error(f"Flusso eventi chiuso: utente non più membro del progetto {progetto_id}")
+                    return
+                yield ': keepalive\n\n'
+
+            if adesso - inizio >= settings.EVENTI_SSE_DURATA:
+                return
+            await asyncio.sleep(settings.EVENTI_SSE_INTERVALLO)
+
+    async def messaggi(self, progetto_id, ultimo_id):
+        """Messaggi SSE degli eventi successivi a `ultimo_id`, letti a blocchi di `BLOCCO`"""
+        context = self.get_serializer_context()
+        while True:
+            blocco = [
+                evento async for evento in
+                EventoTask.objects.filter(progetto_id=progetto_id, pk__gt=ultimo_id).order_by('pk')[:self.BLOCCO]
+            ]
+            if not blocco:
+                return
+
+            task_ids = {evento.task_id for evento in blocco if evento.tipo != EventoTask.ELIMINATO}
+            tasks = {}
+            if task_ids:
+                queryset = self.ottimizza_queryset(
+                    Task.objects.filter(pk__in=task_ids, progetto_id=progetto_id).con_ritardo(), TaskSerializer
+                )
+                tasks = {task.pk: TaskSerializer(task, context=context).data async for task in queryset}
+
+            for evento in blocco:
+                dati = {
+                    'id': evento.pk, 'task_id': evento.task_id, 'tipo': evento.tipo, 'data': evento.data,
+                    'task': tasks.get(evento.task_id) if evento.tipo != EventoTask.ELIMINATO else None,
+                }
+                testo = json.dumps(dati, cls=JSONEncoder, ensure_ascii=False)
+                yield f'id: {evento.pk}\nevent: {evento.tipo}\ndata: {testo}\n\n', evento.pk
+                ultimo_id = evento.pk
+            if len(blocco) < self.BLOCCO:
+                return
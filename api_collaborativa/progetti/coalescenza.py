@@ -0,0 +1,79 @@
+"""
+Coalescenza delle richieste identiche concorrenti (single-flight) nel processo.
+
+All'apertura di un progetto molti collaboratori chiedono nello stesso istante le stesse
+statistiche e la stessa lista di task. Con `esegui` la prima richiesta per una chiave
+calcola il risultato; le richieste con la stessa chiave che arrivano mentre il calcolo è
+in corso, da altri thread, ne attendono la fine e ricevono lo stesso risultato (o la
+stessa eccezione) senza eseguire di nuovo le query. Nulla viene memorizzato dopo la
+fine del calcolo: le richieste successive ricalcolano, senza dati obsoleti.
+
+Chi attende oltre ``COALESCENZA_ATTESA`` secondi smette di attendere ed esegue il calcolo
+per conto proprio; ``COALESCENZA_ATTESA = 0`` disattiva la coalescenza.
+"""
+import copy
+import logging
+import threading
+
+from django.conf import settings
+
+_lock = threading.Lock()
+_in_corso = {}
+_metriche = {'eseguite': 0, 'condivise': 0, 'scadute': 0}
+
+
+class _Chiamata:
+    """Calcolo in corso per una chiave: risultato o eccezione, pubblicati al termine"""
+
+    def __init__(self):
+        self.terminata = threading.Event()
+        self.risultato = None
+        self.errore = None
+
+
+def esegui(chiave, funzione):
+    """
+    Restituisce `funzione()`, condividendo il calcolo con le chiamate concorrenti con la
+    stessa chiave. Le eccezioni del calcolo sono sollevate in tutte le chiamate che lo attendono.
+    """
+    attesa = settings.COALESCENZA_ATTESA
+    if not attesa:
+        return funzione()
+
+    with _lock:
+        chiamata = _in_corso.get(chiave)
+        primo = chiamata is None
+        if primo:
+            chiamata = _in_corso[chiave] = _Chiamata()
+
+    if primo:
+        try:
+            chiamata.risultato = funzione()
+            return chiamata.risultato
+        except Exception as exc:
+            chiamata.errore = exc
+            raise
+        finally:
+            with _lock:
+                del _in_corso[chiave]
+                _metriche['eseguite'] += 1
+            chiamata.terminata.set()
+
+    if not chiamata.terminata.wait(attesa):
+        with _lock:
+            _metriche['scadute'] += 1
+        logging.warning(f"Attesa del calcolo condiviso scaduta dopo {attesa} s, eseguo la richiesta")
+        return funzione()
+
+    with _lock:
+        _metriche['condivise'] += 1
+    if chiamata.errore is not None:
+        # Copia: la stessa eccezione sollevata in più thread condividerebbe il traceback
+        raise copy.copy(chiamata.errore) from chiamata.errore
+    return chiamata.risultato
+
+
+def metriche():
+    """Calcoli eseguiti, richieste che ne hanno condiviso il risultato e attese scadute"""
+    with _lock:
+        return {**_metriche, 'in_corso': len(_in_corso)}
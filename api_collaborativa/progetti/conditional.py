@@ -0,0 +1,37 @@
+"""
+Supporto alle GET condizionali (ETag) per progetti, task e statistiche.
+
+L'ETag è calcolato da query leggere (campi del progetto, contatori e tombstone dei task,
+`MAX(data_aggiornamento)`, task in ritardo, dati degli utenti mostrati), senza caricare i
+modelli né serializzare la risposta: se il client ha già la versione corrente riceve
+`304 Not Modified`. Non viene inviato `Last-Modified`: i dati degli utenti e il ritardo dei
+task cambiano senza una data di modifica, e `If-Modified-Since` restituirebbe 304 anche
+per risposte cambiate.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+
+def calcola_etag(*componenti):
+    """ETag debole ottenuto dall'hash dei componenti che identificano la versione della risorsa"""
+    impronta = hashlib.md5('|'.join(str(c) for c in componenti).encode()).hexdigest()
+    return 'W/' + quote_etag(impronta)
+
+
+def risposta_non_modificata(request, etag):
+    """
+    Confronta l'ETag con l'header `If-None-Match` della request.
+    :return: una risposta 304 se il client ha già la versione corrente, altrimenti None
+    """
+    risposta = get_conditional_response(getattr(request, '_request', request), etag=etag)
+    if risposta is not None and risposta.status_code == 304:
+        return risposta
+    return None
+
+
+def imposta_validatori(response, etag):
+    """Aggiunge l'header ETag alla risposta"""
+    response['ETag'] = etag
+    return response
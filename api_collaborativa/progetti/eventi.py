@@ -0,0 +1,45 @@
+"""
+Notifica dei nuovi eventi dei task (vedi `EventoTask`) ai flussi SSE in ascolto.
+
+Gli eventi sono salvati nel database; dopo il commit l'ID dell'ultimo evento di ogni
+progetto viene pubblicato nella cache ``condivisa`` di Django. I flussi SSE confrontano
+questo valore con l'ultimo evento inviato e interrogano il database solo quando è
+cambiato: una connessione inattiva costa una lettura dalla cache per intervallo, non una
+query.
+
+Le notifiche raggiungono i flussi di tutti i processi del server solo se la cache
+``condivisa`` è davvero condivisa (``CACHE_CONDIVISA_URL``, Redis). Con la cache locale
+di default serve un solo processo: i flussi SSE serviti da un altro processo vedrebbero
+i nuovi eventi solo al keepalive (``EVENTI_SSE_KEEPALIVE``), non in tempo reale.
+"""
+from django.core.cache import caches
+from django.db import transaction
+
+
+def _cache():
+    return caches['condivisa']
+
+
+def _chiave(progetto_id):
+    return f'progetti:eventi:{progetto_id}:ultimo'
+
+
+def notifica(ultimi):
+    """
+    Pubblica l'ultimo evento dei progetti al commit della transazione corrente.
+    :param ultimi: dizionario `progetto_id -> ID dell'ultimo evento`
+    """
+    if ultimi:
+        transaction.on_commit(
+            lambda: _cache().set_many({_chiave(p): evento_id for p, evento_id in ultimi.items()}, None)
+        )
+
+
+async def ultimo_evento(progetto_id):
+    """ID dell'ultimo evento pubblicato per il progetto, None se non presente in cache"""
+    return await _cache().aget(_chiave(progetto_id))
+
+
+async def memorizza_se_assente(progetto_id, evento_id):
+    """Ripopola la cache dopo una lettura dal database, senza sovrascrivere una notifica più recente"""
+    await _cache().aadd(_chiave(progetto_id), evento_id, None)
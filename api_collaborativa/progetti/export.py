@@ -0,0 +1,69 @@
+"""
+Export in streaming dei task nei formati NDJSON e CSV.
+
+Il queryset viene letto a blocchi con `.iterator(chunk_size=...)` e ogni riga è scritta
+direttamente nella risposta: la memoria resta costante qualunque sia la dimensione del
+progetto e i primi byte partono subito.
+"""
+import csv
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+FORMATI_EXPORT = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def _chunk_size():
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+def _righe_ndjson(queryset, serializer):
+    encoder = JSONEncoder(ensure_ascii=False)
+    for obj in queryset.iterator(chunk_size=_chunk_size()):
+        yield encoder.encode(serializer.to_representation(obj)) + '\n'
+
+
+class _Buffer:
+    """Oggetto file minimo per csv.writer: restituisce la riga invece di scriverla"""
+
+    def write(self, valore):
+        return valore
+
+
+def _valore_csv(valore):
+    """Le relazioni annidate sono esportate come ID"""
+    if isinstance(valore, dict):
+        return valore.get('id')
+    if isinstance(valore, list):
+        return ';'.join(str(_valore_csv(v)) for v in valore)
+    return valore
+
+
+def _righe_csv(queryset, serializer):
+    writer = csv.writer(_Buffer())
+    intestazione = [nome for nome, campo in serializer.fields.items() if not campo.write_only]
+    yield writer.writerow(intestazione)
+    for obj in queryset.iterator(chunk_size=_chunk_size()):
+        dati = serializer.to_representation(obj)
+        yield writer.writerow([_valore_csv(dati.get(nome)) for nome in intestazione])
+
+
+def risposta_export(queryset, formato, serializer, nome_file):
+    """
+    Crea la risposta in streaming per il formato richiesto.
+    :param serializer: istanza del serializer (senza dati), riusata per ogni riga
+    :return: StreamingHttpResponse, oppure None se il formato non è supportato
+    """
+    if formato not in FORMATI_EXPORT:
+        return None
+
+    righe = _righe_ndjson if formato == 'ndjson' else _righe_csv
+    response = StreamingHttpResponse(
+        righe(queryset, serializer), content_type=FORMATI_EXPORT[formato]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{nome_file}.{formato}"'
+    return response
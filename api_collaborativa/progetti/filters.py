@@ -0,0 +1,103 @@
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Task
+
+
+class TaskFilterBackend(BaseFilterBackend):
+    """
+    Filtri e ordinamento lato server per le liste di task.
+
+    ## Parametri
+    - `stato`: uno o più stati separati da virgola (`TODO,IN_PROGRESS`)
+    - `assegnatario`: ID dell'utente assegnato, `null` per i task non assegnati
+    - `autore`: ID dell'autore
+    - `progetto`: ID del progetto
+    - `scadenza_dopo` / `scadenza_prima`: data (`2025-07-20`) o data e ora ISO 8601
+    - `in_ritardo`: `true` per i soli task scaduti e non completati
+    - `ordering`: uno tra i campi ammessi, con `-` per l'ordine decrescente (es. `-scadenza`)
+
+    Tutti i filtri sono serviti dagli indici composti del modello Task.
+    """
+
+    ordinamenti_ammessi = ['data_creazione', 'data_aggiornamento', 'scadenza', 'stato', 'titolo']
+
+    def filter_queryset(self, request, queryset, view):
+        parametri = request.query_params
+        errori = {}
+
+        stati = parametri.get('stato')
+        if stati:
+            valori = [s.strip() for s in stati.split(',') if s.strip()]
+            validi = {codice for codice, _ in Task.STATUS_CHOICES}
+            if not set(valori) <= validi:
+                errori['stato'] = f"Valori ammessi: {', '.join(sorted(validi))}"
+            else:
+                queryset = queryset.filter(stato__in=valori)
+
+        assegnatario = parametri.get('assegnatario')
+        if assegnatario:
+            if assegnatario == 'null':
+                queryset = queryset.filter(assegnatario__isnull=True)
+            else:
+                queryset = self._filtra_id(queryset, 'assegnatario_id', assegnatario, errori, 'assegnatario')
+
+        for parametro in ('autore', 'progetto'):
+            valore = parametri.get(parametro)
+            if valore:
+                queryset = self._filtra_id(queryset, f'{parametro}_id', valore, errori, parametro)
+
+        for parametro, lookup, fine_giornata in (('scadenza_dopo', 'scadenza__gte', False),
+                                                 ('scadenza_prima', 'scadenza__lte', True)):
+            valore = parametri.get(parametro)
+            if valore:
+                istante = self._parse_istante(valore, fine_giornata)
+                if istante is None:
+                    errori[parametro] = 'Data non valida, usare il formato ISO 8601'
+                else:
+                    queryset = queryset.filter(**{lookup: istante})
+
+        if parametri.get('in_ritardo', '').lower() == 'true':
+            queryset = queryset.in_ritardo()
+
+        ordering = parametri.get('ordering')
+        if ordering:
+            if 'cursor' in parametri:
+                errori['ordering'] = 'Non disponibile con la paginazione cursor'
+            elif ordering.lstrip('-') not in self.ordinamenti_ammessi:
+                errori['ordering'] = f"Valori ammessi: {', '.join(self.ordinamenti_ammessi)}"
+            else:
+                # L'ID come secondo criterio rende l'ordinamento stabile tra le pagine
+                queryset = queryset.order_by(ordering, '-id' if ordering.startswith('-') else 'id')
+
+        if errori:
+            raise ValidationError(errori)
+        return queryset
+
+    @staticmethod
+    def _filtra_id(queryset, campo, valore, errori, parametro):
+        try:
+            return queryset.filter(**{campo: int(valore)})
+        except ValueError:
+            errori[parametro] = 'ID non valido'
+            return queryset
+
+    @staticmethod
+    def _parse_istante(valore, fine_giornata):
+        """Interpreta una data o una data e ora ISO 8601 nel fuso orario corrente"""
+        try:
+            istante = parse_datetime(valore)
+            if istante is None:
+                giorno = parse_date(valore)
+                if giorno is None:
+                    return None
+                istante = datetime.combine(giorno, time.max if fine_giornata else time.min)
+        except ValueError:
+            return None
+        if timezone.is_naive(istante):
+            istante = timezone.make_aware(istante)
+        return istante
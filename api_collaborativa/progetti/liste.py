@@ -0,0 +1,216 @@
+"""
+Serializzazione rapida in sola lettura delle liste di task e progetti.
+
+`TaskSerializer` e `ProjectSerializer` costruiscono per ogni riga un'istanza di modello,
+percorrono i campi di DRF e creano un `UserSerializer` annidato per ogni utente. Per le
+liste le righe sono invece lette con `values_list` (solo le colonne dei campi restituiti,
+utenti in join come con `select_related`) e convertite direttamente in dizionari; ogni
+utente è costruito una sola volta per risposta e riusato dalle righe che lo citano.
+
+Campi, ordine dei campi e relazioni espanse sono presi dall'istanza del serializer (quindi
+da `fields` / `expand`): il JSON prodotto è identico byte per byte a quello del serializer.
+Se il serializer contiene campi che qui non sono gestiti, `per_serializer` restituisce
+None e la view usa il serializer.
+"""
+from operator import attrgetter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .serializers import ProjectSerializer, TaskSerializer, UserSerializer
+
+CAMPI_UTENTE = tuple(UserSerializer.Meta.fields)
+
+
+def _formato_data(fuso):
+    """Conversione di una data come `DateTimeField.to_representation` nel formato ISO 8601"""
+    def converti(valore):
+        if not valore:
+            return None
+        valore = valore.astimezone(fuso).isoformat()
+        if valore.endswith('+00:00'):
+            valore = valore[:-6] + 'Z'
+        return valore
+    return converti
+
+
+def _espansa(campo):
+    """True se la relazione è restituita come oggetto annidato, False se come ID"""
+    if isinstance(campo, serializers.ListSerializer):
+        return type(campo.child) is UserSerializer
+    if isinstance(campo, serializers.BaseSerializer):
+        return type(campo) is UserSerializer
+    if isinstance(campo, (serializers.PrimaryKeyRelatedField, serializers.ManyRelatedField)):
+        return False
+    return None
+
+
+class ListaRapida:
+    """
+    Lettura e serializzazione di una lista a partire dall'istanza del serializer.
+
+    Le sottoclassi definiscono in `estrattore` come calcolare ogni campo da una riga di
+    `values_list(named=True)`; le righe contengono sempre le colonne `colonne_keyset`,
+    usate dalla paginazione keyset.
+    """
+
+    serializer_class = None
+    colonne_keyset = ('pk', 'data_creazione')
+    # relazioni con gli utenti -> True se molti-a-molti
+    relazioni_utente = {}
+
+    def __init__(self, serializer):
+        self.colonne = list(self.colonne_keyset)
+        self.estrattori = []
+        self.espansioni = {}
+        self.data = _formato_data(timezone.get_current_timezone())
+        for nome, campo in serializer.fields.items():
+            if campo.write_only:
+                continue
+            if nome in self.relazioni_utente:
+                espansa = _espansa(campo)
+                if espansa is None:
+                    raise ValueError(nome)
+                self.espansioni[nome] = espansa
+            self.estrattori.append((nome, self.estrattore(nome)))
+
+    @classmethod
+    def per_serializer(cls, serializer):
+        """Lista rapida per l'istanza del serializer, None se non gestita"""
+        if type(serializer) is not cls.serializer_class:
+            return None
+        if not settings.USE_TZ or api_settings.DATETIME_FORMAT != ISO_8601:
+            return None
+        try:
+            return cls(serializer)
+        except ValueError:
+            return None
+
+    def colonna(self, nome, converti=None):
+        """Estrattore della colonna `nome`, eventualmente convertita"""
+        if nome not in self.colonne:
+            self.colonne.append(nome)
+        leggi = attrgetter(nome)
+        if converti is None:
+            return leggi
+        return lambda riga: converti(leggi(riga))
+
+    def utente(self, relazione):
+        """Estrattore di una relazione con un utente: oggetto dalla tabella degli utenti oppure ID"""
+        leggi_id = self.colonna(f'{relazione}_id')
+        if not self.espansioni[relazione]:
+            return leggi_id
+        leggi_campi = attrgetter(*(f'{relazione}__{campo}' for campo in CAMPI_UTENTE[1:]))
+        self.colonne.extend(f'{relazione}__{campo}' for campo in CAMPI_UTENTE[1:])
+
+        def estrai(riga):
+            pk = leggi_id(riga)
+            if pk is None:
+                return None
+            utente = self.utenti.get(pk)
+            if utente is None:
+                utente = self.utenti[pk] = dict(zip(CAMPI_UTENTE, (pk, *leggi_campi(riga))))
+            return utente
+        return estrai
+
+    def estrattore(self, nome):
+        raise NotImplementedError
+
+    def queryset(self, queryset):
+        """Il queryset della view letto come righe con le sole colonne necessarie"""
+        return queryset.select_related(None).prefetch_related(None).values_list(*self.colonne, named=True)
+
+    def prepara(self, righe):
+        """Letture aggiuntive per le righe della pagina, prima della serializzazione"""
+
+    def serializza(self, righe):
+        """Rappresentazione delle righe, uguale a `serializer_class(..., many=True).data`"""
+        self.utenti = {}
+        self.prepara(righe)
+        estrattori = self.estrattori
+        return [{nome: estrai(riga) for nome, estrai in estrattori} for riga in righe]
+
+
+class ListaTaskRapida(ListaRapida):
+    serializer_class = TaskSerializer
+    # `scadenza` è la chiave keyset dei task in ritardo
+    colonne_keyset = ('pk', 'data_creazione', 'scadenza')
+    relazioni_utente = {'autore': False, 'assegnatario': False}
+
+    def estrattore(self, nome):
+        if nome == 'id':
+            return self.colonna('pk')
+        if nome in ('titolo', 'descrizione', 'stato'):
+            return self.colonna(nome)
+        if nome == 'progetto':
+            return self.colonna('progetto_id')
+        if nome in ('scadenza', 'data_creazione', 'data_aggiornamento'):
+            return self.colonna(nome, self.data)
+        if nome in self.relazioni_utente:
+            return self.utente(nome)
+        if nome == 'check_ritardo':
+            return self.colonna('in_ritardo', bool)
+        raise ValueError(nome)
+
+    def queryset(self, queryset):
+        if 'check_ritardo' in dict(self.estrattori) and 'in_ritardo' not in queryset.query.annotations:
+            queryset = queryset.con_ritardo()
+        return super().queryset(queryset)
+
+
+class ListaProgettiRapida(ListaRapida):
+    serializer_class = ProjectSerializer
+    relazioni_utente = {'proprietario': False, 'collaboratori': True}
+
+    def estrattore(self, nome):
+        if nome == 'id':
+            return self.colonna('pk')
+        if nome in ('nome', 'descrizione'):
+            return self.colonna(nome)
+        if nome in ('data_creazione', 'data_aggiornamento'):
+            return self.colonna(nome, self.data)
+        if nome == 'proprietario':
+            return self.utente(nome)
+        if nome == 'collaboratori':
+            return lambda riga: self.collaboratori.get(riga.pk, [])
+        if nome == 'done_tasks':
+            return self.colonna('conteggio_done')
+        if nome in ('task_totali', 'percentuale_completamento'):
+            conteggi = [self.colonna(campo) for campo in ('conteggio_todo', 'conteggio_in_progress', 'conteggio_done')]
+            leggi_done = conteggi[-1]
+
+            def task_totali(riga):
+                return sum(leggi(riga) for leggi in conteggi)
+
+            if nome == 'task_totali':
+                return task_totali
+
+            def percentuale_completamento(riga):
+                # Come Progetto.percentuale_completamento, restituita come float da FloatField
+                totali = task_totali(riga)
+                if totali == 0:
+                    return 0.0
+                return float(round((leggi_done(riga) / totali) * 100, 1))
+            return percentuale_completamento
+        raise ValueError(nome)
+
+    def prepara(self, righe):
+        """Collaboratori dei progetti della pagina, con una query come il prefetch del serializer"""
+        self.collaboratori = {}
+        if 'collaboratori' not in self.espansioni or not righe:
+            return
+        campi = CAMPI_UTENTE if self.espansioni['collaboratori'] else ('id',)
+        coppie = User.objects.filter(
+            collaboratori_progetti__in=[riga.pk for riga in righe]
+        ).values_list('collaboratori_progetti', *campi)
+        for progetto_id, *valori in coppie:
+            if not self.espansioni['collaboratori']:
+                utente = valori[0]
+            else:
+                utente = self.utenti.get(valori[0])
+                if utente is None:
+                    utente = self.utenti[valori[0]] = dict(zip(CAMPI_UTENTE, valori))
+            self.collaboratori.setdefault(progetto_id, []).append(utente)
@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from progetti.models import EventoTask
+
+
+class Command(BaseCommand):
+    """
+    Elimina gli eventi dei task più vecchi del periodo indicato.
+
+    Un client che riprende il flusso SSE da un evento eliminato riceve solo gli eventi
+    ancora presenti: il periodo deve superare la disconnessione massima attesa dei client.
+    """
+
+    help = "Elimina gli eventi dei task usati dal flusso SSE più vecchi di N giorni"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--giorni', type=int, default=7, help="Giorni di eventi da conservare")
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options['giorni'])
+        eliminati, _ = EventoTask.objects.filter(data__lt=limite).delete()
+        self.stdout.write(self.style.SUCCESS(f"Eventi eliminati: {eliminati}"))
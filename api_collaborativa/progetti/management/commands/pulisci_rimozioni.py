@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from progetti.models import Rimozione
+
+
+class Command(BaseCommand):
+    """
+    Elimina le rimozioni (tombstone) più vecchie del periodo di conservazione.
+
+    I client con un cursore di sincronizzazione più vecchio ricevono 410 da
+    `GET /changes/` ed eseguono una sincronizzazione completa.
+    """
+
+    help = "Elimina le rimozioni della sincronizzazione incrementale più vecchie di N giorni"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--giorni', type=int, default=settings.RIMOZIONI_GIORNI,
+            help="Giorni di rimozioni da conservare (default RIMOZIONI_GIORNI)"
+        )
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options['giorni'])
+        eliminate, _ = Rimozione.objects.filter(data__lt=limite).delete()
+        self.stdout.write(self.style.SUCCESS(f"Rimozioni eliminate: {eliminate}"))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from progetti.models import Progetto
+
+
+class Command(BaseCommand):
+    """
+    Ricalcola i contatori dei task per stato memorizzati su Progetto.
+
+    Da usare per correggere eventuali disallineamenti (es. scritture SQL
+    eseguite fuori dall'ORM). I progetti vengono elaborati a blocchi, ognuno
+    in una propria transazione.
+    """
+
+    help = "Ricalcola i contatori dei task (TODO, IN_PROGRESS, DONE) dei progetti"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'progetti', nargs='*', type=int,
+            help="ID dei progetti da ricalcolare (default: tutti)"
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Numero di progetti elaborati per transazione"
+        )
+
+    def handle(self, *args, **options):
+        queryset = Progetto.objects.order_by('pk')
+        if options['progetti']:
+            queryset = queryset.filter(pk__in=options['progetti'])
+
+        batch_size = options['batch_size']
+        ultimo_id = 0
+        elaborati = 0
+        corretti = 0
+        while True:
+            ids = list(
+                queryset.filter(pk__gt=ultimo_id).values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                corretti += Progetto.objects.filter(pk__in=ids).select_for_update().ricalcola_contatori()
+            elaborati += len(ids)
+            ultimo_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Progetti elaborati: {elaborati}, contatori corretti: {corretti}"
+        ))
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from progetti.analytics import MARGINE_ROLLUP, aggiorna_snapshot
+
+
+class Command(BaseCommand):
+    """
+    Aggrega le nuove transizioni di stato dei task negli snapshot giornalieri dei progetti.
+
+    Elabora solo le transizioni successive all'ultima esecuzione: da pianificare
+    periodicamente (es. ogni ora), senza esecuzioni sovrapposte.
+    """
+
+    help = "Aggiorna gli snapshot giornalieri usati da burndown, throughput e tempo di ciclo"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--margine', type=int, default=int(MARGINE_ROLLUP.total_seconds()),
+            help="Secondi: le transizioni più recenti sono lasciate all'esecuzione successiva"
+        )
+
+    def handle(self, *args, **options):
+        elaborate = aggiorna_snapshot(timedelta(seconds=options['margine']))
+        self.stdout.write(self.style.SUCCESS(f"Transizioni elaborate: {elaborate}"))
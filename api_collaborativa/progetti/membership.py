@@ -0,0 +1,152 @@
+"""
+Risoluzione dell'appartenenza di un utente a un progetto (proprietario o collaboratore).
+
+Ogni verifica costa al più una query EXISTS sull'indice della tabella
+``progetti_progetto_collaboratori`` e il risultato viene memorizzato:
+
+- per la durata della request, sull'oggetto request stesso;
+- tra request diverse, se ``MEMBERSHIP_CACHE_TIMEOUT`` è maggiore di 0, nella cache di
+  Django del processo.
+
+La cache tra request usa una versione per progetto, nella cache ``condivisa`` (vedi
+``progetti.versioni``), rigenerata ad ogni modifica dei collaboratori o del progetto (vedi
+``progetti.signals``) subito e di nuovo al commit della transazione: una verifica
+concorrente che memorizza l'appartenenza precedente al commit la associa a una versione
+già superata, e un collaboratore rimosso perde l'accesso subito in tutti i processi del
+server. Per questo la cache è attiva di default solo con ``CACHE_CONDIVISA_URL``.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from . import repliche, versioni
+
+# Attributo della request che contiene le risposte già calcolate
+_ATTRIBUTO_REQUEST = '_membership_cache'
+
+
+def _timeout():
+    """Durata in secondi della cache tra request; 0 o None la disabilita"""
+    return getattr(settings, 'MEMBERSHIP_CACHE_TIMEOUT', 0)
+
+
+def _chiave_versione(progetto_id):
+    return f'progetti:membri:{progetto_id}:versione'
+
+
+def _versione(progetto_id):
+    """Restituisce la versione corrente dei membri del progetto (vedi `versioni.leggi`)"""
+    return versioni.leggi([_chiave_versione(progetto_id)])[0]
+
+
+def _rigenera(progetto_id):
+    versioni.rigenera([_chiave_versione(progetto_id)])
+
+
+def invalida(progetto_id):
+    """Invalida le risposte memorizzate tra request per il progetto indicato, subito e al
+    commit della transazione corrente"""
+    _rigenera(progetto_id)
+    transaction.on_commit(lambda: _rigenera(progetto_id))
+
+
+def _memo_request(request):
+    if request is None:
+        return None
+    memo = getattr(request, _ATTRIBUTO_REQUEST, None)
+    if memo is None:
+        memo = {}
+        setattr(request, _ATTRIBUTO_REQUEST, memo)
+    return memo
+
+
+def _risolvi(progetto_id, user_id, request, query):
+    """Consulta nell'ordine la request, la cache e infine il database"""
+    memo = _memo_request(request)
+    if memo is not None and (progetto_id, user_id) in memo:
+        return memo[(progetto_id, user_id)]
+
+    timeout = _timeout()
+    chiave = None
+    risultato = None
+    if timeout:
+        versione = _versione(progetto_id)
+        chiave = f'progetti:membri:{progetto_id}:{versione}:{user_id}'
+        risultato = cache.get(chiave)
+
+    if risultato is None:
+        # Una replica in ritardo riporterebbe in cache un'appartenenza appena modificata
+        memorizza = chiave and repliche.memorizzabile([versione])
+        risultato = query()
+        if memorizza:
+            cache.set(chiave, risultato, timeout)
+
+    if memo is not None:
+        memo[(progetto_id, user_id)] = risultato
+    return risultato
+
+
+def _user_id(user):
+    if user is None:
+        return None
+    if isinstance(user, int):
+        return user
+    if not user.is_authenticated:
+        return None
+    return user.pk
+
+
+def is_member(progetto, user, request=None) -> bool:
+    """Verifica se un utente è proprietario o collaboratore del progetto
+    :param progetto: istanza di Progetto
+    :param user: istanza dell'utente oppure il suo ID
+    :param request: request corrente, usata per memorizzare la risposta
+    :return: True se l'utente è membro del progetto, False in caso contrario
+    """
+    user_id = _user_id(user)
+    if user_id is None:
+        return False
+    if progetto.proprietario_id == user_id:
+        logging.debug("Utente è proprietario del progetto")
+        return True
+
+    membro = _risolvi(
+        progetto.pk, user_id, request,
+        lambda: progetto.collaboratori.through.objects.filter(
+            progetto_id=progetto.pk, user_id=user_id
+        ).exists()
+    )
+    if membro:
+        logging.debug("Utente è contenuto nella lista collaboratori")
+    else:
+        logging.warning("Utente non autorizzato")
+    return membro
+
+
+def is_member_id(progetto_id, user, request=None) -> bool:
+    """Come `is_member`, ma a partire dal solo ID del progetto.
+    Restituisce False anche se il progetto non esiste.
+    """
+    from .models import Progetto
+
+    user_id = _user_id(user)
+    if user_id is None:
+        return False
+
+    try:
+        progetto_id = int(progetto_id)
+    except (TypeError, ValueError):
+        return False
+
+    membro = _risolvi(
+        progetto_id, user_id, request,
+        lambda: Progetto.objects.filter(pk=progetto_id).filter(
+            Q(proprietario_id=user_id) | Q(collaboratori__id=user_id)
+        ).exists()
+    )
+    if not membro:
+        logging.warning("Utente non autorizzato o progetto inesistente")
+    return membro
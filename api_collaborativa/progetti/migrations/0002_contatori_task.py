@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:45
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def popola_contatori(apps, schema_editor):
+    """Inizializza i contatori a partire dai task esistenti"""
+    Progetto = apps.get_model('progetti', 'Progetto')
+    Task = apps.get_model('progetti', 'Task')
+    campi = {
+        'TODO': 'conteggio_todo',
+        'IN_PROGRESS': 'conteggio_in_progress',
+        'DONE': 'conteggio_done',
+    }
+    righe = Task.objects.order_by().values('progetto_id', 'stato').annotate(n=Count('id'))
+    for riga in righe:
+        campo = campi.get(riga['stato'])
+        if campo:
+            Progetto.objects.filter(pk=riga['progetto_id']).update(**{campo: riga['n']})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progetti', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='progetto',
+            name='conteggio_done',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Task completati'),
+        ),
+        migrations.AddField(
+            model_name='progetto',
+            name='conteggio_in_progress',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Task in corso'),
+        ),
+        migrations.AddField(
+            model_name='progetto',
+            name='conteggio_todo',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Task da fare'),
+        ),
+        migrations.RunPython(popola_contatori, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progetti', '0002_contatori_task'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='progetto',
+            index=models.Index(fields=['-data_creazione', '-id'], name='progetto_creaz_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='progetto',
+            index=models.Index(fields=['proprietario', '-data_creazione', '-id'], name='progetto_propr_creaz_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-data_creazione', '-id'], name='task_creaz_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['progetto', '-data_creazione', '-id'], name='task_prog_creaz_idx'),
+        ),
+    ]
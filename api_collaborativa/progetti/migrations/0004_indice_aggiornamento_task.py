@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progetti', '0003_indici_paginazione_keyset'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['progetto', 'data_aggiornamento'], name='task_prog_aggiorn_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progetti', '0004_indice_aggiornamento_task'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['progetto', 'stato'], name='task_prog_stato_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['progetto', 'scadenza'], name='task_prog_scad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assegnatario', 'stato', 'scadenza'], name='task_assegn_stato_scad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['autore', 'stato'], name='task_autore_stato_idx'),
+        ),
+    ]
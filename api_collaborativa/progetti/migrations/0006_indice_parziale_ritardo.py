@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progetti', '0005_indici_filtri_task'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('stato', 'DONE'), _negated=True), fields=['scadenza'], name='task_scad_aperti_idx'),
+        ),
+    ]
@@ -0,0 +1,98 @@
+from django.db import migrations
+
+# (tabella, colonna del titolo)
+TABELLE = [
+    ('progetti_task', 'titolo'),
+    ('progetti_progetto', 'nome'),
+]
+
+
+def sql_postgresql(tabella, titolo):
+    vettore = (
+        f"setweight(to_tsvector('italian', coalesce(NEW.{titolo}, '')), 'A') || "
+        f"setweight(to_tsvector('italian', coalesce(NEW.descrizione, '')), 'B')"
+    )
+    crea = [
+        f'ALTER TABLE {tabella} ADD COLUMN search_vector tsvector',
+        f'''CREATE FUNCTION {tabella}_search_vector() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {vettore};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql''',
+        f'''CREATE TRIGGER {tabella}_search_vector_trg
+            BEFORE INSERT OR UPDATE OF {titolo}, descrizione ON {tabella}
+            FOR EACH ROW EXECUTE FUNCTION {tabella}_search_vector()''',
+        f"UPDATE {tabella} SET search_vector = {vettore.replace('NEW.', '')}",
+        f'CREATE INDEX {tabella}_search_idx ON {tabella} USING GIN (search_vector)',
+    ]
+    elimina = [
+        f'DROP TRIGGER IF EXISTS {tabella}_search_vector_trg ON {tabella}',
+        f'DROP FUNCTION IF EXISTS {tabella}_search_vector()',
+        f'ALTER TABLE {tabella} DROP COLUMN IF EXISTS search_vector',
+    ]
+    return crea, elimina
+
+
+def sql_sqlite(tabella, titolo):
+    fts = f'{tabella}_fts'
+    crea = [
+        f'''CREATE VIRTUAL TABLE {fts} USING fts5(
+            {titolo}, descrizione, content='{tabella}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2')''',
+        f'''CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabella} BEGIN
+                INSERT INTO {fts}(rowid, {titolo}, descrizione) VALUES (new.id, new.{titolo}, new.descrizione);
+            END''',
+        f'''CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabella} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {titolo}, descrizione)
+                VALUES ('delete', old.id, old.{titolo}, old.descrizione);
+            END''',
+        f'''CREATE TRIGGER {fts}_au AFTER UPDATE OF {titolo}, descrizione ON {tabella} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {titolo}, descrizione)
+                VALUES ('delete', old.id, old.{titolo}, old.descrizione);
+                INSERT INTO {fts}(rowid, {titolo}, descrizione) VALUES (new.id, new.{titolo}, new.descrizione);
+            END''',
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+    elimina = [
+        f'DROP TRIGGER IF EXISTS {fts}_ai',
+        f'DROP TRIGGER IF EXISTS {fts}_ad',
+        f'DROP TRIGGER IF EXISTS {fts}_au',
+        f'DROP TABLE IF EXISTS {fts}',
+    ]
+    return crea, elimina
+
+
+GENERATORI = {
+    'postgresql': sql_postgresql,
+    'sqlite': sql_sqlite,
+}
+
+
+def _esegui(schema_editor, indice):
+    generatore = GENERATORI.get(schema_editor.connection.vendor)
+    if generatore is None:
+        return
+    for tabella, titolo in TABELLE:
+        for istruzione in generatore(tabella, titolo)[indice]:
+            schema_editor.execute(istruzione)
+
+
+def crea_ricerca(apps, schema_editor):
+    """Crea colonne, indici e trigger della ricerca full-text per il database in uso"""
+    _esegui(schema_editor, 0)
+
+
+def elimina_ricerca(apps, schema_editor):
+    _esegui(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progetti', '0006_indice_parziale_ritardo'),
+    ]
+
+    operations = [
+        migrations.RunPython(crea_ricerca, elimina_ricerca),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def crea_snapshot_iniziali(apps, schema_editor):
+    """Snapshot di oggi dai contatori correnti: base dei conteggi per le transizioni successive"""
+    Progetto = apps.get_model('progetti', 'Progetto')
+    SnapshotProgetto = apps.get_model('progetti', 'SnapshotProgetto')
+    oggi = django.utils.timezone.localdate()
+    progetti = Progetto.objects.order_by('pk').values_list(
+        'pk', 'conteggio_todo', 'conteggio_in_progress', 'conteggio_done'
+    )
+    SnapshotProgetto.objects.bulk_create((
+        SnapshotProgetto(
+            progetto_id=pk, giorno=oggi, conteggio_todo=todo,
+            conteggio_in_progress=in_progress, conteggio_done=done
+        )
+        for pk, todo, in_progress, done in progetti.iterator()
+    ), batch_size=1000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progetti', '0007_ricerca_full_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnapshotProgetto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('giorno', models.DateField(verbose_name='Giorno')),
+                ('conteggio_todo', models.IntegerField(default=0, verbose_name='Task da fare')),
+                ('conteggio_in_progress', models.IntegerField(default=0, verbose_name='Task in corso')),
+                ('conteggio_done', models.IntegerField(default=0, verbose_name='Task completati')),
+                ('aggiunti', models.PositiveIntegerField(default=0, verbose_name='Task aggiunti nel giorno')),
+                ('completati', models.PositiveIntegerField(default=0, verbose_name='Task completati nel giorno')),
+                ('tempo_ciclo_secondi', models.PositiveBigIntegerField(default=0, verbose_name='Tempo di ciclo totale (s)')),
+                ('tempo_ciclo_task', models.PositiveIntegerField(default=0, verbose_name='Task con tempo di ciclo')),
+                ('ultima_transizione', models.BigIntegerField(db_index=True, default=0)),
+                ('progetto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshot', to='progetti.progetto', verbose_name='Progetto')),
+            ],
+            options={
+                'verbose_name': 'Snapshot giornaliero',
+                'verbose_name_plural': 'Snapshot giornalieri',
+                'ordering': ['progetto', 'giorno'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TransizioneTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField(verbose_name='Task')),
+                ('stato_precedente', models.CharField(blank=True, choices=[('TODO', 'Da Fare'), ('IN_PROGRESS', 'In Corso'), ('DONE', 'Completato')], max_length=20, null=True, verbose_name='Stato precedente')),
+                ('stato', models.CharField(blank=True, choices=[('TODO', 'Da Fare'), ('IN_PROGRESS', 'In Corso'), ('DONE', 'Completato')], max_length=20, null=True, verbose_name='Stato')),
+                ('data', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data')),
+                ('progetto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transizioni', to='progetti.progetto', verbose_name='Progetto')),
+            ],
+            options={
+                'verbose_name': 'Transizione di stato',
+                'verbose_name_plural': 'Transizioni di stato',
+                'indexes': [models.Index(fields=['task_id', 'stato'], name='transizione_task_stato_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='snapshotprogetto',
+            constraint=models.UniqueConstraint(fields=('progetto', 'giorno'), name='snapshot_progetto_giorno_unq'),
+        ),
+        migrations.RunPython(crea_snapshot_iniziali, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progetti', '0008_transizioni_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField(verbose_name='Task')),
+                ('tipo', models.CharField(choices=[('creato', 'Creato'), ('modificato', 'Modificato'), ('eliminato', 'Eliminato')], max_length=20, verbose_name='Tipo')),
+                ('data', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data')),
+                ('progetto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventi', to='progetti.progetto', verbose_name='Progetto')),
+            ],
+            options={
+                'verbose_name': 'Evento',
+                'verbose_name_plural': 'Eventi',
+                'indexes': [models.Index(fields=['progetto', 'id'], name='evento_progetto_id_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:48
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('progetti', '0009_eventi_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Rimozione',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('task', 'Task'), ('progetto', 'Progetto')], max_length=20, verbose_name='Tipo')),
+                ('oggetto_id', models.BigIntegerField(verbose_name='Oggetto')),
+                ('progetto_id', models.BigIntegerField(verbose_name='Progetto')),
+                ('utente_id', models.BigIntegerField(blank=True, null=True, verbose_name='Utente')),
+                ('data', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Data')),
+            ],
+            options={
+                'verbose_name': 'Rimozione',
+                'verbose_name_plural': 'Rimozioni',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='progetto',
+            index=models.Index(fields=['data_aggiornamento', 'id'], name='progetto_aggiorn_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['data_aggiornamento', 'id'], name='task_aggiorn_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rimozione',
+            index=models.Index(fields=['data', 'id'], name='rimozione_data_id_idx'),
+        ),
+    ]
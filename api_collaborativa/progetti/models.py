@@ -1,8 +1,110 @@
-from django.db import models
+from collections import Counter
+from django.db import models, transaction
 from django.contrib.auth.models import User
 import logging
 from django.utils import timezone
-from django.db.models import CharField
+from django.db.models import BooleanField, Case, CharField, Count, F, FilteredRelation, Q, Value, When
+from django.db.models.functions import Now
+
+from . import eventi, membership, risposte
+
+
+# Colonna contatore di Progetto associata a ciascuno stato dei task
+CAMPI_CONTATORE = {
+    'TODO': 'conteggio_todo',
+    'IN_PROGRESS': 'conteggio_in_progress',
+    'DONE': 'conteggio_done',
+}
+
+# Campi di Task da cui dipendono contatori, transizioni, eventi e rimozioni
+CAMPI_STATO_TASK = {'stato', 'progetto', 'progetto_id'}
+
+
+class ProgettoQuerySet(models.QuerySet):
+    """QuerySet dei progetti con la manutenzione dei contatori dei task"""
+
+    def accessibili_a(self, user):
+        """Progetti di cui l'utente è proprietario o collaboratore.
+
+        La condizione sui collaboratori è una subquery sulla tabella M2M: nessun join
+        che duplichi le righe, quindi niente DISTINCT e ordinamento servito dagli indici.
+        """
+        collaborazioni = Progetto.collaboratori.through.objects.filter(
+            user_id=user.pk
+        ).values('progetto_id')
+        return self.filter(Q(proprietario_id=user.pk) | Q(pk__in=collaborazioni))
+
+    def con_task_in_ritardo(self):
+        """Annota ogni progetto con `task_in_ritardo`, il numero di task scaduti e non completati.
+
+        La condizione sul ritardo è nella clausola ON del LEFT JOIN (FilteredRelation):
+        sono uniti solo i task in ritardo e il conteggio è un unico GROUP BY sui progetti.
+        """
+        return self.annotate(
+            tasks_in_ritardo=FilteredRelation(
+                'tasks', condition=Q(tasks__scadenza__lt=Now()) & ~Q(tasks__stato='DONE')
+            )
+        ).annotate(task_in_ritardo=Count('tasks_in_ritardo'))
+
+    def applica_delta_contatori(self, delta):
+        """Applica variazioni incrementali ai contatori dei task.
+
+        :param delta: mapping ``(progetto_id, stato) -> variazione``
+        :return: None. Un solo UPDATE per progetto, eseguito con espressioni F(); aggiorna anche
+            `data_aggiornamento`, così che la sincronizzazione incrementale invii i nuovi contatori
+        """
+        per_progetto = {}
+        for (progetto_id, stato), variazione in delta.items():
+            if not variazione or stato not in CAMPI_CONTATORE:
+                continue
+            campi = per_progetto.setdefault(progetto_id, {})
+            campo = CAMPI_CONTATORE[stato]
+            campi[campo] = campi.get(campo, 0) + variazione
+
+        # Ordine stabile degli UPDATE per evitare deadlock tra transazioni concorrenti
+        adesso = timezone.now()
+        for progetto_id in sorted(per_progetto):
+            valori = {
+                campo: F(campo) + variazione
+                for campo, variazione in per_progetto[progetto_id].items() if variazione
+            }
+            if valori:
+                self.filter(pk=progetto_id).update(data_aggiornamento=adesso, **valori)
+
+    def ricalcola_contatori(self):
+        """Ricalcola da zero i contatori dei progetti del queryset.
+
+        :return: numero di progetti i cui contatori erano disallineati e sono stati corretti
+        """
+        progetti = list(self.only('id', 'data_aggiornamento', *CAMPI_CONTATORE.values()))
+        if not progetti:
+            return 0
+
+        conteggi = Counter()
+        righe = Task.objects.filter(
+            progetto_id__in=[p.id for p in progetti]
+        ).order_by().values('progetto_id', 'stato').annotate(n=Count('id'))
+        for riga in righe:
+            conteggi[(riga['progetto_id'], riga['stato'])] = riga['n']
+
+        corretti = []
+        adesso = timezone.now()
+        for progetto in progetti:
+            disallineato = False
+            for stato, campo in CAMPI_CONTATORE.items():
+                atteso = conteggi[(progetto.id, stato)]
+                if getattr(progetto, campo) != atteso:
+                    setattr(progetto, campo, atteso)
+                    disallineato = True
+            if disallineato:
+                progetto.data_aggiornamento = adesso
+                corretti.append(progetto)
+
+        if corretti:
+            Progetto.objects.bulk_update(corretti, [*CAMPI_CONTATORE.values(), 'data_aggiornamento'])
+            risposte.invalida(progetto.pk for progetto in corretti)
+            logging.warning(f"Contatori dei task corretti per {len(corretti)} progetti")
+        return len(corretti)
 
 
 class Progetto(models.Model):
@@ -27,35 +129,140 @@ class Progetto(models.Model):
     data_creazione = models.DateTimeField(auto_now_add=True)
     data_aggiornamento = models.DateTimeField(auto_now=True)
 
+    # Contatori denormalizzati dei task per stato, aggiornati nella stessa
+    # transazione delle scritture sui task (vedi Task.save/delete e TaskQuerySet)
+    conteggio_todo = models.PositiveIntegerField(default=0, editable=False, verbose_name="Task da fare")
+    conteggio_in_progress = models.PositiveIntegerField(default=0, editable=False, verbose_name="Task in corso")
+    conteggio_done = models.PositiveIntegerField(default=0, editable=False, verbose_name="Task completati")
+
+    objects = ProgettoQuerySet.as_manager()
+
     class Meta:
         ordering = ['-data_creazione']
         verbose_name = "Progetto"
         verbose_name_plural = "Progetti"
+        indexes = [
+            # Chiavi della paginazione keyset (data_creazione, id)
+            models.Index(fields=['-data_creazione', '-id'], name='progetto_creaz_id_idx'),
+            models.Index(fields=['proprietario', '-data_creazione', '-id'], name='progetto_propr_creaz_idx'),
+            # Chiavi della sincronizzazione incrementale (data_aggiornamento, id)
+            models.Index(fields=['data_aggiornamento', 'id'], name='progetto_aggiorn_id_idx'),
+        ]
 
     def __str__(self) -> CharField:
         return self.nome
 
+    @property
+    def task_totali(self) -> int:
+        return self.conteggio_todo + self.conteggio_in_progress + self.conteggio_done
+
+    @property
+    def done_tasks(self) -> int:
+        return self.conteggio_done
+
+    @property
+    def in_progress_tasks(self) -> int:
+        return self.conteggio_in_progress
+
+    @property
+    def todo_tasks(self) -> int:
+        return self.conteggio_todo
+
     def percentuale_completamento(self):
-        """Calcola la percentuale di task completati"""
-        task_totali = self.tasks.count()
+        """Calcola la percentuale di task completati a partire dai contatori"""
+        task_totali = self.task_totali
         if task_totali == 0:
             logging.warning("Non ci sono ancora tasks nel progetto!")
             return 0
-        done_tasks = self.tasks.filter(stato='DONE').count()
-        return round((done_tasks / task_totali) * 100, 1)
+        return round((self.done_tasks / task_totali) * 100, 1)
 
-    def is_member(self, user) -> bool:
+    def is_member(self, user, request=None) -> bool:
         """Verifica se un utente è proprietario oppure è contenuto nella lista collaboratori
         :param: istanza dell'utente che fa la request
+        :param: request corrente (facoltativa), usata per memorizzare la risposta per tutta la request
         :return: True se l'utente è proprietario o è nella lista collaboratori, False in caso contrario
         """
+        return membership.is_member(self, user, request)
+
+
+class TaskQuerySet(models.QuerySet):
+    """
+    QuerySet dei task.
+    Le operazioni massive registrano transizioni di stato ed eventi e mantengono
+    allineati i contatori di Progetto nella stessa transazione della scrittura.
+    """
+
+    def accessibili_a(self, user):
+        """Task dei progetti di cui l'utente è proprietario o collaboratore"""
+        return self.filter(
+            progetto_id__in=Progetto.objects.accessibili_a(user).values('pk')
+        )
+
+    def in_ritardo(self):
+        """Task scaduti e non completati.
+
+        La condizione `NOT stato = 'DONE'` coincide con quella dell'indice parziale
+        `task_scad_aperti_idx`: la ricerca è un'unica scansione per intervallo su `scadenza`.
+        """
+        return self.filter(scadenza__lt=Now()).filter(~Q(stato='DONE'))
+
+    def con_ritardo(self):
+        """Annota ogni task con `in_ritardo`, calcolato dal database con l'ora corrente"""
+        return self.annotate(in_ritardo=Case(
+            When(Q(scadenza__lt=Now()) & ~Q(stato='DONE'), then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        ))
+
+    def _stati_correnti(self):
+        """Progetto e stato di ogni task del queryset: dizionario `pk -> (progetto_id, stato)`"""
+        return {
+            pk: (progetto_id, stato)
+            for pk, progetto_id, stato in self.order_by().values_list('pk', 'progetto_id', 'stato')
+        }
+
+    def _stati_bloccati(self):
+        """Come `_stati_correnti`, con le righe bloccate (SELECT ... FOR UPDATE) fino al termine
+        della transazione: le scritture concorrenti sugli stessi task calcolano i delta dei
+        contatori una dopo l'altra, ciascuna dallo stato lasciato dalla precedente"""
+        return self.select_for_update()._stati_correnti()
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            creati = super().bulk_create(objs, *args, **kwargs)
+            if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+                # Non è noto quali righe siano state inserite: ricalcolo i progetti coinvolti
+                # (le transizioni di questi task non vengono registrate)
+                Progetto.objects.filter(
+                    pk__in={obj.progetto_id for obj in objs}
+                ).ricalcola_contatori()
+            else:
+                registra_modifiche([(obj.pk, None, (obj.progetto_id, obj.stato)) for obj in creati])
+        return creati
 
-        if user == self.proprietario or user in self.collaboratori.all():
-            logging.debug("Utente è proprietario oppure è contenuto nella lista collaboratori")
-            return True
-        else:
-            logging.warning("Utente non autorizzato")
-            return False
+    def update(self, **kwargs):
+        with transaction.atomic(using=self.db):
+            prima = self._stati_bloccati()
+            righe = super().update(**kwargs)
+            if CAMPI_STATO_TASK & kwargs.keys():
+                dopo = Task.objects.filter(pk__in=list(prima))._stati_correnti()
+            else:
+                dopo = prima
+            registra_modifiche([(pk, originale, dopo.get(pk)) for pk, originale in prima.items()])
+        return righe
+
+    update.alters_data = True
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            prima = self._stati_bloccati()
+            risultato = super().delete()
+            registra_modifiche([(pk, originale, None) for pk, originale in prima.items()])
+        return risultato
+
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class Task(models.Model):
@@ -104,17 +311,359 @@ class Task(models.Model):
     data_creazione = models.DateTimeField(auto_now_add=True)
     data_aggiornamento = models.DateTimeField(auto_now=True)
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ['-data_creazione']
         verbose_name = "Task"
         verbose_name_plural = "Tasks"
+        indexes = [
+            # Chiavi della paginazione keyset (data_creazione, id)
+            models.Index(fields=['-data_creazione', '-id'], name='task_creaz_id_idx'),
+            models.Index(fields=['progetto', '-data_creazione', '-id'], name='task_prog_creaz_idx'),
+            # MAX(data_aggiornamento) per progetto, usato come validatore delle GET condizionali
+            models.Index(fields=['progetto', 'data_aggiornamento'], name='task_prog_aggiorn_idx'),
+            # Chiavi della sincronizzazione incrementale (data_aggiornamento, id)
+            models.Index(fields=['data_aggiornamento', 'id'], name='task_aggiorn_id_idx'),
+            # Filtri delle liste di task (TaskFilterBackend)
+            models.Index(fields=['progetto', 'stato'], name='task_prog_stato_idx'),
+            models.Index(fields=['progetto', 'scadenza'], name='task_prog_scad_idx'),
+            models.Index(fields=['assegnatario', 'stato', 'scadenza'], name='task_assegn_stato_scad_idx'),
+            models.Index(fields=['autore', 'stato'], name='task_autore_stato_idx'),
+            # Task in ritardo (TaskQuerySet.in_ritardo): solo i task non completati
+            models.Index(fields=['scadenza'], name='task_scad_aperti_idx', condition=~Q(stato='DONE')),
+        ]
 
     def __str__(self) -> str:
         return f"{self.titolo} - {self.progetto.nome}"
 
+    def _stato_nel_db(self, using=None):
+        """Progetto e stato del task nel database, letti con la riga bloccata fino al termine
+        della transazione (vedi `TaskQuerySet._stati_bloccati`); None se il task non esiste più"""
+        return Task.objects.db_manager(using).filter(pk=self.pk)._stati_bloccati().get(self.pk)
+
+    def save(self, *args, **kwargs):
+        """Salva il task registrando transizione di stato ed evento e aggiornando i contatori
+        del progetto nella stessa transazione"""
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic(using=kwargs.get('using')):
+            if self._state.adding:
+                super().save(*args, **kwargs)
+                originale = None
+            elif update_fields is not None and not CAMPI_STATO_TASK & set(update_fields):
+                super().save(*args, **kwargs)
+                originale = (self.progetto_id, self.stato)
+            else:
+                originale = self._stato_nel_db(kwargs.get('using'))
+                super().save(*args, **kwargs)
+            registra_modifiche([(self.pk, originale, (self.progetto_id, self.stato))])
+
+    def delete(self, *args, **kwargs):
+        """Elimina il task registrando transizione ed evento e decrementando i contatori
+        del progetto nella stessa transazione"""
+        with transaction.atomic(using=kwargs.get('using')):
+            originale = self._stato_nel_db(kwargs.get('using'))
+            pk = self.pk
+            risultato = super().delete(*args, **kwargs)
+            registra_modifiche([(pk, originale, None)])
+        return risultato
+
     def check_ritardo(self):
-        """Verifica se il task è in ritardo"""
+        """Verifica se il task è in ritardo.
+        Le liste usano l'annotazione `in_ritardo` di TaskQuerySet.con_ritardo, calcolata dal database.
+        """
 
         if self.scadenza and self.stato != 'DONE':
             return timezone.now() > self.scadenza
-        return False
\ No newline at end of file
+        return False
+
+
+class TransizioneTaskQuerySet(models.QuerySet):
+    """QuerySet delle transizioni di stato dei task"""
+
+    def registra(self, transizioni, contatori=True):
+        """Salva le transizioni e applica ai contatori dei progetti le variazioni corrispondenti.
+
+        :param transizioni: lista di TransizioneTask non ancora salvate (vedi TransizioneTask.tra)
+        :param contatori: False se i contatori sono ricalcolati da chi chiama
+        """
+        if not transizioni:
+            return
+        self.bulk_create(transizioni)
+        if contatori:
+            delta = Counter()
+            for transizione in transizioni:
+                if transizione.stato_precedente:
+                    delta[(transizione.progetto_id, transizione.stato_precedente)] -= 1
+                if transizione.stato:
+                    delta[(transizione.progetto_id, transizione.stato)] += 1
+            Progetto.objects.applica_delta_contatori(delta)
+
+
+class TransizioneTask(models.Model):
+    """
+    Registro append-only dei cambi di stato dei task.
+
+    Creazione ed eliminazione hanno rispettivamente `stato_precedente` e `stato` nulli;
+    lo spostamento in un altro progetto è registrato come uscita dal vecchio progetto
+    e ingresso nel nuovo. `task_id` non è una chiave esterna: lo storico resta anche
+    dopo l'eliminazione del task. Le transizioni sono aggregate in SnapshotProgetto
+    dal comando `rollup`.
+    """
+    progetto = models.ForeignKey(
+        Progetto,
+        on_delete=models.CASCADE,
+        related_name='transizioni',
+        verbose_name="Progetto"
+    )
+    task_id = models.BigIntegerField(verbose_name="Task")
+    stato_precedente = models.CharField(
+        max_length=20, choices=Task.STATUS_CHOICES, null=True, blank=True, verbose_name="Stato precedente"
+    )
+    stato = models.CharField(
+        max_length=20, choices=Task.STATUS_CHOICES, null=True, blank=True, verbose_name="Stato"
+    )
+    data = models.DateTimeField(default=timezone.now, verbose_name="Data")
+
+    objects = TransizioneTaskQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Transizione di stato"
+        verbose_name_plural = "Transizioni di stato"
+        indexes = [
+            # Inizio del lavoro sul task, per il calcolo del tempo di ciclo
+            models.Index(fields=['task_id', 'stato'], name='transizione_task_stato_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"Task {self.task_id}: {self.stato_precedente} -> {self.stato}"
+
+    @classmethod
+    def tra(cls, task_id, originale, nuovo):
+        """Transizioni di un task tra due coppie `(progetto_id, stato)`.
+
+        :param originale: coppia letta dal DB prima della scrittura, None se il task è nuovo
+        :param nuovo: coppia dopo la scrittura, None se il task è stato eliminato
+        :return: lista (eventualmente vuota) di transizioni non salvate
+        """
+        if originale == nuovo:
+            return []
+        if originale is not None and nuovo is not None and originale[0] == nuovo[0]:
+            return [cls(progetto_id=nuovo[0], task_id=task_id, stato_precedente=originale[1], stato=nuovo[1])]
+
+        transizioni = []
+        if originale is not None:
+            transizioni.append(cls(progetto_id=originale[0], task_id=task_id, stato_precedente=originale[1]))
+        if nuovo is not None:
+            transizioni.append(cls(progetto_id=nuovo[0], task_id=task_id, stato=nuovo[1]))
+        return transizioni
+
+
+class EventoTaskQuerySet(models.QuerySet):
+    """QuerySet degli eventi dei task"""
+
+    def registra(self, eventi_task):
+        """Salva gli eventi e, al commit, notifica l'ultimo evento di ogni progetto ai flussi SSE"""
+        if not eventi_task:
+            return
+        creati = self.bulk_create(eventi_task)
+        ultimi = {}
+        for evento in creati:
+            if evento.pk is not None:
+                ultimi[evento.progetto_id] = max(ultimi.get(evento.progetto_id, 0), evento.pk)
+        eventi.notifica(ultimi)
+
+
+class EventoTask(models.Model):
+    """
+    Registro append-only delle modifiche ai task, letto dal flusso SSE di ogni progetto.
+
+    L'ID crescente è l'identificativo dell'evento (`Last-Event-ID`) da cui un client
+    riprende il flusso. Lo spostamento di un task in un altro progetto è registrato come
+    eliminazione dal vecchio progetto e creazione nel nuovo. Gli eventi più vecchi sono
+    eliminati dal comando `pulisci_eventi`.
+    """
+
+    CREATO = 'creato'
+    MODIFICATO = 'modificato'
+    ELIMINATO = 'eliminato'
+    TIPI = [
+        (CREATO, 'Creato'),
+        (MODIFICATO, 'Modificato'),
+        (ELIMINATO, 'Eliminato'),
+    ]
+
+    progetto = models.ForeignKey(
+        Progetto,
+        on_delete=models.CASCADE,
+        related_name='eventi',
+        verbose_name="Progetto"
+    )
+    task_id = models.BigIntegerField(verbose_name="Task")
+    tipo = models.CharField(max_length=20, choices=TIPI, verbose_name="Tipo")
+    data = models.DateTimeField(default=timezone.now, verbose_name="Data")
+
+    objects = EventoTaskQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Evento"
+        verbose_name_plural = "Eventi"
+        indexes = [
+            # Lettura del flusso di un progetto a partire dall'ultimo evento ricevuto
+            models.Index(fields=['progetto', 'id'], name='evento_progetto_id_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"Task {self.task_id} {self.tipo}"
+
+    @classmethod
+    def tra(cls, task_id, originale, nuovo):
+        """Eventi di un task tra due coppie `(progetto_id, stato)` (vedi TransizioneTask.tra).
+
+        A differenza delle transizioni, due coppie uguali producono un evento `modificato`.
+        """
+        if originale is None and nuovo is None:
+            return []
+        if originale is None:
+            return [cls(progetto_id=nuovo[0], task_id=task_id, tipo=cls.CREATO)]
+        if nuovo is None:
+            return [cls(progetto_id=originale[0], task_id=task_id, tipo=cls.ELIMINATO)]
+        if originale[0] == nuovo[0]:
+            return [cls(progetto_id=nuovo[0], task_id=task_id, tipo=cls.MODIFICATO)]
+        return [
+            cls(progetto_id=originale[0], task_id=task_id, tipo=cls.ELIMINATO),
+            cls(progetto_id=nuovo[0], task_id=task_id, tipo=cls.CREATO),
+        ]
+
+
+class RimozioneQuerySet(models.QuerySet):
+    """QuerySet delle rimozioni"""
+
+    def visibili_a(self, user):
+        """
+        Rimozioni che riguardano l'utente: quelle a lui destinate (progetti non più accessibili)
+        e i task rimossi dai progetti a cui ha accesso. Sono escluse le rimozioni superate,
+        cioè di task e progetti che l'utente vede di nuovo.
+        """
+        progetti = Progetto.objects.accessibili_a(user).values('pk')
+        return self.filter(
+            Q(utente_id=user.pk) | Q(utente_id__isnull=True, progetto_id__in=progetti)
+        ).exclude(
+            tipo=Rimozione.TASK, oggetto_id__in=Task.objects.accessibili_a(user).values('pk')
+        ).exclude(
+            tipo=Rimozione.PROGETTO, oggetto_id__in=progetti
+        )
+
+
+class Rimozione(models.Model):
+    """
+    Tombstone di un task o progetto non più visibile, letta dalla sincronizzazione
+    incrementale (`GET /changes/`).
+
+    - task eliminato o spostato in un altro progetto: `utente_id` nullo, visibile ai membri
+      del progetto di origine
+    - progetto eliminato o utente rimosso dai collaboratori: una riga per utente
+
+    `utente_id` e gli ID degli oggetti non sono chiavi esterne: le righe sopravvivono
+    all'eliminazione di utenti e progetti e sono eliminate dal comando `pulisci_rimozioni`.
+    """
+
+    TASK = 'task'
+    PROGETTO = 'progetto'
+    TIPI = [
+        (TASK, 'Task'),
+        (PROGETTO, 'Progetto'),
+    ]
+
+    tipo = models.CharField(max_length=20, choices=TIPI, verbose_name="Tipo")
+    oggetto_id = models.BigIntegerField(verbose_name="Oggetto")
+    progetto_id = models.BigIntegerField(verbose_name="Progetto")
+    utente_id = models.BigIntegerField(null=True, blank=True, verbose_name="Utente")
+    data = models.DateTimeField(default=timezone.now, verbose_name="Data")
+
+    objects = RimozioneQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Rimozione"
+        verbose_name_plural = "Rimozioni"
+        indexes = [
+            # Chiavi della sincronizzazione incrementale (data, id)
+            models.Index(fields=['data', 'id'], name='rimozione_data_id_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.tipo} {self.oggetto_id} rimosso"
+
+    @classmethod
+    def tra(cls, task_id, originale, nuovo):
+        """Rimozione di un task tra due coppie `(progetto_id, stato)` (vedi TransizioneTask.tra):
+        presente se il task è eliminato o lascia il progetto di origine"""
+        if originale is None or (nuovo is not None and originale[0] == nuovo[0]):
+            return []
+        return [cls(tipo=cls.TASK, oggetto_id=task_id, progetto_id=originale[0])]
+
+    @classmethod
+    def per_progetto(cls, progetto_id, utenti):
+        """Rimozioni di un progetto non più accessibile agli utenti indicati"""
+        return [cls(tipo=cls.PROGETTO, oggetto_id=progetto_id, progetto_id=progetto_id, utente_id=u) for u in utenti]
+
+
+def registra_modifiche(modifiche, contatori=True):
+    """Registra transizioni di stato, eventi e rimozioni di una scrittura sui task e invalida
+    le risposte memorizzate dei progetti coinvolti.
+
+    :param modifiche: lista di terne `(task_id, originale, nuovo)`, con `originale` e `nuovo`
+        coppie `(progetto_id, stato)` prima e dopo la scrittura (None se assente)
+    :param contatori: False se i contatori dei progetti sono ricalcolati da chi chiama
+    """
+    TransizioneTask.objects.registra(
+        [transizione for modifica in modifiche for transizione in TransizioneTask.tra(*modifica)],
+        contatori
+    )
+    EventoTask.objects.registra(
+        [evento for modifica in modifiche for evento in EventoTask.tra(*modifica)]
+    )
+    Rimozione.objects.bulk_create(
+        [rimozione for modifica in modifiche for rimozione in Rimozione.tra(*modifica)]
+    )
+    risposte.invalida(
+        coppia[0] for _, originale, nuovo in modifiche for coppia in (originale, nuovo) if coppia
+    )
+
+
+class SnapshotProgetto(models.Model):
+    """
+    Riepilogo giornaliero di un progetto, calcolato dalle transizioni dal comando `rollup`.
+
+    I conteggi per stato sono quelli a fine giornata; `aggiunti`, `completati` e il tempo
+    di ciclo si riferiscono alle transizioni del giorno. I giorni senza transizioni non
+    hanno righe: valgono i conteggi dell'ultimo snapshot precedente.
+    """
+    progetto = models.ForeignKey(
+        Progetto,
+        on_delete=models.CASCADE,
+        related_name='snapshot',
+        verbose_name="Progetto"
+    )
+    giorno = models.DateField(verbose_name="Giorno")
+    conteggio_todo = models.IntegerField(default=0, verbose_name="Task da fare")
+    conteggio_in_progress = models.IntegerField(default=0, verbose_name="Task in corso")
+    conteggio_done = models.IntegerField(default=0, verbose_name="Task completati")
+    aggiunti = models.PositiveIntegerField(default=0, verbose_name="Task aggiunti nel giorno")
+    completati = models.PositiveIntegerField(default=0, verbose_name="Task completati nel giorno")
+    # Somma dei tempi di ciclo dei task completati nel giorno di cui è noto l'inizio
+    tempo_ciclo_secondi = models.PositiveBigIntegerField(default=0, verbose_name="Tempo di ciclo totale (s)")
+    tempo_ciclo_task = models.PositiveIntegerField(default=0, verbose_name="Task con tempo di ciclo")
+    # ID dell'ultima transizione aggregata, punto di ripresa del rollup incrementale
+    ultima_transizione = models.BigIntegerField(default=0, db_index=True)
+
+    class Meta:
+        ordering = ['progetto', 'giorno']
+        verbose_name = "Snapshot giornaliero"
+        verbose_name_plural = "Snapshot giornalieri"
+        constraints = [
+            models.UniqueConstraint(fields=['progetto', 'giorno'], name='snapshot_progetto_giorno_unq'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.progetto_id} - {self.giorno}"
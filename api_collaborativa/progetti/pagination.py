@@ -0,0 +1,117 @@
+import base64
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class OptionalKeysetPagination(PageNumberPagination):
+    """
+    Paginazione a pagine numerate (default) con modalità keyset opzionale.
+
+    Se la request contiene il parametro `cursor` (anche vuoto, per la prima pagina)
+    la lista viene paginata sulla chiave stabile `(data_creazione, id)` in ordine
+    decrescente: nessun `COUNT(*)` e nessun `OFFSET`, quindi ogni pagina ha lo
+    stesso costo indipendentemente da quanto il client sia andato avanti.
+
+    Le view possono indicare una chiave diversa per le proprie azioni con
+    `ordinamenti_keyset` (es. `{'overdue': ('scadenza', 'id')}`): il primo campo
+    deve essere una data non nulla, il secondo l'ID.
+
+    ## Risposta in modalità cursor
+    ```json
+    {
+        "next": "http://.../api/tasks/?cursor=MjAyNS0wNy0yMFQw...",
+        "results": [...]
+    }
+    ```
+    """
+
+    cursor_query_param = 'cursor'
+    ordinamento = ('-data_creazione', '-id')
+
+    def keyset_attivo(self, request):
+        return self.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.keyset_attivo(request)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.ordinamento_keyset = self._ordinamento(view)
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        # Un elemento in più per sapere se esiste una pagina successiva
+        risultati = list(self._queryset_keyset(queryset, request)[:page_size + 1])
+        return self._pagina_keyset(risultati, page_size)
+
+    def _ordinamento(self, view):
+        """Chiave keyset dell'azione della view, quella di default se non indicata"""
+        ordinamenti = getattr(view, 'ordinamenti_keyset', None) or {}
+        return ordinamenti.get(getattr(view, 'action', None), self.ordinamento)
+
+    def _queryset_keyset(self, queryset, request):
+        """Ordina il queryset sulla chiave keyset e lo filtra a partire dal cursor"""
+        queryset = queryset.order_by(*self.ordinamento_keyset)
+        posizione = self.decodifica_cursor(request.query_params.get(self.cursor_query_param))
+        if posizione is not None:
+            valore, pk = posizione
+            campo = self.ordinamento_keyset[0]
+            confronto = 'lt' if campo.startswith('-') else 'gt'
+            campo = campo.lstrip('-')
+            queryset = queryset.filter(
+                Q(**{f'{campo}__{confronto}': valore}) |
+                Q(**{campo: valore, f'pk__{confronto}': pk})
+            )
+        return queryset
+
+    def _pagina_keyset(self, risultati, page_size):
+        self.ha_successiva = len(risultati) > page_size
+        risultati = risultati[:page_size]
+        self.ultimo = risultati[-1] if risultati else None
+        return risultati
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.ha_successiva or self.ultimo is None:
+            return None
+        url = self.request.build_absolute_uri()
+        campo = self.ordinamento_keyset[0].lstrip('-')
+        cursor = self.codifica_cursor(getattr(self.ultimo, campo), self.ultimo.pk)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    @staticmethod
+    def codifica_cursor(istante, pk):
+        valore = f'{istante.isoformat()}|{pk}'
+        return base64.urlsafe_b64encode(valore.encode()).decode()
+
+    @staticmethod
+    def decodifica_cursor(cursor):
+        """Restituisce la coppia (valore della chiave, id) del cursor, None per la prima pagina"""
+        if not cursor:
+            return None
+        try:
+            valore = base64.urlsafe_b64decode(cursor.encode()).decode()
+            data, pk = valore.rsplit('|', 1)
+            istante = parse_datetime(data)
+            if istante is None:
+                raise ValueError(data)
+            return istante, int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound('Cursor non valido')
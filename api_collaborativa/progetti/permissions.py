@@ -1,6 +1,5 @@
 from rest_framework import permissions
-from .models import Progetto
-import logging
+from .membership import is_member_id
 class IsProjectOwner(permissions.BasePermission):
     """
     Permesso personalizzato per verificare se l'utente è il proprietario del progetto.
@@ -11,7 +10,7 @@ class IsProjectOwner(permissions.BasePermission):
         """ Verifico chi ha i permessi per modificare il progetto oppure solo leggerne i dati"""
         # Permessi di lettura per tutti i membri del progetto
         if request.method in permissions.SAFE_METHODS:
-            return obj.is_member(request.user)
+            return obj.is_member(request.user, request)
 
         # Permessi di scrittura solo per il proprietario
         return obj.proprietario == request.user
@@ -26,11 +25,11 @@ class IsProjectMember(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         # Per i progetti
         if hasattr(obj, 'proprietario'):
-            return obj.is_member(request.user)
+            return obj.is_member(request.user, request)
 
         # Per i task - verifico se l'utente è membro del progetto
         if hasattr(obj, 'progetto'):
-            return obj.progetto.is_member(request.user)
+            return obj.progetto.is_member(request.user, request)
 
         return False
 
@@ -43,23 +42,19 @@ class CanModifyTask(permissions.BasePermission):
     """
 
     def has_permission(self, request, view):
-        # Per la creazione di task, verifico se l'utente è membro del progetto
-        if request.method == 'POST':
+        # Per la creazione di task, verifico se l'utente è membro del progetto.
+        # Le operazioni massive verificano i permessi per progetto nella view.
+        if request.method == 'POST' and getattr(view, 'action', None) == 'create':
             project_id = request.data.get('progetto')
             if project_id:
-                try:
-
-                    progetto = Progetto.objects.get(id=project_id)
-                    return progetto.is_member(request.user)
-                except Progetto.DoesNotExist:
-                    logging.warning("Il progetto richiesto non esiste nel Database")
-                    return False
+                # Una sola query EXISTS: falso anche se il progetto non esiste
+                return is_member_id(project_id, request.user, request)
         return True
 
     def has_object_permission(self, request, view, obj):
         # Lettura: tutti i membri del progetto
         if request.method in permissions.SAFE_METHODS:
-            return obj.progetto.is_member(request.user)
+            return obj.progetto.is_member(request.user, request)
 
         # Modifica/Eliminazione:
         # 1. Proprietario del progetto
@@ -70,9 +65,8 @@ class CanModifyTask(permissions.BasePermission):
                     obj.autore == request.user)
 
         # Per PUT/PATCH
-        return (obj.progetto.proprietario == request.user or
-                obj.autore == request.user or
-                request.user in obj.progetto.collaboratori.all())
+        return (obj.autore == request.user or
+                obj.progetto.is_member(request.user, request))
 
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
@@ -0,0 +1,35 @@
+"""
+Renderer JSON basato su `orjson`, con lo stesso output di `JSONRenderer` di DRF.
+
+`orjson` (opzionale) codifica liste e dizionari di tipi nativi in C, molto più velocemente
+di `json.dumps` con l'encoder di DRF. Tutto ciò che potrebbe essere codificato in modo
+diverso (date, Decimal, oggetti non nativi, indentazione richiesta dal client) è delegato
+al renderer di DRF, così come l'intera risposta se `orjson` non è installato.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _non_nativo(valore):
+    raise TypeError(type(valore).__name__)
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data, default=_non_nativo,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS,
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Come JSONRenderer: \u2028 e \u2029 sempre con escape
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,153 @@
+"""
+Letture delle GET dalle repliche del database (``DATABASE_REPLICHE``).
+
+Le view che usano `ReplicaReadMixin` (o il decoratore `legge_da_replica`) marcano le
+richieste con metodo sicuro: per la loro durata `ReplicaRouter` invia le letture a una
+replica scelta a caso, la stessa per tutta la richiesta. Le scritture vanno sempre sul
+database ``default`` e restano su ``default``:
+
+- le letture successive a una scrittura nella stessa richiesta;
+- le letture dentro una transazione aperta su ``default``;
+- tutte le letture di un utente per ``REPLICA_STICKY_SECONDI`` secondi dopo una sua
+  richiesta di modifica, così che veda subito le proprie scritture anche se la replica
+  è in ritardo (read-your-writes). Il momento dell'ultima scrittura è nella cache
+  ``condivisa`` (vedi ``CACHE_CONDIVISA_URL``), visibile a tutti i processi del server.
+
+Una risposta in streaming (es. l'export dei task) legge dalla replica della richiesta
+anche mentre il contenuto viene prodotto, dopo la fine della view. I dati letti da una
+replica, che può essere in ritardo, sono memorizzati nelle cache tra richieste solo se
+le loro versioni non sono cambiate negli ultimi ``REPLICA_STICKY_SECONDI`` secondi, il
+ritardo massimo ammesso per le repliche (vedi `memorizzabile`).
+
+Senza repliche configurate tutte le letture restano su ``default``.
+"""
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework import permissions
+
+from . import versioni
+
+# Replica usata dalle letture della richiesta corrente (None = default)
+_replica = ContextVar('replica', default=None)
+
+
+def _chiave_scrittura(user_id):
+    return f'repliche:scrittura:{user_id}'
+
+
+def _cache():
+    return caches['condivisa']
+
+
+def _scrittura_recente(user):
+    return bool(user.is_authenticated and settings.REPLICA_STICKY_SECONDI
+                and _cache().get(_chiave_scrittura(user.pk)))
+
+
+def _replica_attiva():
+    """Replica a cui vanno ora le letture, None se vanno a default"""
+    replica = _replica.get()
+    if replica is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return None
+    return replica
+
+
+def in_replica():
+    """True se le letture correnti vanno a una replica"""
+    return _replica_attiva() is not None
+
+
+def memorizzabile(valori_versioni):
+    """
+    True se i dati che la richiesta legge ora possono essere memorizzati in cache con le
+    versioni `valori_versioni`, lette prima della query (vedi `progetti.versioni`): sempre
+    se letti da default, da una replica solo se nessuna versione è cambiata di recente.
+    """
+    return not in_replica() or versioni.invariate_da(valori_versioni, settings.REPLICA_STICKY_SECONDI)
+
+
+def _legge_da(replica, contenuto):
+    """Itera `contenuto` con le letture sulla replica, anche in un contesto diverso dalla richiesta"""
+    iteratore = iter(contenuto)
+    while True:
+        token = _replica.set(replica)
+        try:
+            blocco = next(iteratore)
+        except StopIteration:
+            return
+        finally:
+            _replica.reset(token)
+        yield blocco
+
+
+def inizia(request):
+    """
+    Attiva le letture da replica per una richiesta con metodo sicuro, se l'utente non ha
+    scritto di recente.
+    :return: token da passare a `termina`
+    """
+    repliche = settings.DATABASE_REPLICHE
+    if not repliche or request.method not in permissions.SAFE_METHODS or _scrittura_recente(request.user):
+        return None
+    return _replica.set(random.choice(repliche))
+
+
+def termina(request, token, response=None):
+    """
+    Ripristina le letture su default e, dopo una richiesta di modifica, avvia la finestra
+    read-your-writes. Se `response` è in streaming il suo contenuto continua a leggere
+    dalla replica della richiesta.
+    """
+    replica = _replica.get()
+    if token is not None:
+        _replica.reset(token)
+    if replica is not None and response is not None and response.streaming:
+        response.streaming_content = _legge_da(replica, response.streaming_content)
+    if request.method not in permissions.SAFE_METHODS and request.user.is_authenticated \
+            and settings.REPLICA_STICKY_SECONDI:
+        _cache().set(_chiave_scrittura(request.user.pk), True, settings.REPLICA_STICKY_SECONDI)
+
+
+def legge_da_replica(vista):
+    """Decoratore delle view funzione di DRF (sotto `@api_view`): come `ReplicaReadMixin`"""
+    @wraps(vista)
+    def wrapper(request, *args, **kwargs):
+        token = inizia(request)
+        response = None
+        try:
+            response = vista(request, *args, **kwargs)
+            return response
+        finally:
+            termina(request, token, response)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Router delle letture verso la replica della richiesta corrente (vedi modulo)"""
+
+    def db_for_read(self, model, **hints):
+        return _replica_attiva()
+
+    def db_for_write(self, model, **hints):
+        # Dopo una scrittura la richiesta legge solo da default
+        if _replica.get() is not None:
+            _replica.set(None)
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Le repliche contengono gli stessi dati di default
+        database = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICHE}
+        if obj1._state.db in database and obj2._state.db in database:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Lo schema delle repliche arriva dalla replicazione di default
+        if db in settings.DATABASE_REPLICHE:
+            return False
+        return None
@@ -0,0 +1,103 @@
+"""
+Cache delle risposte di `GET /projects/` e `GET /projects/{id}/stats/` per utente.
+
+La chiave di una risposta contiene l'utente, l'URL completo della richiesta (host,
+parametri) e la versione di ciascun progetto incluso nella risposta. Ogni scrittura
+che modifica un progetto (task, dati del progetto, collaboratori, utenti mostrati)
+rigenera la versione del progetto (vedi ``progetti.signals`` e `registra_modifiche`):
+le risposte memorizzate in precedenza diventano irraggiungibili e non sono mai servite.
+
+La versione è rigenerata subito e di nuovo al commit della transazione: una lettura
+concorrente che memorizza i dati precedenti al commit li associa a una versione già
+superata. Le risposte sono nella cache ``risposte`` (LocMem per processo, al massimo
+``RISPOSTE_CACHE_DIMENSIONE`` voci per ``RISPOSTE_CACHE_TIMEOUT`` secondi); le versioni
+sono nella cache ``condivisa`` (vedi ``progetti.versioni``): una scrittura in un processo
+rende irraggiungibili le risposte memorizzate da tutti i processi.
+"""
+import hashlib
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import repliche, versioni as versioni_cache
+
+_lock = threading.Lock()
+_metriche = {'hit': 0, 'miss': 0, 'invalidazioni': 0}
+
+
+def _cache():
+    return caches['risposte']
+
+
+def _chiave_versione(progetto_id):
+    return f'progetti:risposte:{progetto_id}:versione'
+
+
+def versioni(progetto_ids):
+    """Versioni correnti dei progetti (vedi `progetti.versioni.leggi`)"""
+    return versioni_cache.leggi([_chiave_versione(pk) for pk in progetto_ids])
+
+
+def _rigenera(progetto_ids):
+    versioni_cache.rigenera([_chiave_versione(pk) for pk in progetto_ids])
+
+
+def invalida(progetto_ids):
+    """Rigenera la versione dei progetti, subito e al commit della transazione corrente"""
+    progetto_ids = {pk for pk in progetto_ids if pk is not None}
+    if not progetto_ids:
+        return
+    _rigenera(progetto_ids)
+    transaction.on_commit(lambda: _rigenera(progetto_ids))
+    with _lock:
+        _metriche['invalidazioni'] += 1
+
+
+def in_cache(request, tipo, progetti, vista):
+    """
+    Risposta di `vista()` memorizzata per l'utente, l'URL della richiesta e le versioni dei
+    progetti restituiti da `progetti()`. Sono memorizzate solo le risposte 200; quelle lette
+    da una replica solo se i progetti non sono cambiati di recente (`repliche.memorizzabile`).
+    """
+    if not settings.RISPOSTE_CACHE_TIMEOUT:
+        return vista()
+
+    progetto_ids = progetti()
+    versioni_lette = versioni(progetto_ids)
+    impronta = hashlib.sha1(
+        '|'.join([request.build_absolute_uri(), *map(str, progetto_ids), *versioni_lette]).encode()
+    ).hexdigest()
+    chiave = f'progetti:risposte:{tipo}:{request.user.pk}:{impronta}'
+    cache = _cache()
+
+    dati = cache.get(chiave)
+    if dati is not None:
+        with _lock:
+            _metriche['hit'] += 1
+        return Response(dati)
+
+    with _lock:
+        _metriche['miss'] += 1
+    memorizza = repliche.memorizzabile(versioni_lette)
+    response = vista()
+    if memorizza and response.status_code == status.HTTP_200_OK:
+        cache.set(chiave, response.data)
+        logging.debug(f"Risposta {tipo} memorizzata per l'utente {request.user.pk}")
+    return response
+
+
+def metriche():
+    """Hit, miss e invalidazioni dall'avvio del processo, con dimensione e durata della cache"""
+    with _lock:
+        richieste = _metriche['hit'] + _metriche['miss']
+        return {
+            'dimensione': settings.RISPOSTE_CACHE_DIMENSIONE,
+            'timeout': settings.RISPOSTE_CACHE_TIMEOUT,
+            **_metriche,
+            'hit_ratio': round(_metriche['hit'] / richieste, 3) if richieste else None,
+        }
@@ -0,0 +1,68 @@
+"""
+Ricerca full-text su titolo e descrizione di task e progetti.
+
+- PostgreSQL: colonna `search_vector` (tsvector) mantenuta da un trigger e indicizzata
+  con GIN; i risultati sono ordinati con `ts_rank`.
+- SQLite: tabelle virtuali FTS5 a contenuto esterno, mantenute da trigger; i risultati
+  sono ordinati con `bm25`.
+
+Colonne, indici e trigger sono creati dalla migrazione `0007_ricerca_full_text`.
+La ricerca restituisce sempre un queryset del modello, filtrabile con `accessibili_a`.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+# Configurazione testuale di PostgreSQL usata dal trigger e dalle query
+CONFIGURAZIONE_TS = 'italian'
+
+_PAROLA = re.compile(r'\w+', re.UNICODE)
+
+
+def parole(testo):
+    """Termini della ricerca, senza la sintassi speciale dei motori full-text"""
+    return _PAROLA.findall(testo or '')
+
+
+def _query_fts5(termini):
+    # Ogni termine è cercato come prefisso: "progett"* trova progetto e progetti
+    return ' AND '.join(f'"{termine}"*' for termine in termini)
+
+
+def cerca(queryset, testo):
+    """
+    Filtra il queryset sui record che contengono tutti i termini di `testo`
+    e lo annota con `rilevanza` (valori maggiori = più rilevante).
+    :param queryset: queryset di Task o Progetto
+    :return: queryset ordinato per rilevanza, vuoto se il testo non contiene termini
+    """
+    termini = parole(testo)
+    if not termini:
+        return queryset.none()
+
+    tabella = queryset.model._meta.db_table
+    if connection.vendor == 'postgresql':
+        tsquery = f"plainto_tsquery('{CONFIGURAZIONE_TS}', %s)"
+        corrispondenze = RawSQL(
+            f'SELECT id FROM {tabella} WHERE search_vector @@ {tsquery}', [' '.join(termini)]
+        )
+        rilevanza = RawSQL(
+            f'ts_rank({tabella}.search_vector, {tsquery})', [' '.join(termini)],
+            output_field=FloatField()
+        )
+    elif connection.vendor == 'sqlite':
+        fts = f'{tabella}_fts'
+        query = _query_fts5(termini)
+        corrispondenze = RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [query])
+        # bm25 è negativo e minore per i risultati migliori; i pesi delle colonne
+        # seguono quelli di setweight su PostgreSQL (titolo 'A', descrizione 'B')
+        rilevanza = RawSQL(
+            f'SELECT -bm25({fts}, 1.0, 0.4) FROM {fts} WHERE {fts} MATCH %s AND rowid = {tabella}.id',
+            [query], output_field=FloatField()
+        )
+    else:
+        raise NotImplementedError(f'Ricerca full-text non disponibile per {connection.vendor}')
+
+    return queryset.filter(pk__in=corrispondenze).annotate(rilevanza=rilevanza).order_by('-rilevanza', '-id')
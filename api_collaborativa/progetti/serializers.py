@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.db.models import Prefetch
 from .models import Progetto, Task
 
 
@@ -12,13 +13,94 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class DynamicFieldsMixin:
+    """
+    Permette al client di scegliere i campi restituiti e le relazioni da espandere.
+
+    Il context può contenere:
+    - `fields`: insieme dei campi da restituire (None = tutti)
+    - `expand`: insieme delle relazioni da restituire come oggetti annidati; le altre
+      relazioni sono restituite come ID (None = tutte espanse, comportamento predefinito)
+    """
+
+    # relazione -> True se molti-a-molti
+    campi_espandibili = {}
+    # campo del serializer -> colonne del modello necessarie per calcolarlo
+    colonne = {}
+    # colonne sempre lette (permessi, paginazione)
+    colonne_obbligatorie = ['id']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        campi = self.context.get('fields')
+        espansioni = self.context.get('expand')
+
+        if campi is not None:
+            for nome in list(self.fields):
+                if nome not in campi and not self.fields[nome].write_only:
+                    self.fields.pop(nome)
+
+        if espansioni is not None:
+            for nome, many in self.campi_espandibili.items():
+                if nome in self.fields and nome not in espansioni:
+                    self.fields[nome] = serializers.PrimaryKeyRelatedField(read_only=True, many=many)
+
+    @classmethod
+    def ottimizza_queryset(cls, queryset, campi=None, espansioni=None):
+        """
+        Adatta il queryset ai campi richiesti: join e prefetch solo per le relazioni
+        espanse e, se `campi` è indicato, lettura delle sole colonne necessarie.
+        """
+        def richiesto(nome):
+            return campi is None or nome in campi
+
+        def espanso(nome):
+            return richiesto(nome) and (espansioni is None or nome in espansioni)
+
+        join, prefetch = [], []
+        for relazione, many in cls.campi_espandibili.items():
+            if not richiesto(relazione):
+                continue
+            if many:
+                prefetch.append(relazione if espanso(relazione) else
+                                Prefetch(relazione, queryset=User.objects.only('id')))
+            elif espanso(relazione):
+                join.append(relazione)
+
+        if join:
+            queryset = queryset.select_related(*join)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+
+        if campi is not None:
+            colonne = set(cls.colonne_obbligatorie)
+            for campo in campi:
+                colonne.update(cls.colonne.get(campo, ()))
+            for relazione in join:
+                colonne.update(f'{relazione}__{campo}' for campo in UserSerializer.Meta.fields)
+            queryset = queryset.only(*colonne)
+        return queryset
+
+
+class TaskSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer per i task con informazioni dettagliate"""
 
+    campi_espandibili = {'autore': False, 'assegnatario': False}
+    colonne = {
+        'titolo': ['titolo'],
+        'descrizione': ['descrizione'],
+        'stato': ['stato'],
+        'scadenza': ['scadenza'],
+        'assegnatario': ['assegnatario'],
+        'check_ritardo': ['scadenza', 'stato'],
+        'data_aggiornamento': ['data_aggiornamento'],
+    }
+    colonne_obbligatorie = ['id', 'progetto', 'autore', 'data_creazione']
+
     autore = UserSerializer(read_only=True)
     assegnatario = UserSerializer(read_only=True)
     assigned_to_id  = serializers.IntegerField(write_only=True, required=False, allow_null=True)
-    check_ritardo = serializers.BooleanField(read_only=True)
+    check_ritardo = serializers.SerializerMethodField()
 
     class Meta:
         model = Task
@@ -29,19 +111,23 @@ class TaskSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'autore', 'data_creazione', 'data_aggiornamento']
 
+    def get_check_ritardo(self, obj) -> bool:
+        """Usa l'annotazione `in_ritardo` calcolata dal database, se presente"""
+        in_ritardo = getattr(obj, 'in_ritardo', None)
+        if in_ritardo is None:
+            return obj.check_ritardo()
+        return bool(in_ritardo)
+
     def validate_assigned_to_id(self, value):
         """Verifica che l'utente assegnato sia membro del progetto"""
         if value is not None:
             progetto = self.context.get('progetto')
-            if progetto:
-                try:
-                    user = User.objects.get(id=value)
-                    if not progetto.is_member(user):
-                        raise serializers.ValidationError(
-                            "L'utente deve essere membro del progetto"
-                        )
-                except User.DoesNotExist:
+            if progetto and not progetto.is_member(value, self.context.get('request')):
+                if not User.objects.filter(id=value).exists():
                     raise serializers.ValidationError("Utente non trovato")
+                raise serializers.ValidationError(
+                    "L'utente deve essere membro del progetto"
+                )
         return value
 
     def create(self, validated_data):
@@ -53,7 +139,7 @@ class TaskSerializer(serializers.ModelSerializer):
 
         # Gestisce l'assegnazione
         if assigned_to_id:
-            validated_data['assigned_to_id'] = assigned_to_id
+            validated_data['assegnatario_id'] = assigned_to_id
 
         return super().create(validated_data)
 
@@ -61,18 +147,45 @@ class TaskSerializer(serializers.ModelSerializer):
         """Aggiorna un task gestendo l'assegnazione"""
         assigned_to_id = validated_data.pop('assigned_to_id', None)
 
+        # L'annotazione letta prima della modifica non è più valida
+        instance.__dict__.pop('in_ritardo', None)
+
         if assigned_to_id is not None:
             if assigned_to_id:
-                instance.assigned_to_id = assigned_to_id
+                instance.assegnatario_id = assigned_to_id
             else:
-                instance.assigned_to = None
+                instance.assegnatario = None
 
         return super().update(instance, validated_data)
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class TaskBulkSerializer(TaskSerializer):
+    """
+    Serializer per le operazioni massive sui task.
+    Progetto e assegnatario sono validati come semplici ID: l'esistenza del progetto,
+    i permessi e l'appartenenza dell'assegnatario sono verificati in blocco dalla view.
+    """
+
+    progetto = serializers.IntegerField(source='progetto_id')
+
+    def validate_assigned_to_id(self, value):
+        return value
+
+
+class ProjectSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Serializer per i progetti"""
 
+    campi_espandibili = {'proprietario': False, 'collaboratori': True}
+    colonne = {
+        'nome': ['nome'],
+        'descrizione': ['descrizione'],
+        'percentuale_completamento': ['conteggio_todo', 'conteggio_in_progress', 'conteggio_done'],
+        'task_totali': ['conteggio_todo', 'conteggio_in_progress', 'conteggio_done'],
+        'done_tasks': ['conteggio_done'],
+        'data_aggiornamento': ['data_aggiornamento'],
+    }
+    colonne_obbligatorie = ['id', 'proprietario', 'data_creazione']
+
     proprietario = UserSerializer(read_only=True)
     collaboratori = UserSerializer(many=True, read_only=True)
     id_collaboratori = serializers.ListField(
@@ -151,4 +264,33 @@ class ProjectStatsSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'nome', 'percentuale_completamento', 'task_totali',
             'done_tasks', 'in_progress_tasks', 'todo_tasks'
-        ]
\ No newline at end of file
+        ]
+
+
+class DashboardProgettoSerializer(ProjectStatsSerializer):
+    """Riga della dashboard: statistiche del progetto con il numero di task in ritardo"""
+
+    task_in_ritardo = serializers.IntegerField(read_only=True)
+
+    class Meta(ProjectStatsSerializer.Meta):
+        fields = ProjectStatsSerializer.Meta.fields + ['task_in_ritardo']
+
+
+class RisultatoProgettoSerializer(serializers.ModelSerializer):
+    """Progetto restituito dalla ricerca full-text"""
+
+    rilevanza = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Progetto
+        fields = ['id', 'nome', 'descrizione', 'rilevanza']
+
+
+class RisultatoTaskSerializer(serializers.ModelSerializer):
+    """Task restituito dalla ricerca full-text"""
+
+    rilevanza = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Task
+        fields = ['id', 'titolo', 'descrizione', 'stato', 'progetto', 'rilevanza']
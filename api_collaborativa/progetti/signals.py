@@ -0,0 +1,136 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_delete, post_delete, post_save, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import membership, risposte
+from .models import Progetto, Rimozione, Task, registra_modifiche
+from .serializers import UserSerializer
+
+# Campi degli utenti restituiti annidati nei progetti
+CAMPI_UTENTE_MOSTRATI = set(UserSerializer.Meta.fields)
+
+
+@receiver(pre_delete, sender=User)
+def memorizza_progetti_autore(sender, instance, **kwargs):
+    """
+    L'eliminazione di un utente cancella a cascata i suoi task senza passare da
+    Task.delete: memorizzo i task coinvolti per registrarne l'eliminazione e
+    riallineare i contatori.
+    """
+    instance._task_da_eliminare = Task.objects.filter(autore=instance)._stati_correnti()
+
+
+@receiver(post_delete, sender=User)
+def ricalcola_contatori_autore(sender, instance, **kwargs):
+    """Registra l'eliminazione dei task dell'utente (transizioni ed eventi) e riallinea i contatori
+    dei progetti coinvolti"""
+    eliminati = getattr(instance, '_task_da_eliminare', None)
+    if not eliminati:
+        return
+    # I progetti di cui l'utente era proprietario sono stati eliminati insieme ai loro task
+    progetti = set(
+        Progetto.objects.filter(
+            pk__in={progetto_id for progetto_id, _ in eliminati.values()}
+        ).values_list('pk', flat=True)
+    )
+    registra_modifiche([
+        (pk, originale, None) for pk, originale in eliminati.items() if originale[0] in progetti
+    ], contatori=False)
+    Progetto.objects.filter(pk__in=progetti).ricalcola_contatori()
+
+
+@receiver(post_save, sender=Progetto)
+@receiver(post_delete, sender=Progetto)
+def invalida_membri_progetto(sender, instance, **kwargs):
+    """Un cambio di proprietario (o l'eliminazione) modifica i membri del progetto"""
+    membership.invalida(instance.pk)
+
+
+@receiver(post_save, sender=Progetto)
+@receiver(post_delete, sender=Progetto)
+def invalida_risposte_progetto(sender, instance, **kwargs):
+    """Le risposte memorizzate con il progetto non sono più valide"""
+    risposte.invalida([instance.pk])
+
+
+@receiver(post_save, sender=User)
+def invalida_risposte_utente(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Username, email e nome degli utenti sono mostrati nelle risposte dei progetti di cui
+    sono proprietari o collaboratori: se cambiano, quelle risposte non sono più valide.
+    """
+    if created or (update_fields is not None and not CAMPI_UTENTE_MOSTRATI & set(update_fields)):
+        return
+    risposte.invalida(Progetto.objects.accessibili_a(instance).values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=User)
+def memorizza_progetti_utente(sender, instance, **kwargs):
+    """
+    L'eliminazione di un utente rimuove a cascata le sue collaborazioni senza `m2m_changed`:
+    memorizzo i progetti per invalidarne le risposte.
+    """
+    instance._progetti_risposte = list(Progetto.objects.accessibili_a(instance).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=User)
+def invalida_risposte_utente_eliminato(sender, instance, **kwargs):
+    risposte.invalida(getattr(instance, '_progetti_risposte', []))
+
+
+@receiver(pre_delete, sender=Progetto)
+def memorizza_membri_progetto(sender, instance, **kwargs):
+    """Memorizzo i membri del progetto per registrarne la rimozione dopo l'eliminazione"""
+    instance._membri_rimossi = [
+        instance.proprietario_id, *instance.collaboratori.values_list('pk', flat=True)
+    ]
+
+
+@receiver(post_delete, sender=Progetto)
+def registra_rimozione_progetto(sender, instance, **kwargs):
+    """Tombstone del progetto eliminato per ciascuno dei suoi membri"""
+    Rimozione.objects.bulk_create(
+        Rimozione.per_progetto(instance.pk, getattr(instance, '_membri_rimossi', []))
+    )
+
+
+@receiver(m2m_changed, sender=Progetto.collaboratori.through)
+def aggiorna_membri_collaboratori(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Ad ogni modifica dei collaboratori (add/remove/set/clear) invalida la cache dei membri e
+    le risposte memorizzate e aggiorna `data_aggiornamento` dei progetti coinvolti, usata come
+    versione per le GET condizionali.
+    Le rimozioni sono registrate come tombstone per la sincronizzazione incrementale.
+    """
+    rimozioni = []
+    if not reverse:
+        progetti = [instance.pk] if action in ('post_add', 'post_remove', 'post_clear') else []
+        if action == 'pre_clear':
+            instance._collaboratori_rimossi = list(instance.collaboratori.values_list('pk', flat=True))
+        elif action == 'post_remove':
+            rimozioni = Rimozione.per_progetto(instance.pk, pk_set or ())
+        elif action == 'post_clear':
+            rimozioni = Rimozione.per_progetto(instance.pk, getattr(instance, '_collaboratori_rimossi', []))
+    elif action == 'pre_clear':
+        # Lato inverso (user.collaboratori_progetti): memorizzo i progetti prima della rimozione
+        instance._progetti_collaborazione = list(
+            instance.collaboratori_progetti.values_list('pk', flat=True)
+        )
+        progetti = []
+    elif action in ('post_add', 'post_remove'):
+        progetti = list(pk_set or ())
+    elif action == 'post_clear':
+        progetti = getattr(instance, '_progetti_collaborazione', [])
+    else:
+        progetti = []
+
+    if not progetti:
+        return
+    if reverse and action in ('post_remove', 'post_clear'):
+        rimozioni = [r for p in progetti for r in Rimozione.per_progetto(p, [instance.pk])]
+    Rimozione.objects.bulk_create(rimozioni)
+    Progetto.objects.filter(pk__in=progetti).update(data_aggiornamento=timezone.now())
+    risposte.invalida(progetti)
+    for progetto_id in progetti:
+        membership.invalida(progetto_id)
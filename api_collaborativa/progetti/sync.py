@@ -0,0 +1,72 @@
+"""
+Sincronizzazione incrementale per i client offline (`GET /changes/`).
+
+Ogni flusso (progetti, task, rimozioni) è letto in ordine di `(data_aggiornamento, id)`
+(`(data, id)` per le rimozioni) a partire dalla posizione salvata nel cursore, con una
+paginazione keyset servita dagli indici sulle stesse colonne. Il cursore è opaco per il
+client: contiene la posizione raggiunta in ciascun flusso.
+
+Una transazione ancora aperta può salvare righe con una data precedente a quella già
+letta: a fine lettura la posizione avanza solo fino a `MARGINE_SYNC` secondi fa, e le
+righe più recenti vengono inviate di nuovo alla richiesta successiva (il client le
+applica come upsert, senza effetti).
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+
+FLUSSI = ('progetti', 'task', 'rimozioni')
+
+# Righe restituite al massimo per flusso in una risposta
+SYNC_LIMITE = 500
+
+# Ritardo massimo atteso tra la data di una scrittura e il suo commit
+MARGINE_SYNC = timedelta(seconds=5)
+
+
+def codifica_cursore(posizioni):
+    """Cursore opaco a partire dalle posizioni `(data, id)` di ciascun flusso"""
+    dati = {flusso: [data.isoformat(), pk] for flusso, (data, pk) in posizioni.items()}
+    return base64.urlsafe_b64encode(json.dumps(dati, separators=(',', ':')).encode()).decode()
+
+
+def decodifica_cursore(cursore):
+    """
+    Posizioni contenute nel cursore.
+    :raise ValueError: se il cursore non è valido
+    """
+    try:
+        dati = json.loads(base64.urlsafe_b64decode(cursore.encode()))
+        posizioni = {flusso: (datetime.fromisoformat(dati[flusso][0]), int(dati[flusso][1])) for flusso in FLUSSI}
+    except (TypeError, KeyError, IndexError, AttributeError, UnicodeError, json.JSONDecodeError) as exc:
+        raise ValueError(cursore) from exc
+    if any(data.tzinfo is None for data, _ in posizioni.values()):
+        raise ValueError(cursore)
+    return posizioni
+
+
+def leggi_flusso(queryset, campo, posizione, adesso, limite=None):
+    """
+    Righe del flusso successive alla posizione, in ordine di `(campo, id)`.
+    :param posizione: coppia `(data, id)` già letta dal client, None per leggere dall'inizio
+    :param limite: righe lette al massimo (default SYNC_LIMITE)
+    :return: terna (righe, nuova posizione, True se sono rimaste righe da leggere)
+    """
+    if posizione is not None:
+        data, pk = posizione
+        queryset = queryset.filter(Q(**{f'{campo}__gt': data}) | Q(**{campo: data, 'pk__gt': pk}))
+    limite = limite or SYNC_LIMITE
+    righe = list(queryset.order_by(campo, 'pk')[:limite + 1])
+
+    if len(righe) > limite:
+        righe = righe[:limite]
+        ultima = righe[-1]
+        return righe, (getattr(ultima, campo), ultima.pk), True
+
+    # Letto tutto: la posizione avanza fino al margine, senza mai tornare indietro
+    nuova = (adesso - MARGINE_SYNC, 0)
+    if posizione is not None and posizione > nuova:
+        nuova = posizione
+    return righe, nuova, False
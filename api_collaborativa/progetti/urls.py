@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 # Router per ViewSets
 router = DefaultRouter()
@@ -12,4 +12,8 @@ router.register(r'tasks', views.TaskViewSet, basename='tasks')
 urlpatterns = [
     # Include router URLs
     path('', include(router.urls)),
+    path('search/', views.search, name='search'),
+    path('changes/', views.changes, name='changes'),
+    # Flusso SSE degli eventi dei task, da servire con l'applicazione ASGI
+    path('projects/<int:pk>/events/', async_views.AsyncProjectEventsView.as_view(), name='projects-events'),
 ]
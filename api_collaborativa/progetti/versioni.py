@@ -0,0 +1,56 @@
+"""
+Versioni dei dati memorizzati in cache per progetto (es. appartenenza ai progetti).
+
+I dati possono restare in una cache locale del processo, con la versione nella chiave;
+le versioni sono invece nella cache ``condivisa`` (vedi ``CACHE_CONDIVISA_URL``): una
+scrittura in un processo del server rigenera la versione e rende irraggiungibili i dati
+memorizzati da tutti i processi.
+
+Ogni versione contiene il momento in cui è stata generata: `invariate_da` indica se i
+dati non sono cambiati di recente (es. per memorizzare dati letti da una replica).
+"""
+import time
+import uuid
+
+from django.core.cache import caches
+
+
+def _cache():
+    return caches['condivisa']
+
+
+def _nuova():
+    return f'{time.time():.6f}:{uuid.uuid4().hex}'
+
+
+def leggi(chiavi):
+    """
+    Versioni correnti delle chiavi. Quelle assenti dalla cache (mai create o rimosse per
+    spazio) sono generate ora, rendendo irraggiungibili i dati memorizzati in precedenza.
+    """
+    cache = _cache()
+    trovate = cache.get_many(chiavi)
+    mancanti = [chiave for chiave in chiavi if chiave not in trovate]
+    if mancanti:
+        for chiave in mancanti:
+            cache.add(chiave, _nuova(), None)
+        trovate.update(cache.get_many(mancanti))
+    return [trovate.get(chiave, '') for chiave in chiavi]
+
+
+def rigenera(chiavi):
+    """Sostituisce le versioni delle chiavi con versioni nuove"""
+    _cache().set_many({chiave: _nuova() for chiave in chiavi}, None)
+
+
+def invariate_da(valori, secondi):
+    """True se tutte le versioni `valori` (lette con `leggi`) sono state generate almeno `secondi` secondi fa"""
+    limite = time.time() - secondi
+    for valore in valori:
+        try:
+            generata = float(valore.split(':', 1)[0])
+        except ValueError:
+            return False
+        if generata > limite:
+            return False
+    return True
@@ -1,19 +1,149 @@
 from rest_framework import viewsets, status, permissions
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q, Count, Case, When, IntegerField
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import timedelta
+from functools import partial
 import logging
 from drf_yasg.utils import swagger_auto_schema
 
 
-from .models import Progetto, Task
+from .models import CAMPI_CONTATORE, Progetto, Rimozione, Task
 from .serializers import (
-    ProjectSerializer, TaskSerializer, ProjectStatsSerializer
+    ProjectSerializer, TaskSerializer, TaskBulkSerializer, ProjectStatsSerializer,
+    DashboardProgettoSerializer, RisultatoProgettoSerializer, RisultatoTaskSerializer, UserSerializer
 )
 from .permissions import IsProjectOwner, IsProjectMember, CanModifyTask
+from .pagination import OptionalKeysetPagination
+from .conditional import calcola_etag, risposta_non_modificata, imposta_validatori
+from .export import FORMATI_EXPORT, risposta_export
+from .filters import TaskFilterBackend
+from .search import cerca
+from .analytics import serie_giornaliera
+from . import coalescenza, membership, repliche, risposte
+from .liste import ListaProgettiRapida, ListaTaskRapida
+from .sync import FLUSSI, MARGINE_SYNC, codifica_cursore, decodifica_cursore, leggi_flusso
 
-class ProjectViewSet(viewsets.ModelViewSet):
+# Numero predefinito e massimo di risultati per tipo restituiti dalla ricerca
+RICERCA_LIMITE = 20
+RICERCA_LIMITE_MASSIMO = 100
+
+# Giorni restituiti di default e al massimo dagli endpoint di analytics
+ANALYTICS_GIORNI = 30
+ANALYTICS_GIORNI_MASSIMI = 366
+
+class SparseFieldsetMixin:
+    """
+    Legge i parametri `fields` ed `expand` delle richieste GET (liste separate da virgola)
+    e li passa al serializer tramite il context.
+
+    - `?fields=id,nome` restituisce solo i campi indicati
+    - `?expand=proprietario` restituisce come oggetti annidati solo le relazioni indicate,
+      le altre come ID; senza `expand` tutte le relazioni sono espanse
+    """
+
+    def _parametro_lista(self, nome):
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return None
+        valore = request.query_params.get(nome)
+        if valore is None:
+            return None
+        return {v.strip() for v in valore.split(',') if v.strip()}
+
+    def campi_richiesti(self):
+        return self._parametro_lista('fields')
+
+    def espansioni_richieste(self):
+        return self._parametro_lista('expand')
+
+    def ottimizza_queryset(self, queryset, serializer_class):
+        """Riduce join, prefetch e colonne lette ai soli campi richiesti dal client"""
+        return serializer_class.ottimizza_queryset(
+            queryset, self.campi_richiesti(), self.espansioni_richieste()
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.campi_richiesti()
+        context['expand'] = self.espansioni_richieste()
+        return context
+
+
+class TaskExportMixin:
+    """
+    Export in streaming dei task con il parametro `export` (`ndjson` o `csv`).
+    Rispetta il parametro `fields`; la paginazione non viene applicata.
+    """
+
+    def formato_export(self):
+        return self.request.query_params.get('export')
+
+    def esporta_task(self, queryset, nome_file):
+        serializer = TaskSerializer(context=self.get_serializer_context())
+        response = risposta_export(queryset, self.formato_export(), serializer, nome_file)
+        if response is None:
+            logging.error("Formato di export non supportato")
+            return Response(
+                {'error': f"Formato di export non supportato, valori ammessi: {', '.join(FORMATI_EXPORT)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        logging.info(f"Export dei task in formato {self.formato_export()}")
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Le richieste con metodo sicuro leggono da una replica del database, quelle di modifica
+    avviano la finestra read-your-writes dell'utente (vedi `progetti.repliche`); l'export
+    in streaming legge dalla stessa replica fino alla fine del contenuto. L'utente è già
+    autenticato (su default) quando la replica viene scelta.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._replica = repliche.inizia(request)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        repliche.termina(request, getattr(self, '_replica', None), response)
+        self._replica = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class FastListMixin:
+    """
+    Liste in sola lettura servite da `liste.ListaRapida` (righe lette con `values_list`,
+    senza istanze dei modelli né serializer annidati), con gli stessi campi, paginazione
+    e JSON del serializer. Se il serializer non è gestito si usa il percorso di DRF.
+    """
+
+    lista_rapida_class = None
+
+    def lista_rapida(self, queryset):
+        """Risposta della lista per il queryset già filtrato, None se il serializer non è gestito"""
+        lista = self.lista_rapida_class.per_serializer(self.get_serializer())
+        if lista is None:
+            return None
+
+        righe = lista.queryset(queryset)
+        page = self.paginate_queryset(righe)
+        if page is not None:
+            return self.get_paginated_response(lista.serializza(page))
+        return Response(lista.serializza(list(righe)))
+
+    def list(self, request, *args, **kwargs):
+        response = self.lista_rapida(self.filter_queryset(self.get_queryset()))
+        if response is None:
+            return super().list(request, *args, **kwargs)
+        return response
+
+
+class ProjectViewSet(ReplicaReadMixin, SparseFieldsetMixin, TaskExportMixin, FastListMixin, viewsets.ModelViewSet):
     """
     API per la gestione dei progetti.
 
@@ -34,10 +164,21 @@ class ProjectViewSet(viewsets.ModelViewSet):
     - `nome` e `descrizione` sono obbligatori
     - `id_collaboratori` è facoltativo (array di ID utente)
     - `proprietario`, `collaboratori`, `task_totali` e `done_tasks` sono calcolati e non devono essere inviati
+
+    ### Parametri facoltativi delle GET
+    - `fields`: campi da restituire, es. `?fields=id,nome,task_totali`
+    - `expand`: relazioni da restituire come oggetti (`proprietario`, `collaboratori`),
+      le altre sono restituite come ID, es. `?expand=proprietario`
     """
 
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OptionalKeysetPagination
+    ordinamenti_keyset = {'overdue': ('scadenza', 'id')}
+    lista_rapida_class = ListaProgettiRapida
+
+    # Numero massimo di ID per lista in manage_collaborators
+    max_collaboratori_batch = 1000
 
     def get_queryset(self):
         """
@@ -46,11 +187,8 @@ class ProjectViewSet(viewsets.ModelViewSet):
           - proprietario (`proprietario`)
           - o collaboratore (`collaboratori`)
 
-          Ogni progetto viene annotato con statistiche relative ai task:
-          - task_totali
-          - done_tasks
-          - in_progress_tasks
-          - todo_tasks
+          Le statistiche sui task (task_totali, done_tasks, in_progress_tasks, todo_tasks)
+          sono lette dai contatori denormalizzati di `Progetto`, senza join sui task.
 
           ## Nota
           Se `swagger_fake_view` è attivo (durante la generazione dello schema), viene restituito un queryset vuoto.
@@ -60,45 +198,26 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
 
         user = self.request.user
-        return Progetto.objects.filter(
-            Q(proprietario=user) | Q(collaboratori=user)
-        ).annotate(
-            task_totali=Count('tasks'),
-            done_tasks=Count(
-                Case(
-                    When(tasks__stato='DONE', then=1),
-                    output_field=IntegerField()
-                )
-            ),
-            in_progress_tasks=Count(
-                Case(
-                    When(tasks__stato='IN_PROGRESS', then=1),
-                    output_field=IntegerField()
-                )
-            ),
-            todo_tasks=Count(
-                Case(
-                    When(tasks__stato='TODO', then=1),
-                    output_field=IntegerField()
-                )
-            )
-        ).prefetch_related(
-            'collaboratori',
-            'proprietario'
-        ).distinct()
+        queryset = Progetto.objects.accessibili_a(user).order_by('-data_creazione', '-id')
+        if self.action in ['list', 'retrieve', 'update', 'partial_update']:
+            # Utenti annidati serializzati solo dalle azioni che usano ProjectSerializer,
+            # limitati ai campi e alle relazioni richiesti con `fields` / `expand`
+            queryset = self.ottimizza_queryset(queryset, ProjectSerializer)
+        return queryset
 
     def get_permissions(self):
         """
         Applica permessi diversi in base all'azione eseguita:
 
-        - `update`, `partial_update`, `destroy`, `add_collaborator`, `remove_collaborator`:
+        - `update`, `partial_update`, `destroy`, `add_collaborator`, `remove_collaborator`, `manage_collaborators`:
           Richiede essere proprietario del progetto (`IsProjectOwner`)
         - `list`, `retrieve`:
           Richiede essere membro del progetto (`IsProjectMember`)
         - Altrimenti:
           Autenticazione base
         """
-        if self.action in ['update', 'partial_update', 'destroy', 'add_collaborator', 'remove_collaborator']:
+        if self.action in ['update', 'partial_update', 'destroy', 'add_collaborator', 'remove_collaborator',
+                           'manage_collaborators']:
             permission_classes = [permissions.IsAuthenticated, IsProjectOwner]
         elif self.action in ['retrieve', 'list']:
             permission_classes = [permissions.IsAuthenticated, IsProjectMember]
@@ -111,6 +230,113 @@ class ProjectViewSet(viewsets.ModelViewSet):
         """Assegna automaticamente il proprietario al progetto"""
         serializer.save(proprietario=self.request.user)
 
+    def _validatori(self, con_task=False):
+        """
+        Calcola l'ETag della risposta con query leggere, che verificano anche l'accesso dell'utente.
+
+        L'ETag comprende tutto ciò che la risposta mostra: `data_aggiornamento` del progetto
+        (aggiornata anche dalle modifiche ai collaboratori), i contatori dei task e, per il
+        dettaglio, i dati del proprietario e dei collaboratori. Con `con_task` comprende anche
+        `MAX(data_aggiornamento)` dei task, l'ultima rimozione di un task dal progetto, il numero
+        di task in ritardo (che cambia con il passare del tempo, senza scritture) e i dati di
+        autori e assegnatari.
+        :return: l'ETag oppure None se il progetto non è accessibile
+        """
+        try:
+            progetto_id = int(self.kwargs[self.lookup_field])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        queryset = Progetto.objects.accessibili_a(self.request.user).filter(pk=progetto_id)
+        campi = ['pk', 'proprietario_id', 'data_aggiornamento', *CAMPI_CONTATORE.values()]
+        task = Task.objects.filter(progetto_id=progetto_id).order_by()
+        if con_task:
+            queryset = queryset.annotate(
+                ultimo_task=Max('tasks__data_aggiornamento'),
+                ultima_rimozione=Subquery(
+                    Rimozione.objects.filter(tipo=Rimozione.TASK, progetto_id=OuterRef('pk'))
+                    .order_by('-id').values('id')[:1]
+                ),
+                task_in_ritardo=Subquery(
+                    Task.objects.filter(progetto_id=OuterRef('pk')).in_ritardo().order_by()
+                    .values('progetto_id').annotate(n=Count('pk')).values('n')
+                ),
+            )
+            campi += ['ultimo_task', 'ultima_rimozione', 'task_in_ritardo']
+        riga = queryset.values(*campi).first()
+        if riga is None:
+            return None
+
+        if con_task:
+            utenti = User.objects.filter(
+                Q(pk__in=task.values('autore_id')) | Q(pk__in=task.values('assegnatario_id'))
+            )
+        elif self.action == 'retrieve':
+            utenti = User.objects.filter(Q(pk=riga['proprietario_id']) | Q(collaboratori_progetti=progetto_id))
+        else:
+            utenti = None
+        if utenti is not None:
+            riga['utenti'] = list(utenti.order_by('pk').values_list(*UserSerializer.Meta.fields))
+
+        return calcola_etag(self.action, self.request.META.get('QUERY_STRING', ''), *riga.values())
+
+    def _get_condizionale(self, request, vista, con_task=False):
+        """
+        Esegue `vista` solo se il client non ha già la versione corrente della risorsa,
+        altrimenti risponde 304 senza caricare i modelli né serializzare la risposta.
+        """
+        etag = self._validatori(con_task)
+        if etag is None:
+            return vista()
+
+        non_modificata = risposta_non_modificata(request, etag)
+        if non_modificata is not None:
+            return imposta_validatori(non_modificata, etag)
+        return imposta_validatori(vista(), etag)
+
+    def _condivisa(self, request, vista):
+        """
+        Esegue `vista` una sola volta per le richieste identiche concorrenti dei membri del
+        progetto (stessa azione, stesso URL): la risposta non dipende da quale membro la
+        chiede. Per i non membri `vista` è eseguita direttamente (e risponde 404).
+
+        La chiave contiene la versione del progetto di `progetti.risposte`, rigenerata ad ogni
+        scrittura: una richiesta successiva a una modifica non attende un calcolo iniziato prima.
+        """
+        if not membership.is_member_id(self.kwargs.get(self.lookup_field), request.user, request):
+            return vista()
+
+        progetto_id = int(self.kwargs[self.lookup_field])
+        chiave = (self.action, progetto_id, request.build_absolute_uri(), *risposte.versioni([progetto_id]))
+
+        def calcola():
+            response = vista()
+            # Copia delle intestazioni prima che la richiesta che ha calcolato le modifichi
+            return response.data, response.status_code, dict(response.items())
+
+        dati, stato, intestazioni = coalescenza.esegui(chiave, calcola)
+        # Ogni richiesta riceve una propria Response, renderizzata nel proprio thread
+        return Response(dati, status=stato, headers=intestazioni)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Lista dei progetti dell'utente, memorizzata per utente e parametri della richiesta
+        finché nessuno dei progetti viene modificato (vedi `progetti.risposte`).
+        """
+        def progetti():
+            return list(Progetto.objects.accessibili_a(request.user).order_by('pk').values_list('pk', flat=True))
+
+        return risposte.in_cache(request, 'lista', progetti, partial(super().list, request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Restituisce il dettaglio del progetto.
+
+        Supporta le GET condizionali: la risposta include `ETag` e con `If-None-Match`
+        corrispondente restituisce 304.
+        """
+        return self._get_condizionale(request, partial(super().retrieve, request, *args, **kwargs))
+
     @action(detail=True, methods=['post'])
     def add_collaborator(self, request, pk=None):
         """
@@ -143,8 +369,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         try:
             user = User.objects.get(id=user_id)
 
-
-            if user in progetto.collaboratori.all():
+            if progetto.collaboratori.filter(pk=user.pk).exists():
                 logging.error("Utente già collaboratore")
                 return Response(
                     {'error': 'Utente già collaboratore'},
@@ -197,7 +422,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         try:
             user = User.objects.get(id=user_id)
 
-            if user not in progetto.collaboratori.all():
+            if not progetto.collaboratori.filter(pk=user.pk).exists():
                 logging.error("Utente non è collaboratore")
                 return Response(
                     {'error': 'Utente non è collaboratore'},
@@ -218,6 +443,85 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+    @action(detail=True, methods=['post'])
+    def manage_collaborators(self, request, pk=None):
+        """
+        Aggiunge e rimuove più collaboratori con una sola richiesta.
+
+        ## Metodo
+        POST
+
+        ## Permessi
+        Solo il proprietario del progetto può eseguire questa azione.
+
+        ## Body JSON
+        - **add**: lista di ID utente da aggiungere come collaboratori (facoltativa)
+        - **remove**: lista di ID utente da rimuovere (facoltativa)
+
+        ## Risposte
+        - 200: per `add` e `remove` gli ID `applicati`, `ignorati` (già collaboratori,
+          proprietario o non collaboratori) e `sconosciuti` (utente inesistente)
+        - 400: liste non valide o stesso ID sia in `add` che in `remove`
+        """
+        progetto = self.get_object()
+        if not hasattr(request.data, 'get'):
+            logging.error("Il body di manage_collaborators non è un oggetto JSON")
+            return Response(
+                {'error': 'Il body deve essere un oggetto JSON con le liste add e remove'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        richiesta = {}
+        for chiave in ('add', 'remove'):
+            valori = request.data.get(chiave, [])
+            if (not isinstance(valori, list) or len(valori) > self.max_collaboratori_batch or
+                    not all(isinstance(v, int) and not isinstance(v, bool) for v in valori)):
+                logging.error(f"{chiave} deve essere una lista di ID utente")
+                return Response(
+                    {'error': f'{chiave} deve essere una lista di al massimo '
+                              f'{self.max_collaboratori_batch} ID utente'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            richiesta[chiave] = set(valori)
+
+        da_aggiungere, da_rimuovere = richiesta['add'], richiesta['remove']
+        if da_aggiungere & da_rimuovere:
+            logging.error("Utenti presenti sia in add che in remove")
+            return Response(
+                {'error': 'Lo stesso utente non può essere sia aggiunto che rimosso'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        coinvolti = da_aggiungere | da_rimuovere
+        esistenti = set(User.objects.filter(id__in=coinvolti).values_list('id', flat=True))
+        attuali = set(
+            progetto.collaboratori.through.objects.filter(
+                progetto_id=progetto.pk, user_id__in=coinvolti
+            ).values_list('user_id', flat=True)
+        )
+
+        aggiunti = (da_aggiungere & esistenti) - attuali - {progetto.proprietario_id}
+        rimossi = da_rimuovere & attuali
+
+        with transaction.atomic():
+            if aggiunti:
+                progetto.collaboratori.add(*aggiunti)
+            if rimossi:
+                progetto.collaboratori.remove(*rimossi)
+
+        logging.info(f"Collaboratori aggiunti: {len(aggiunti)}, rimossi: {len(rimossi)}")
+        return Response({
+            'add': {
+                'applicati': sorted(aggiunti),
+                'ignorati': sorted((da_aggiungere & esistenti) - aggiunti),
+                'sconosciuti': sorted(da_aggiungere - esistenti),
+            },
+            'remove': {
+                'applicati': sorted(rimossi),
+                'ignorati': sorted((da_rimuovere & esistenti) - rimossi),
+                'sconosciuti': sorted(da_rimuovere - esistenti),
+            },
+        }, status=status.HTTP_200_OK)
+
     @swagger_auto_schema(
         method='get',
         operation_summary="Statistiche progetto",
@@ -230,10 +534,61 @@ class ProjectViewSet(viewsets.ModelViewSet):
           Restituisce le statistiche dettagliate del progetto.
 
           Include il numero di task per stato (TODO, IN_PROGRESS, DONE), e altri dati aggregati.
+          Supporta le GET condizionali (`ETag`, risposta 304); la risposta è
+          memorizzata per utente finché il progetto non viene modificato e le richieste
+          identiche concorrenti dei membri condividono una sola lettura.
         """
-        project = self.get_object()
-        serializer = ProjectStatsSerializer(project)
-        return Response(serializer.data)
+        def vista():
+            project = self.get_object()
+            serializer = ProjectStatsSerializer(project)
+            return Response(serializer.data)
+
+        def in_cache():
+            try:
+                progetto_id = int(pk)
+            except (TypeError, ValueError):
+                return vista()
+            return risposte.in_cache(
+                request, 'stats', lambda: [progetto_id], partial(self._condivisa, request, vista)
+            )
+
+        return self._get_condizionale(request, in_cache)
+
+    @swagger_auto_schema(
+        method='get',
+        operation_summary="Dashboard dei progetti",
+        operation_description="Statistiche di tutti i progetti dell'utente e totali complessivi.",
+        responses={200: DashboardProgettoSerializer(many=True)}
+    )
+    @action(detail=False, methods=['get'])
+    def dashboard(self, request):
+        """
+        Restituisce le statistiche di tutti i progetti accessibili all'utente.
+
+        ## Risposte
+        - 200: `{"progetti": [...], "totali": {...}}`; per ogni progetto i task per stato,
+          i task in ritardo e la percentuale di completamento, in `totali` le stesse
+          grandezze su tutti i progetti
+
+        I conteggi per stato sono letti dai contatori di `Progetto`, i task in ritardo
+        sono contati con un unico GROUP BY: una sola query qualunque sia il numero di progetti.
+        """
+        progetti = list(
+            self.get_queryset()
+            .only('id', 'nome', *CAMPI_CONTATORE.values())
+            .con_task_in_ritardo()
+        )
+        serializer = DashboardProgettoSerializer(progetti, many=True)
+
+        totali = {
+            campo: sum(getattr(p, campo) for p in progetti)
+            for campo in ('task_totali', 'done_tasks', 'in_progress_tasks', 'todo_tasks', 'task_in_ritardo')
+        }
+        totali['progetti'] = len(progetti)
+        totali['percentuale_completamento'] = (
+            round(totali['done_tasks'] / totali['task_totali'] * 100, 1) if totali['task_totali'] else 0
+        )
+        return Response({'progetti': serializer.data, 'totali': totali})
 
     @action(detail=True, methods=['get'])
     def tasks(self, request, pk=None):
@@ -241,24 +596,142 @@ class ProjectViewSet(viewsets.ModelViewSet):
         Restituisce tutti i task associati al progetto specificato.
 
         I task includono i dettagli di autore e assegnatario.
+        Con il parametro `cursor` la lista è paginata in modalità keyset.
+        Con il parametro `export` (`ndjson` o `csv`) la lista è inviata in streaming.
+        Accetta gli stessi filtri e ordinamenti di `GET /tasks/` (vedi `TaskFilterBackend`).
+        Supporta le GET condizionali (`ETag`, risposta 304); le richieste
+        identiche concorrenti dei membri condividono una sola lettura (tranne l'export).
+        """
+        def vista():
+            project = self.get_object()
+            tasks = project.tasks.con_ritardo().order_by('-data_creazione', '-id')
+            tasks = TaskFilterBackend().filter_queryset(request, tasks, self)
+            tasks = self.ottimizza_queryset(tasks, TaskSerializer)
+            if self.formato_export():
+                return self.esporta_task(tasks, f'progetto_{project.pk}_tasks')
+
+            context = self.get_serializer_context()
+
+            if self.paginator.keyset_attivo(request):
+                page = self.paginate_queryset(tasks)
+                serializer = TaskSerializer(page, many=True, context=context)
+                return self.get_paginated_response(serializer.data)
+
+            serializer = TaskSerializer(tasks, many=True, context=context)
+            return Response(serializer.data)
+
+        if self.formato_export():
+            return self._get_condizionale(request, vista, con_task=True)
+        return self._get_condizionale(request, partial(self._condivisa, request, vista), con_task=True)
+
+    def _intervallo_analytics(self, request):
+        """
+        Legge i parametri `dal` e `al` (date ISO 8601, inclusi).
+        :return: coppia (intervallo, errore): l'intervallo `(dal, al)` oppure una Response di errore
+        """
+        try:
+            al = parse_date(request.query_params['al']) if 'al' in request.query_params else timezone.localdate()
+            dal = (parse_date(request.query_params['dal']) if 'dal' in request.query_params
+                   else al - timedelta(days=ANALYTICS_GIORNI - 1))
+        except ValueError:
+            dal = al = None
+        if dal is None or al is None or not 0 <= (al - dal).days < ANALYTICS_GIORNI_MASSIMI:
+            logging.error("Intervallo di analytics non valido")
+            return None, Response(
+                {'error': f'dal e al devono essere date ISO 8601 con dal <= al, '
+                          f'al massimo {ANALYTICS_GIORNI_MASSIMI} giorni'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return (dal, al), None
+
+    def _serie_analytics(self, request, campi):
+        progetto = self.get_object()
+        intervallo, errore = self._intervallo_analytics(request)
+        if errore:
+            return errore
+        serie = serie_giornaliera(progetto.pk, *intervallo)
+        return Response([{campo: giorno[campo] for campo in ('giorno', *campi)} for giorno in serie])
+
+    @action(detail=True, methods=['get'])
+    def burndown(self, request, pk=None):
+        """
+        Restituisce il burndown giornaliero del progetto.
+
+        ## Parametri
+        - **dal**, **al**: date ISO 8601 (default: ultimi 30 giorni, massimo 366 giorni)
+
+        ## Risposte
+        - 200: per ogni giorno i task per stato e `task_rimanenti` (TODO + IN_PROGRESS) a fine giornata
+        - 400: intervallo non valido
+
+        I dati sono letti dagli snapshot giornalieri aggiornati dal comando `rollup`.
+        """
+        return self._serie_analytics(
+            request, ('todo_tasks', 'in_progress_tasks', 'done_tasks', 'task_rimanenti')
+        )
+
+    @action(detail=True, methods=['get'])
+    def throughput(self, request, pk=None):
+        """
+        Restituisce throughput e tempo di ciclo giornalieri del progetto.
+
+        ## Parametri
+        - **dal**, **al**: date ISO 8601 (default: ultimi 30 giorni, massimo 366 giorni)
+
+        ## Risposte
+        - 200: per ogni giorno i task `aggiunti`, `completati` e `tempo_ciclo_medio_ore`
+          (dal primo passaggio a IN_PROGRESS al completamento; null senza completamenti)
+        - 400: intervallo non valido
+
+        I dati sono letti dagli snapshot giornalieri aggiornati dal comando `rollup`.
+        """
+        return self._serie_analytics(request, ('aggiunti', 'completati', 'tempo_ciclo_medio_ore'))
+
+    @action(detail=True, methods=['get'])
+    def overdue(self, request, pk=None):
+        """
+        Restituisce i task in ritardo del progetto (scaduti e non completati),
+        dal più vecchio al più recente per scadenza.
+
+        Il ritardo è calcolato dal database (indice parziale sui task non completati);
+        con il parametro `cursor` la lista è paginata in modalità keyset.
         """
         project = self.get_object()
-        tasks = project.tasks.all().select_related('assegnatario', 'autore')
+        tasks = project.tasks.in_ritardo().con_ritardo().order_by('scadenza', 'id')
+        tasks = self.ottimizza_queryset(tasks, TaskSerializer)
+        context = self.get_serializer_context()
+
+        if self.paginator.keyset_attivo(request):
+            page = self.paginate_queryset(tasks)
+            serializer = TaskSerializer(page, many=True, context=context)
+            return self.get_paginated_response(serializer.data)
 
-        serializer = TaskSerializer(tasks, many=True)
+        serializer = TaskSerializer(tasks, many=True, context=context)
         return Response(serializer.data)
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ReplicaReadMixin, SparseFieldsetMixin, TaskExportMixin, FastListMixin, viewsets.ModelViewSet):
     """
     API per la gestione dei task.
 
     Permette di creare, aggiornare, visualizzare e cancellare task.
     L'accesso è limitato ai membri del progetto a cui il task appartiene.
+
+    Le GET accettano i parametri `fields` ed `expand` (relazioni `autore`, `assegnatario`);
+    la lista accetta anche `export` (`ndjson` o `csv`) per l'export in streaming e i
+    filtri `stato`, `assegnatario`, `autore`, `progetto`, `scadenza_dopo`, `scadenza_prima`,
+    `in_ritardo` e l'ordinamento `ordering` (vedi `TaskFilterBackend`).
     """
 
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated, CanModifyTask]
+    pagination_class = OptionalKeysetPagination
+    ordinamenti_keyset = {'overdue': ('scadenza', 'id')}
+    filter_backends = [TaskFilterBackend]
+    lista_rapida_class = ListaTaskRapida
+
+    # Numero massimo di elementi accettati da una singola operazione massiva
+    bulk_max_elementi = 1000
 
     def get_queryset(self):
         """
@@ -273,11 +746,43 @@ class TaskViewSet(viewsets.ModelViewSet):
             return Task.objects.none()
 
         user = self.request.user
-        return Task.objects.filter(
-            Q(progetto__proprietario=user) | Q(progetto__collaboratori=user)
-        ).select_related(
-            'progetto', 'assegnatario', 'autore'
-        ).distinct()
+        queryset = Task.objects.accessibili_a(user).con_ritardo().order_by('-data_creazione', '-id')
+        queryset = self.ottimizza_queryset(queryset, TaskSerializer)
+        if self.action not in ('list', 'overdue'):
+            # Il progetto serve ai controlli dei permessi sul singolo task
+            queryset = queryset.select_related('progetto')
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """Lista dei task, paginata oppure in streaming con il parametro `export`"""
+        if self.formato_export():
+            return self.esporta_task(self.filter_queryset(self.get_queryset()), 'tasks')
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    def overdue(self, request):
+        """
+        Restituisce i task in ritardo (scaduti e non completati) di tutti i progetti
+        dell'utente, dal più vecchio al più recente per scadenza.
+
+        Il ritardo è calcolato dal database (indice parziale sui task non completati);
+        accetta gli stessi filtri di `GET /tasks/` ed è paginata come la lista.
+        """
+        queryset = self.filter_queryset(self.get_queryset().in_ritardo())
+        if 'ordering' not in request.query_params:
+            queryset = queryset.order_by('scadenza', 'id')
+
+        response = self.lista_rapida(queryset)
+        if response is not None:
+            return response
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
 
     def get_serializer_context(self):
         """
@@ -286,7 +791,8 @@ class TaskViewSet(viewsets.ModelViewSet):
         Utile per validazioni o logica personalizzata all'interno del serializer.
         """
         context = super().get_serializer_context()
-        if hasattr(self, 'request') and self.request.data.get('progetto'):
+        dati = self.request.data if hasattr(self, 'request') else None
+        if hasattr(dati, 'get') and dati.get('progetto'):
             try:
 
                 project = Progetto.objects.get(id=self.request.data['progetto'])
@@ -300,3 +806,399 @@ class TaskViewSet(viewsets.ModelViewSet):
         Imposta automaticamente l'utente autenticato come autore  del task.
         """
         serializer.save(autore=self.request.user)
+
+    def _verifica_lista(self, elementi):
+        """Restituisce una Response di errore se il body non è una lista valida per le operazioni massive"""
+        if not isinstance(elementi, list) or not elementi:
+            logging.error("Il body deve essere una lista non vuota")
+            return Response(
+                {'error': 'Il body deve essere una lista non vuota'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(elementi) > self.bulk_max_elementi:
+            logging.error("Troppi elementi nell'operazione massiva")
+            return Response(
+                {'error': f'Al massimo {self.bulk_max_elementi} elementi per richiesta'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return None
+
+    def _progetti_accessibili(self, progetto_ids):
+        """
+        Verifica in una sola query l'accesso ai progetti indicati.
+        :return: dizionario `progetto_id -> proprietario_id` dei soli progetti accessibili all'utente
+        """
+        return dict(
+            Progetto.objects.accessibili_a(self.request.user)
+            .filter(pk__in=progetto_ids).values_list('pk', 'proprietario_id')
+        )
+
+    def _assegnatari_non_validi(self, coppie, proprietari):
+        """
+        Verifica in blocco che gli assegnatari siano membri dei rispettivi progetti.
+        :param coppie: insieme di coppie `(progetto_id, user_id)`
+        :param proprietari: dizionario `progetto_id -> proprietario_id`
+        :return: dizionario `coppia -> messaggio di errore` per le sole coppie non valide
+        """
+        da_verificare = {(p, u) for p, u in coppie if proprietari.get(p) != u}
+        if not da_verificare:
+            return {}
+
+        membri = set(
+            Progetto.collaboratori.through.objects.filter(
+                progetto_id__in={p for p, _ in da_verificare},
+                user_id__in={u for _, u in da_verificare}
+            ).values_list('progetto_id', 'user_id')
+        )
+        non_validi = da_verificare - membri
+        if not non_validi:
+            return {}
+
+        esistenti = set(
+            User.objects.filter(id__in={u for _, u in non_validi}).values_list('id', flat=True)
+        )
+        return {
+            coppia: ("L'utente deve essere membro del progetto" if coppia[1] in esistenti
+                     else "Utente non trovato")
+            for coppia in non_validi
+        }
+
+    def _risposta_bulk(self, task_ids, codice):
+        """Serializza i task indicati, nell'ordine ricevuto, con una sola query"""
+        tasks = Task.objects.filter(pk__in=task_ids).con_ritardo().select_related('progetto', 'assegnatario', 'autore')
+        per_id = {t.pk: t for t in tasks}
+        serializer = TaskSerializer([per_id[pk] for pk in task_ids], many=True)
+        return Response(serializer.data, status=codice)
+
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """
+        Crea più task con una sola richiesta.
+
+        ## Metodo
+        POST
+
+        ## Body JSON
+        Lista di task con gli stessi campi di `POST /tasks/` (massimo 1000 elementi).
+
+        ## Permessi
+        L'utente deve essere membro di ogni progetto indicato; l'accesso è verificato
+        una sola volta per progetto e gli assegnatari sono validati con una sola query.
+
+        ## Risposte
+        - 201: lista dei task creati
+        - 400: `{"errors": [...]}` con un elemento per ogni task inviato (vuoto se valido);
+          nessun task viene creato
+        """
+        elementi = request.data
+        errore = self._verifica_lista(elementi)
+        if errore:
+            return errore
+
+        validatori = [TaskBulkSerializer(data=elemento) for elemento in elementi]
+        errori = [{} if v.is_valid() else dict(v.errors) for v in validatori]
+        validi = [v.validated_data if not errori[i] else None for i, v in enumerate(validatori)]
+
+        progetti = self._progetti_accessibili({d['progetto_id'] for d in validi if d})
+        assegnatari = self._assegnatari_non_validi(
+            {(d['progetto_id'], d['assigned_to_id']) for d in validi
+             if d and d.get('assigned_to_id') and d['progetto_id'] in progetti},
+            progetti
+        )
+        for i, dati in enumerate(validi):
+            if not dati:
+                continue
+            if dati['progetto_id'] not in progetti:
+                errori[i]['progetto'] = ['Progetto non trovato o utente non membro del progetto']
+            elif (dati['progetto_id'], dati.get('assigned_to_id')) in assegnatari:
+                errori[i]['assigned_to_id'] = [assegnatari[(dati['progetto_id'], dati['assigned_to_id'])]]
+
+        if any(errori):
+            logging.error("Operazione massiva annullata: task non validi")
+            return Response({'errors': errori}, status=status.HTTP_400_BAD_REQUEST)
+
+        nuovi = []
+        for dati in validi:
+            dati = dict(dati)
+            dati['assegnatario_id'] = dati.pop('assigned_to_id', None) or None
+            nuovi.append(Task(autore_id=request.user.pk, **dati))
+
+        with transaction.atomic():
+            creati = Task.objects.bulk_create(nuovi)
+
+        logging.info(f"Creati {len(creati)} task con operazione massiva")
+        return self._risposta_bulk([t.pk for t in creati], status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['patch'])
+    def bulk_update(self, request):
+        """
+        Aggiorna parzialmente più task con una sola richiesta.
+
+        ## Metodo
+        PATCH
+
+        ## Body JSON
+        Lista di oggetti con `id` del task e i campi da modificare (massimo 1000 elementi).
+
+        ## Permessi
+        Come `PATCH /tasks/{id}/`: ogni membro del progetto può modificare i task.
+
+        ## Risposte
+        - 200: lista dei task aggiornati
+        - 400: `{"errors": [...]}` con un elemento per ogni task inviato (vuoto se valido);
+          nessun task viene modificato
+        """
+        elementi = request.data
+        errore = self._verifica_lista(elementi)
+        if errore:
+            return errore
+
+        ids = []
+        for elemento in elementi:
+            task_id = elemento.get('id') if isinstance(elemento, dict) else None
+            ids.append(task_id if isinstance(task_id, int) and not isinstance(task_id, bool) else None)
+        tasks = {
+            t.pk: t for t in Task.objects.accessibili_a(request.user)
+            .filter(pk__in={i for i in ids if i is not None})
+        }
+
+        errori = [{} for _ in elementi]
+        modificati = {}
+        for i, (task_id, elemento) in enumerate(zip(ids, elementi)):
+            if task_id is None:
+                errori[i]['id'] = ['ID del task mancante o non valido']
+            elif task_id not in tasks:
+                errori[i]['id'] = ['Task non trovato']
+            elif task_id in modificati:
+                errori[i]['id'] = ['Task ripetuto nella richiesta']
+            else:
+                serializer = TaskBulkSerializer(tasks[task_id], data=elemento, partial=True)
+                if serializer.is_valid():
+                    modificati[task_id] = (i, serializer.validated_data)
+                else:
+                    errori[i] = dict(serializer.errors)
+
+        progetti = self._progetti_accessibili(
+            {dati.get('progetto_id', tasks[pk].progetto_id) for pk, (_, dati) in modificati.items()}
+        )
+        coppie = {}
+        for pk, (i, dati) in modificati.items():
+            progetto_id = dati.get('progetto_id', tasks[pk].progetto_id)
+            if progetto_id not in progetti:
+                errori[i]['progetto'] = ['Progetto non trovato o utente non membro del progetto']
+            elif dati.get('assigned_to_id'):
+                coppie[i] = (progetto_id, dati['assigned_to_id'])
+        assegnatari = self._assegnatari_non_validi(set(coppie.values()), progetti)
+        for i, coppia in coppie.items():
+            if coppia in assegnatari:
+                errori[i]['assigned_to_id'] = [assegnatari[coppia]]
+
+        if any(errori):
+            logging.error("Operazione massiva annullata: task non validi")
+            return Response({'errors': errori}, status=status.HTTP_400_BAD_REQUEST)
+
+        campi = {'data_aggiornamento'}
+        adesso = timezone.now()
+        for pk, (_, dati) in modificati.items():
+            task = tasks[pk]
+            for campo, valore in dati.items():
+                if campo == 'assigned_to_id':
+                    campo, valore = 'assegnatario_id', valore or None
+                setattr(task, campo, valore)
+                campi.add(campo)
+            task.data_aggiornamento = adesso
+
+        with transaction.atomic():
+            Task.objects.bulk_update([tasks[pk] for pk in modificati], sorted(campi))
+
+        logging.info(f"Aggiornati {len(modificati)} task con operazione massiva")
+        return self._risposta_bulk([ids[i] for i, _ in sorted(modificati.values(), key=lambda v: v[0])],
+                                   status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def bulk_delete(self, request):
+        """
+        Elimina più task con una sola richiesta.
+
+        ## Metodo
+        POST
+
+        ## Body JSON
+        - **ids**: lista degli ID dei task da eliminare (massimo 1000 elementi)
+
+        ## Permessi
+        Come `DELETE /tasks/{id}/`: solo il proprietario del progetto o l'autore del task.
+
+        ## Risposte
+        - 200: `{"eliminati": n}`
+        - 400: `{"errors": {"<id>": "..."}}` per i task non eliminabili; nessun task viene eliminato
+        """
+        ids = request.data.get('ids') if hasattr(request.data, 'get') else None
+        errore = self._verifica_lista(ids)
+        if errore:
+            return errore
+        if not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            return Response(
+                {'error': 'ids deve contenere solo ID numerici'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        righe = {
+            r['pk']: r for r in Task.objects.accessibili_a(request.user)
+            .filter(pk__in=ids).values('pk', 'autore_id', 'progetto__proprietario_id')
+        }
+        errori = {}
+        for task_id in ids:
+            riga = righe.get(task_id)
+            if riga is None:
+                errori[task_id] = 'Task non trovato'
+            elif request.user.pk not in (riga['autore_id'], riga['progetto__proprietario_id']):
+                errori[task_id] = 'Solo il proprietario del progetto o l\'autore possono eliminare il task'
+
+        if errori:
+            logging.error("Operazione massiva annullata: task non eliminabili")
+            return Response({'errors': errori}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            eliminati, _ = Task.objects.filter(pk__in=righe).delete()
+
+        logging.info(f"Eliminati {eliminati} task con operazione massiva")
+        return Response({'eliminati': eliminati}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def search(request):
+    """
+    Ricerca full-text su titolo e descrizione di task e progetti.
+
+    ## Metodo
+    GET
+
+    ## Parametri
+    - **q**: testo da cercare (obbligatorio); sono restituiti i record che contengono tutti i termini
+    - **tipo**: `task` o `progetti` per limitare la ricerca a un solo tipo (facoltativo)
+    - **limite**: numero massimo di risultati per tipo (default 20, massimo 100)
+
+    ## Risposte
+    - 200: `{"progetti": [...], "task": [...]}` ordinati per rilevanza
+    - 400: parametri mancanti o non validi
+
+    La ricerca è limitata ai progetti di cui l'utente è proprietario o collaboratore
+    ed è servita dagli indici full-text del database (GIN su PostgreSQL, FTS5 su SQLite).
+    """
+    testo = request.query_params.get('q', '').strip()
+    if not testo:
+        logging.error("Parametro q mancante")
+        return Response({'error': 'Il parametro q è obbligatorio'}, status=status.HTTP_400_BAD_REQUEST)
+
+    tipo = request.query_params.get('tipo')
+    if tipo not in (None, 'task', 'progetti'):
+        logging.error("Tipo di ricerca non valido")
+        return Response({'error': 'tipo deve essere task o progetti'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        limite = int(request.query_params.get('limite', RICERCA_LIMITE))
+        if not 1 <= limite <= RICERCA_LIMITE_MASSIMO:
+            raise ValueError(limite)
+    except ValueError:
+        logging.error("Limite di ricerca non valido")
+        return Response(
+            {'error': f'limite deve essere un intero tra 1 e {RICERCA_LIMITE_MASSIMO}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    risultati = {}
+    if tipo in (None, 'progetti'):
+        progetti = cerca(Progetto.objects.accessibili_a(request.user), testo)
+        progetti = progetti.only('id', 'nome', 'descrizione')[:limite]
+        risultati['progetti'] = RisultatoProgettoSerializer(progetti, many=True).data
+    if tipo in (None, 'task'):
+        tasks = cerca(Task.objects.accessibili_a(request.user), testo)
+        tasks = tasks.only('id', 'titolo', 'descrizione', 'stato', 'progetto')[:limite]
+        risultati['task'] = RisultatoTaskSerializer(tasks, many=True).data
+
+    logging.info(f"Ricerca full-text eseguita: {sum(len(r) for r in risultati.values())} risultati")
+    return Response(risultati)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def changes(request):
+    """
+    Sincronizzazione incrementale di task e progetti per i client offline.
+
+    ## Metodo
+    GET
+
+    ## Parametri
+    - **since**: cursore restituito dalla risposta precedente; senza, sono restituiti tutti
+      i progetti e task accessibili (sincronizzazione completa)
+
+    ## Risposte
+    - 200: `{"progetti": [...], "task": [...], "rimozioni": {"progetti": [...], "task": [...]},
+      "cursor": "...", "completo": true}`
+    - 400: cursore non valido
+    - 410: cursore più vecchio della conservazione delle rimozioni, serve una sincronizzazione completa
+
+    `progetti` e `task` contengono i record creati o modificati dopo il cursore, serializzati
+    come nelle rispettive GET; `rimozioni` gli ID da eliminare dal client: task eliminati o
+    spostati in progetti non accessibili, progetti eliminati o da cui l'utente è stato rimosso
+    (insieme ai loro task). Un progetto ricevuto per la prima volta (es. l'utente è stato
+    aggiunto ai collaboratori) va scaricato con `GET /projects/{id}/tasks/`.
+    Se `completo` è false restano altre modifiche: ripetere subito con il nuovo cursore.
+    """
+    adesso = timezone.now()
+    cursore = request.query_params.get('since')
+    if cursore:
+        try:
+            posizioni = decodifica_cursore(cursore)
+        except ValueError:
+            logging.error("Cursore di sincronizzazione non valido")
+            return Response({'error': 'Il cursore since non è valido'}, status=status.HTTP_400_BAD_REQUEST)
+        if posizioni['rimozioni'][0] < adesso - timedelta(days=settings.RIMOZIONI_GIORNI):
+            logging.error("Cursore di sincronizzazione scaduto")
+            return Response(
+                {'error': 'Il cursore since è scaduto: eseguire una sincronizzazione completa'},
+                status=status.HTTP_410_GONE
+            )
+    else:
+        # Sincronizzazione completa: servono solo le rimozioni concorrenti alla lettura
+        posizioni = {'progetti': None, 'task': None, 'rimozioni': (adesso - MARGINE_SYNC, 0)}
+
+    querysets = {
+        'progetti': (
+            ProjectSerializer.ottimizza_queryset(Progetto.objects.accessibili_a(request.user)),
+            'data_aggiornamento'
+        ),
+        'task': (
+            TaskSerializer.ottimizza_queryset(Task.objects.accessibili_a(request.user).con_ritardo()),
+            'data_aggiornamento'
+        ),
+        'rimozioni': (Rimozione.objects.visibili_a(request.user), 'data'),
+    }
+    righe, completo = {}, True
+    for flusso in FLUSSI:
+        queryset, campo = querysets[flusso]
+        righe[flusso], posizioni[flusso], altre = leggi_flusso(queryset, campo, posizioni[flusso], adesso)
+        completo = completo and not altre
+
+    rimozioni = {'progetti': [], 'task': []}
+    for rimozione in righe['rimozioni']:
+        ids = rimozioni['task' if rimozione.tipo == Rimozione.TASK else 'progetti']
+        if rimozione.oggetto_id not in ids:
+            ids.append(rimozione.oggetto_id)
+
+    context = {'request': request}
+    risposta = {
+        'progetti': ProjectSerializer(righe['progetti'], many=True, context=context).data,
+        'task': TaskSerializer(righe['task'], many=True, context=context).data,
+        'rimozioni': rimozioni,
+        'cursor': codifica_cursore(posizioni),
+        'completo': completo,
+    }
+    logging.info(
+        f"Sincronizzazione: {len(righe['progetti'])} progetti, {len(righe['task'])} task, "
+        f"{len(righe['rimozioni'])} rimozioni"
+    )
+    return Response(risposta)
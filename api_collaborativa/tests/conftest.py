@@ -1,12 +1,25 @@
 import pytest
 from django.contrib.auth.models import User
+from django.core.cache import caches
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
+from autenticazione import blacklist
 from progetti.models import Progetto
 from progetti.models import Task
 
 #Nota: db =	Fixture di pytest-django per abilitare accesso al DB Django
 
+@pytest.fixture(autouse=True)
+def svuota_cache():
+    """Evita che dati memorizzati in cache da un test influenzino i successivi"""
+    for cache in caches.all():
+        cache.clear()
+    blacklist.azzera()
+    yield
+    for cache in caches.all():
+        cache.clear()
+    blacklist.azzera()
+
 @pytest.fixture(scope='function')
 def user_proprietario(db):
     """User è un utente puro per Creare/modificare dati nel DB"""
@@ -0,0 +1,131 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from progetti.models import Progetto, SnapshotProgetto, Task, TransizioneTask
+
+
+def transizioni(progetto):
+    return list(
+        TransizioneTask.objects.filter(progetto=progetto).order_by('pk')
+        .values_list('stato_precedente', 'stato')
+    )
+
+
+def rollup():
+    call_command('rollup', margine=0)
+
+
+@pytest.mark.django_db
+class TestTransizioniTask:
+    """
+    Test del registro delle transizioni di stato dei task.
+    """
+
+    @pytest.mark.positivo
+    def test_scritture_singole(self, progetto, task):
+        task.stato = 'IN_PROGRESS'
+        task.save()
+        task.titolo = 'Solo titolo'
+        task.save()
+        task.delete()
+        assert transizioni(progetto) == [(None, 'TODO'), ('TODO', 'IN_PROGRESS'), ('IN_PROGRESS', None)]
+
+    @pytest.mark.positivo
+    def test_operazioni_massive_e_spostamento(self, progetto, user_proprietario):
+        altro = Progetto.objects.create(nome='Altro', proprietario=user_proprietario)
+        Task.objects.bulk_create([
+            Task(titolo=f'Task {i}', progetto=progetto, autore=user_proprietario) for i in range(2)
+        ])
+        Task.objects.filter(titolo='Task 0').update(stato='DONE')
+        Task.objects.filter(titolo='Task 1').update(progetto=altro)
+        Task.objects.filter(progetto=altro).delete()
+
+        assert transizioni(progetto) == [(None, 'TODO'), (None, 'TODO'), ('TODO', 'DONE'), ('TODO', None)]
+        assert transizioni(altro) == [(None, 'TODO'), ('TODO', None)]
+
+    @pytest.mark.positivo
+    def test_eliminazione_autore(self, progetto, user_collaboratore, task_creato_dal_collaboratore):
+        user_collaboratore.delete()
+        assert transizioni(progetto) == [(None, 'TODO'), ('TODO', None)]
+
+
+@pytest.mark.django_db
+class TestAnalyticsProgetto:
+    """
+    Test del rollup giornaliero e degli endpoint burndown e throughput.
+    """
+
+    @pytest.fixture
+    def storico(self, progetto, user_proprietario):
+        """Due giorni di attività: tre task creati ieri, uno iniziato ieri e completato oggi"""
+        oggi = timezone.localdate()
+        mezzanotte = timezone.make_aware(datetime.combine(oggi, time.min))
+        inizio, fine = mezzanotte - timedelta(hours=6) + timedelta(seconds=1), mezzanotte + timedelta(seconds=1)
+        tasks = Task.objects.bulk_create([
+            Task(titolo=f'Task {i}', progetto=progetto, autore=user_proprietario) for i in range(3)
+        ])
+        tasks[0].stato = 'IN_PROGRESS'
+        tasks[0].save()
+        TransizioneTask.objects.filter(progetto=progetto).update(data=inizio)
+        tasks[0].stato = 'DONE'
+        tasks[0].save()
+        TransizioneTask.objects.filter(stato='DONE').update(data=fine)
+        rollup()
+        return oggi
+
+    @pytest.mark.positivo
+    def test_burndown(self, client_collaboratore, progetto, storico):
+        oggi = storico
+        url = reverse('projects-burndown', args=[progetto.id])
+        response = client_collaboratore.get(url, {'dal': oggi - timedelta(days=2), 'al': oggi})
+        assert response.status_code == status.HTTP_200_OK
+        assert [(g['todo_tasks'], g['in_progress_tasks'], g['done_tasks'], g['task_rimanenti'])
+                for g in response.data] == [(0, 0, 0, 0), (2, 1, 0, 3), (2, 0, 1, 2)]
+
+    @pytest.mark.positivo
+    def test_throughput_e_tempo_di_ciclo(self, client_collaboratore, progetto, storico):
+        oggi = storico
+        url = reverse('projects-throughput', args=[progetto.id])
+        response = client_collaboratore.get(url, {'dal': oggi - timedelta(days=1), 'al': oggi})
+        assert response.status_code == status.HTTP_200_OK
+        ieri, oggi = response.data
+        assert (ieri['aggiunti'], ieri['completati'], ieri['tempo_ciclo_medio_ore']) == (3, 0, None)
+        assert (oggi['aggiunti'], oggi['completati'], oggi['tempo_ciclo_medio_ore']) == (0, 1, 6.0)
+
+    @pytest.mark.positivo
+    def test_rollup_incrementale(self, progetto, storico):
+        rollup()
+        Task.objects.filter(progetto=progetto, stato='TODO').update(stato='DONE')
+        rollup()
+        snapshot = SnapshotProgetto.objects.get(progetto=progetto, giorno=storico)
+        assert (snapshot.conteggio_todo, snapshot.conteggio_done, snapshot.completati) == (0, 3, 3)
+        assert SnapshotProgetto.objects.filter(progetto=progetto).count() == 2
+
+    @pytest.mark.positivo
+    def test_giorni_senza_snapshot_e_query(self, client_collaboratore, progetto, storico,
+                                           django_assert_max_num_queries):
+        url = reverse('projects-burndown', args=[progetto.id])
+        with django_assert_max_num_queries(3):
+            response = client_collaboratore.get(url, {'dal': storico + timedelta(days=1),
+                                                      'al': storico + timedelta(days=365)})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 365
+        assert {g['task_rimanenti'] for g in response.data} == {2}
+
+    @pytest.mark.negativo
+    @pytest.mark.parametrize('parametri', [
+        {'dal': 'ieri'}, {'dal': '2025-02-01', 'al': '2025-01-01'}, {'dal': '2023-01-01', 'al': '2025-01-01'},
+    ])
+    def test_intervallo_non_valido(self, client_collaboratore, progetto, parametri):
+        response = client_collaboratore.get(reverse('projects-burndown', args=[progetto.id]), parametri)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.negativo
+    def test_progetto_non_accessibile(self, client_estraneo, progetto):
+        response = client_estraneo.get(reverse('projects-throughput', args=[progetto.id]))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
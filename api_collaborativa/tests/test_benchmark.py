@@ -0,0 +1,361 @@
+"""
+Benchmark di regressione per tutti gli endpoint di `progetti/urls.py` e `autenticazione/urls.py`.
+
+Per ogni endpoint vengono registrati numero di query, tempo di risposta e piano di
+esecuzione (`EXPLAIN`) delle SELECT eseguite; il test fallisce se viene superato il
+budget dell'endpoint oppure se il numero di query cresce con la dimensione della pagina.
+
+Dimensione del dataset:
+- ridotta (default), per l'esecuzione insieme agli altri test
+- realistica con `BENCHMARK_COMPLETO=1` (1k progetti, 100k task, 50 collaboratori per progetto)
+
+Con `BENCHMARK_REPORT=<percorso>` le misure vengono salvate in un file JSON.
+"""
+import json
+import logging
+import os
+import time
+from urllib.parse import urlsplit
+
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, resolve, reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from autenticazione import urls as autenticazione_urls
+from progetti import urls as progetti_urls
+from progetti.liste import ListaProgettiRapida, ListaTaskRapida
+from progetti.models import Progetto, Task
+from progetti.pagination import OptionalKeysetPagination
+from progetti.renderers import FastJSONRenderer
+from progetti.serializers import ProjectSerializer, TaskSerializer
+
+if os.getenv('BENCHMARK_COMPLETO'):
+    DATASET = {'progetti': 1000, 'task_per_progetto': 100, 'collaboratori': 50, 'utenti': 500}
+else:
+    DATASET = {'progetti': 10, 'task_per_progetto': 20, 'collaboratori': 5, 'utenti': 20}
+
+# Tempo massimo (ms) per richiesta, volutamente largo per non dipendere dalla macchina
+BUDGET_TEMPO_MS = float(os.getenv('BENCHMARK_BUDGET_MS', 2000))
+
+MISURE = []
+
+# Endpoint misurati da `test_endpoint_autenticazione`
+ENDPOINT_AUTENTICAZIONE = ('register', 'token_obtain_pair', 'token_refresh', 'profile', 'metrics', 'logout')
+
+
+@pytest.fixture
+def dataset(db):
+    """
+    Popola il DB con utenti, progetti, collaboratori e task tramite operazioni massive.
+    Il primo utente è proprietario di tutti i progetti, gli altri sono collaboratori a rotazione.
+    """
+    password = make_password('testpass')
+    utenti = User.objects.bulk_create([
+        User(username=f'bench{i}', email=f'bench{i}@example.com', password=password)
+        for i in range(DATASET['utenti'])
+    ])
+    proprietario = utenti[0]
+    progetti = Progetto.objects.bulk_create([
+        Progetto(nome=f'Progetto {i}', descrizione='Benchmark', proprietario=proprietario)
+        for i in range(DATASET['progetti'])
+    ])
+
+    Collaborazione = Progetto.collaboratori.through
+    altri = utenti[1:]
+    Collaborazione.objects.bulk_create([
+        Collaborazione(progetto_id=progetto.id, user_id=altri[(i + j) % len(altri)].id)
+        for i, progetto in enumerate(progetti)
+        for j in range(min(DATASET['collaboratori'], len(altri)))
+    ], ignore_conflicts=True)
+
+    stati = ['TODO', 'IN_PROGRESS', 'DONE']
+    Task.objects.bulk_create([
+        Task(
+            titolo=f'Task {i}', descrizione='Benchmark', progetto=progetto,
+            autore=proprietario, assegnatario=altri[i % len(altri)], stato=stati[i % 3]
+        )
+        for progetto in progetti
+        for i in range(DATASET['task_per_progetto'])
+    ], batch_size=5000)
+
+    return {'proprietario': proprietario, 'collaboratore': altri[0], 'progetti': progetti}
+
+
+def client_per(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+def explain(sql):
+    """Piano di esecuzione di una SELECT catturata"""
+    prefisso = connection.ops.explain_query_prefix()
+    if connection.vendor == 'sqlite':
+        prefisso = 'EXPLAIN QUERY PLAN'
+    with connection.cursor() as cursor:
+        cursor.execute(f'{prefisso} {sql}')
+        return [' '.join(str(colonna) for colonna in riga) for riga in cursor.fetchall()]
+
+
+def misura(nome, client, metodo, url, **kwargs):
+    """Esegue la richiesta registrando numero di query, tempo ed EXPLAIN"""
+    with CaptureQueriesContext(connection) as queries:
+        inizio = time.perf_counter()
+        response = getattr(client, metodo)(url, format='json', **kwargs)
+        if response.streaming:
+            # Le query dei flussi sono eseguite durante la lettura del contenuto
+            b''.join(response)
+        durata_ms = (time.perf_counter() - inizio) * 1000
+
+    piani = {}
+    for query in queries.captured_queries:
+        sql = query['sql']
+        if sql.lstrip().upper().startswith('SELECT') and sql not in piani:
+            try:
+                piani[sql] = explain(sql)
+            except Exception as e:
+                piani[sql] = [f'EXPLAIN non disponibile: {e}']
+
+    risultato = {
+        'endpoint': nome,
+        'status': response.status_code,
+        'query': len(queries.captured_queries),
+        'tempo_ms': round(durata_ms, 2),
+        'explain': piani,
+    }
+    MISURE.append(risultato)
+    logging.info(f"{nome}: {risultato['query']} query, {risultato['tempo_ms']} ms")
+    return response, risultato
+
+
+@pytest.fixture(scope='module', autouse=True)
+def report():
+    yield
+    percorso = os.getenv('BENCHMARK_REPORT')
+    if percorso and MISURE:
+        with open(percorso, 'w') as f:
+            json.dump({'dataset': DATASET, 'misure': MISURE}, f, indent=2)
+
+
+def nomi_url(patterns):
+    """Nomi degli URL definiti da `patterns`, compresi quelli inclusi"""
+    nomi = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            nomi |= nomi_url(pattern.url_patterns)
+        elif pattern.name:
+            nomi.add(pattern.name)
+    return nomi
+
+
+def endpoint_progetti(dataset):
+    """(nome, utente, metodo, url, body, status atteso, budget query)"""
+    progetto = dataset['progetti'][0]
+    task = progetto.tasks.first()
+    estraneo = User.objects.filter(collaboratori_progetti__isnull=True).exclude(
+        pk=dataset['proprietario'].pk
+    ).first() or User.objects.create_user(username='bench_estraneo', password='testpass')
+    proprietario = dataset['proprietario']
+    collaboratore = dataset['collaboratore']
+    return [
+        ('api-root', collaboratore, 'get', reverse('api-root'), None, 200, 1),
+        ('projects-list', collaboratore, 'get', reverse('projects-list'), None, 200, 5),
+        ('projects-list-cursor', collaboratore, 'get', reverse('projects-list') + '?cursor=', None, 200, 4),
+        ('projects-create', proprietario, 'post', reverse('projects-list'),
+         {'nome': 'Nuovo', 'descrizione': 'Benchmark'}, 201, 4),
+        ('projects-detail', collaboratore, 'get', reverse('projects-detail', args=[progetto.id]), None, 200, 5),
+        ('projects-update', proprietario, 'patch', reverse('projects-detail', args=[progetto.id]),
+         {'nome': 'Aggiornato'}, 200, 6),
+        ('projects-stats', collaboratore, 'get', reverse('projects-stats', args=[progetto.id]), None, 200, 4),
+        ('projects-dashboard', collaboratore, 'get', reverse('projects-dashboard'), None, 200, 2),
+        ('projects-burndown', collaboratore, 'get', reverse('projects-burndown', args=[progetto.id]),
+         None, 200, 3),
+        ('projects-throughput', collaboratore, 'get', reverse('projects-throughput', args=[progetto.id]),
+         None, 200, 3),
+        ('projects-tasks', collaboratore, 'get', reverse('projects-tasks', args=[progetto.id]), None, 200, 5),
+        ('projects-overdue', collaboratore, 'get', reverse('projects-overdue', args=[progetto.id]), None, 200, 4),
+        ('projects-events', collaboratore, 'get',
+         reverse('projects-events', args=[progetto.id]) + '?last_event_id=0', None, 200, 4),
+        ('projects-add-collaborator', proprietario, 'post',
+         reverse('projects-add-collaborator', args=[progetto.id]), {'user_id': estraneo.id}, 200, 8),
+        ('projects-remove-collaborator', proprietario, 'post',
+         reverse('projects-remove-collaborator', args=[progetto.id]), {'user_id': estraneo.id}, 200, 8),
+        ('projects-manage-collaborators', proprietario, 'post',
+         reverse('projects-manage-collaborators', args=[progetto.id]),
+         {'add': list(User.objects.exclude(collaboratori_progetti=progetto)
+                      .exclude(pk=estraneo.pk).values_list('id', flat=True)[:100]),
+          'remove': [estraneo.id]}, 200, 10),
+        ('tasks-list', collaboratore, 'get', reverse('tasks-list'), None, 200, 4),
+        ('tasks-list-cursor', collaboratore, 'get', reverse('tasks-list') + '?cursor=', None, 200, 3),
+        ('tasks-overdue', collaboratore, 'get', reverse('tasks-overdue'), None, 200, 4),
+        ('search', collaboratore, 'get', reverse('search') + '?q=task', None, 200, 3),
+        ('changes', collaboratore, 'get', reverse('changes'), None, 200, 6),
+        ('tasks-create', collaboratore, 'post', reverse('tasks-list'),
+         {'titolo': 'Nuovo', 'progetto': progetto.id, 'stato': 'TODO'}, 201, 10),
+        ('tasks-detail', collaboratore, 'get', reverse('tasks-detail', args=[task.id]), None, 200, 3),
+        ('tasks-update', collaboratore, 'patch', reverse('tasks-detail', args=[task.id]),
+         {'stato': 'DONE'}, 200, 9),
+        ('tasks-delete', proprietario, 'delete', reverse('tasks-detail', args=[task.id]), None, 204, 10),
+        ('tasks-bulk-create', collaboratore, 'post', reverse('tasks-bulk-create'),
+         [{'titolo': f'Bulk {i}', 'progetto': progetto.id, 'assigned_to_id': collaboratore.id}
+          for i in range(100)], 201, 12),
+        ('tasks-bulk-update', collaboratore, 'patch', reverse('tasks-bulk-update'),
+         [{'id': t.id, 'stato': 'DONE'} for t in progetto.tasks.exclude(pk=task.pk)[:100]], 200, 15),
+        ('tasks-bulk-delete', proprietario, 'post', reverse('tasks-bulk-delete'),
+         {'ids': list(progetto.tasks.exclude(pk=task.pk).values_list('id', flat=True)[:100])}, 200, 12),
+        ('projects-delete', proprietario, 'delete', reverse('projects-detail', args=[progetto.id]), None, 204, 11),
+    ]
+
+
+def queryset_task():
+    return Task.objects.con_ritardo().order_by('-data_creazione', '-id')
+
+
+def queryset_progetti():
+    return Progetto.objects.order_by('-data_creazione', '-id')
+
+
+def serializza_con_serializer(serializer_class, queryset):
+    """JSON della lista con il serializer DRF e `JSONRenderer`"""
+    righe = serializer_class.ottimizza_queryset(queryset())
+    return JSONRenderer().render(serializer_class(righe, many=True).data)
+
+
+def serializza_rapida(serializer_class, lista_class, queryset):
+    """JSON della lista rapida con `FastJSONRenderer`"""
+    lista = lista_class.per_serializer(serializer_class())
+    return FastJSONRenderer().render(lista.serializza(list(lista.queryset(queryset()))))
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+class TestBenchmarkEndpoint:
+    """
+    Budget di query e di tempo per ogni endpoint su un dataset realistico.
+    """
+
+    def test_endpoint_progetti_e_task(self, dataset, settings):
+        # Il flusso SSE si chiude dopo il primo invio degli eventi
+        settings.EVENTI_SSE_DURATA = 0
+        superati = []
+        for nome, utente, metodo, url, body, atteso, budget in endpoint_progetti(dataset):
+            kwargs = {'data': body} if body is not None else {}
+            response, risultato = misura(nome, client_per(utente), metodo, url, **kwargs)
+            assert response.status_code == atteso, f"{nome}: {response.status_code}"
+            if risultato['query'] > budget or risultato['tempo_ms'] > BUDGET_TEMPO_MS:
+                superati.append(f"{nome}: {risultato['query']}/{budget} query, {risultato['tempo_ms']} ms")
+        assert not superati, "Budget superati:\n" + "\n".join(superati)
+
+    def test_endpoint_autenticazione(self, dataset):
+        client = APIClient()
+        response, risultato = misura('register', client, 'post', reverse('register'), data={
+            'username': 'bench_nuovo', 'email': 'bench_nuovo@example.com',
+            'password': 'Password.Complessa.123', 'password_confirm': 'Password.Complessa.123',
+            'nome': 'Bench', 'cognome': 'Mark',
+        })
+        assert response.status_code == 201
+        assert risultato['query'] <= 4
+
+        response, risultato = misura('token_obtain_pair', client, 'post', reverse('token_obtain_pair'), data={
+            'username': 'bench_nuovo', 'password': 'Password.Complessa.123',
+        })
+        assert response.status_code == 200
+        assert risultato['query'] <= 2
+        refresh = response.data['refresh']
+
+        response, risultato = misura('token_refresh', client, 'post', reverse('token_refresh'),
+                                     data={'refresh': refresh})
+        assert response.status_code == 200
+        assert risultato['query'] <= 6
+        refresh = response.data['refresh']
+
+        utente = client_per(User.objects.get(username='bench_nuovo'))
+        response, risultato = misura('profile', utente, 'get', reverse('profile'))
+        assert response.status_code == 200
+        assert risultato['query'] <= 1
+
+        admin = client_per(User.objects.create_user(username='bench_admin', password='testpass', is_staff=True))
+        response, risultato = misura('metrics', admin, 'get', reverse('metrics'))
+        assert response.status_code == 200
+        assert risultato['query'] <= 1
+
+        response, risultato = misura('logout', utente, 'post', reverse('logout'), data={'refresh': refresh})
+        assert response.status_code == 200
+        assert risultato['query'] <= 10
+
+        assert set(ENDPOINT_AUTENTICAZIONE) <= {misura['endpoint'] for misura in MISURE}
+
+    def test_tutti_gli_endpoint_misurati(self, dataset):
+        """Ogni URL di `progetti/urls.py` e `autenticazione/urls.py` ha una misura nel benchmark"""
+        misurati = {resolve(urlsplit(url).path).url_name for _, _, _, url, *_ in endpoint_progetti(dataset)}
+        misurati.update(ENDPOINT_AUTENTICAZIONE)
+        definiti = nomi_url(progetti_urls.urlpatterns) | nomi_url(autenticazione_urls.urlpatterns)
+        assert not definiti - misurati, f"Endpoint senza benchmark: {sorted(definiti - misurati)}"
+
+    @pytest.mark.parametrize('url_name', ['projects-list', 'tasks-list'])
+    @pytest.mark.parametrize('cursor', ['', '?cursor='])
+    def test_query_costanti_rispetto_alla_pagina(self, dataset, monkeypatch, settings, url_name, cursor):
+        # Misura le query della lista: la cache delle risposte restituirebbe la prima pagina letta
+        settings.RISPOSTE_CACHE_TIMEOUT = 0
+        client = client_per(dataset['proprietario'])
+        url = reverse(url_name) + cursor
+        # La prima request carica l'utente nella cache dell'autenticazione
+        client.get(url)
+        conteggi = []
+        for page_size in (2, 10):
+            monkeypatch.setattr(OptionalKeysetPagination, 'page_size', page_size)
+            response, risultato = misura(f'{url_name}{cursor} (page_size={page_size})', client, 'get', url)
+            assert response.status_code == 200
+            assert len(response.data['results']) == page_size
+            conteggi.append(risultato['query'])
+        assert conteggi[0] == conteggi[1], f"Le query crescono con la pagina: {conteggi}"
+
+    @pytest.mark.parametrize('serializer_class, lista_class, queryset, max_query', [
+        (TaskSerializer, ListaTaskRapida, queryset_task, 1),
+        (ProjectSerializer, ListaProgettiRapida, queryset_progetti, 2),
+    ])
+    def test_serializzazione_rapida(self, dataset, django_assert_max_num_queries,
+                                    serializer_class, lista_class, queryset, max_query):
+        """
+        La lista rapida con `FastJSONRenderer` produce lo stesso JSON del serializer con
+        `JSONRenderer`, sullo stesso queryset, con un numero di query che non dipende dalle righe.
+        """
+        atteso = serializza_con_serializer(serializer_class, queryset)
+        with django_assert_max_num_queries(max_query):
+            assert serializza_rapida(serializer_class, lista_class, queryset) == atteso
+
+    @pytest.mark.parametrize('serializer_class, lista_class, queryset', [
+        (TaskSerializer, ListaTaskRapida, queryset_task),
+        (ProjectSerializer, ListaProgettiRapida, queryset_progetti),
+    ])
+    def test_misura_serializzazione_rapida(self, dataset, serializer_class, lista_class, queryset):
+        """
+        Righe al secondo (lettura, serializzazione e JSON) del serializer e della lista rapida.
+        Le misure vanno solo nel report: un confronto tra tempi non è affidabile nei test.
+        """
+        righe = queryset().count()
+        funzioni = {
+            'serializer': lambda: serializza_con_serializer(serializer_class, queryset),
+            'rapida': lambda: serializza_rapida(serializer_class, lista_class, queryset),
+        }
+        tempi = {}
+        for nome, funzione in funzioni.items():
+            inizio = time.perf_counter()
+            funzione()
+            tempi[nome] = time.perf_counter() - inizio
+
+        misure = {nome: round(righe / durata) for nome, durata in tempi.items()}
+        MISURE.append({
+            'endpoint': f'serializzazione {serializer_class.__name__}',
+            'righe': righe,
+            'righe_al_secondo_serializer': misure['serializer'],
+            'righe_al_secondo_rapida': misure['rapida'],
+        })
+        logging.info(f"{serializer_class.__name__}: {righe} righe, serializer {misure['serializer']} righe/s, "
+                     f"rapida {misure['rapida']} righe/s")
@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from progetti.models import Progetto, Task
+
+
+@pytest.mark.django_db
+class TestTaskBulk:
+    """
+    Test delle operazioni massive sui task: creazione, aggiornamento ed eliminazione
+    in un'unica transazione con errori riportati per elemento.
+    """
+
+    @pytest.mark.positivo
+    def test_creazione_massiva(self, client_collaboratore, progetto, user_collaboratore):
+        url = reverse('tasks-bulk-create')
+        dati = [
+            {'titolo': f'Task {i}', 'progetto': progetto.id, 'stato': 'TODO',
+             'assigned_to_id': user_collaboratore.id}
+            for i in range(50)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = client_collaboratore.post(url, dati, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data) == 50
+        assert response.data[0]['assegnatario']['id'] == user_collaboratore.id
+        assert response.data[0]['autore']['id'] == user_collaboratore.id
+        # Il numero di query non dipende dal numero di task
+        assert len(queries.captured_queries) <= 12
+        progetto.refresh_from_db()
+        assert progetto.todo_tasks == 50
+
+    @pytest.mark.negativo
+    def test_creazione_massiva_errori_per_elemento(self, client_collaboratore, progetto, user_estraneo):
+        altro = Progetto.objects.create(nome='Altro', proprietario=user_estraneo)
+        url = reverse('tasks-bulk-create')
+        response = client_collaboratore.post(url, [
+            {'titolo': 'Valido', 'progetto': progetto.id},
+            {'titolo': 'Progetto non accessibile', 'progetto': altro.id},
+            {'titolo': 'Assegnatario estraneo', 'progetto': progetto.id, 'assigned_to_id': user_estraneo.id},
+            {'progetto': progetto.id},
+        ], format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        errori = response.data['errors']
+        assert errori[0] == {}
+        assert 'progetto' in errori[1]
+        assert 'assigned_to_id' in errori[2]
+        assert 'titolo' in errori[3]
+        assert not Task.objects.exists()
+
+    @pytest.mark.positivo
+    def test_aggiornamento_massivo(self, client_collaboratore, progetto, task, task_creato_dal_collaboratore):
+        url = reverse('tasks-bulk-update')
+        response = client_collaboratore.patch(url, [
+            {'id': task.id, 'stato': 'DONE'},
+            {'id': task_creato_dal_collaboratore.id, 'titolo': 'Rinominato'},
+        ], format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]['stato'] == 'DONE'
+        assert response.data[1]['titolo'] == 'Rinominato'
+        progetto.refresh_from_db()
+        assert (progetto.todo_tasks, progetto.done_tasks) == (1, 1)
+
+    @pytest.mark.negativo
+    def test_aggiornamento_massivo_task_non_accessibile(self, client_estraneo, task):
+        url = reverse('tasks-bulk-update')
+        response = client_estraneo.patch(url, [{'id': task.id, 'stato': 'DONE'}], format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        task.refresh_from_db()
+        assert task.stato == 'TODO'
+
+    @pytest.mark.positivo
+    def test_eliminazione_massiva(self, client_proprietario, progetto, task, task_creato_dal_collaboratore):
+        url = reverse('tasks-bulk-delete')
+        response = client_proprietario.post(url, {'ids': [task.id, task_creato_dal_collaboratore.id]}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['eliminati'] == 2
+        progetto.refresh_from_db()
+        assert progetto.task_totali == 0
+
+    @pytest.mark.negativo
+    def test_collaboratore_non_elimina_task_altrui(self, client_collaboratore, task, task_creato_dal_collaboratore):
+        url = reverse('tasks-bulk-delete')
+        response = client_collaboratore.post(url, {'ids': [task.id, task_creato_dal_collaboratore.id]}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Task.objects.count() == 2
@@ -0,0 +1,184 @@
+import threading
+import time
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.response import Response
+
+from progetti import coalescenza
+from progetti.views import ProjectViewSet
+
+
+def in_parallelo(funzione, n):
+    """Esegue `funzione` in `n` thread; restituisce risultati ed eccezioni in ordine"""
+    esiti = [None] * n
+
+    def esegui(i):
+        try:
+            esiti[i] = ('ok', funzione())
+        except Exception as exc:
+            esiti[i] = ('errore', exc)
+
+    threads = [threading.Thread(target=esegui, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, esiti
+
+
+class CalcoloBloccato:
+    """Calcolo che termina solo quando il test lo sblocca, contando le esecuzioni"""
+
+    def __init__(self, errore=None):
+        self.sblocca = threading.Event()
+        self.esecuzioni = 0
+        self.errore = errore
+
+    def __call__(self):
+        self.esecuzioni += 1
+        self.sblocca.wait(5)
+        if self.errore:
+            raise self.errore
+        return {'valore': 42}
+
+
+class TestCoalescenza:
+    """
+    Test del single-flight: calcolo condiviso, propagazione degli errori e attesa massima.
+    """
+
+    @pytest.mark.positivo
+    def test_calcolo_condiviso(self, settings):
+        settings.COALESCENZA_ATTESA = 5
+        calcolo = CalcoloBloccato()
+        condivise = coalescenza.metriche()['condivise']
+        threads, esiti = in_parallelo(lambda: coalescenza.esegui('chiave', calcolo), 5)
+        time.sleep(0.2)
+        calcolo.sblocca.set()
+        for thread in threads:
+            thread.join()
+
+        assert calcolo.esecuzioni == 1
+        assert [esito for esito, _ in esiti] == ['ok'] * 5
+        assert all(risultato is esiti[0][1] for _, risultato in esiti)
+        assert coalescenza.metriche()['condivise'] == condivise + 4
+        assert coalescenza.metriche()['in_corso'] == 0
+
+    @pytest.mark.positivo
+    def test_chiavi_diverse_non_condivise(self, settings):
+        settings.COALESCENZA_ATTESA = 5
+        calcolo = CalcoloBloccato()
+        calcolo.sblocca.set()
+        assert coalescenza.esegui('a', calcolo) == coalescenza.esegui('b', calcolo)
+        assert calcolo.esecuzioni == 2
+
+    @pytest.mark.negativo
+    def test_errore_propagato(self, settings):
+        settings.COALESCENZA_ATTESA = 5
+        calcolo = CalcoloBloccato(errore=ValueError('query fallita'))
+        threads, esiti = in_parallelo(lambda: coalescenza.esegui('errore', calcolo), 3)
+        time.sleep(0.2)
+        calcolo.sblocca.set()
+        for thread in threads:
+            thread.join()
+
+        assert calcolo.esecuzioni == 1
+        assert all(esito == 'errore' and isinstance(exc, ValueError) for esito, exc in esiti)
+        assert coalescenza.metriche()['in_corso'] == 0
+
+    @pytest.mark.negativo
+    def test_attesa_scaduta(self, settings):
+        settings.COALESCENZA_ATTESA = 0.1
+        calcolo = CalcoloBloccato()
+        scadute = coalescenza.metriche()['scadute']
+        primo, _ = in_parallelo(lambda: coalescenza.esegui('lenta', calcolo), 1)
+        time.sleep(0.05)
+        secondo, esiti = in_parallelo(lambda: coalescenza.esegui('lenta', calcolo), 1)
+        time.sleep(0.3)
+        # Scaduta l'attesa, la seconda richiesta esegue il calcolo per conto proprio
+        assert calcolo.esecuzioni == 2
+        assert coalescenza.metriche()['scadute'] == scadute + 1
+        calcolo.sblocca.set()
+        for thread in primo + secondo:
+            thread.join()
+        assert esiti == [('ok', {'valore': 42})]
+
+    @pytest.mark.negativo
+    def test_disattivata(self, settings):
+        settings.COALESCENZA_ATTESA = 0
+        calcolo = CalcoloBloccato()
+        calcolo.sblocca.set()
+        coalescenza.esegui('chiave', calcolo)
+        coalescenza.esegui('chiave', calcolo)
+        assert calcolo.esecuzioni == 2
+        assert coalescenza.metriche()['in_corso'] == 0
+
+
+@pytest.mark.django_db
+class TestCoalescenzaEndpoint:
+    """
+    Chiavi della coalescenza per statistiche e task del progetto.
+    """
+
+    @pytest.fixture
+    def chiavi(self, monkeypatch):
+        chiavi = []
+
+        def esegui(chiave, funzione):
+            chiavi.append(chiave)
+            return funzione()
+        monkeypatch.setattr(coalescenza, 'esegui', esegui)
+        return chiavi
+
+    @pytest.mark.positivo
+    @pytest.mark.parametrize('url_name', ['projects-stats', 'projects-tasks'])
+    def test_stessa_chiave_per_i_membri(self, client_proprietario, client_collaboratore, progetto, task,
+                                        chiavi, url_name):
+        url = reverse(url_name, args=[progetto.id]) + '?fields=id'
+        proprietario = client_proprietario.get(url)
+        collaboratore = client_collaboratore.get(url)
+        assert proprietario.status_code == collaboratore.status_code == status.HTTP_200_OK
+        assert proprietario.content == collaboratore.content
+        assert len(chiavi) == 2 and chiavi[0] == chiavi[1]
+        assert chiavi[0][1] == progetto.id
+
+    @pytest.mark.positivo
+    def test_parametri_diversi(self, client_collaboratore, progetto, task, chiavi):
+        url = reverse('projects-tasks', args=[progetto.id])
+        client_collaboratore.get(url)
+        client_collaboratore.get(url + '?stato=DONE')
+        assert chiavi[0] != chiavi[1]
+
+    @pytest.mark.negativo
+    def test_estraneo_non_coalescente(self, client_estraneo, progetto, chiavi):
+        for url_name in ('projects-stats', 'projects-tasks'):
+            response = client_estraneo.get(reverse(url_name, args=[progetto.id]))
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert chiavi == []
+
+    @pytest.mark.negativo
+    def test_export_non_coalescente(self, client_collaboratore, progetto, task, chiavi):
+        response = client_collaboratore.get(reverse('projects-tasks', args=[progetto.id]) + '?export=ndjson')
+        assert response.status_code == status.HTTP_200_OK
+        assert chiavi == []
+
+    @pytest.mark.negativo
+    def test_nuova_chiave_dopo_una_scrittura(self, client_collaboratore, progetto, task, chiavi):
+        url = reverse('projects-tasks', args=[progetto.id])
+        client_collaboratore.get(url)
+        task.titolo = 'Modificato'
+        task.save()
+        response = client_collaboratore.get(url)
+        assert response.data[0]['titolo'] == 'Modificato'
+        # La richiesta dopo la scrittura non può attendere un calcolo iniziato prima
+        assert chiavi[0] != chiavi[1]
+
+    @pytest.mark.positivo
+    def test_intestazioni_condivise(self, rf, settings, user_collaboratore, progetto):
+        settings.COALESCENZA_ATTESA = 5
+        request = rf.get('/')
+        request.user = user_collaboratore
+        view = ProjectViewSet(action='stats', kwargs={'pk': progetto.id})
+        response = view._condivisa(request, lambda: Response({'valore': 42}, headers={'Cache-Control': 'private'}))
+        assert response.data == {'valore': 42}
+        assert response['Cache-Control'] == 'private'
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+
+from progetti.models import Task
+
+
+@pytest.mark.django_db
+class TestGetCondizionali:
+    """
+    Test delle GET condizionali (ETag) su dettaglio progetto, statistiche e task del progetto.
+    """
+
+    @pytest.mark.positivo
+    @pytest.mark.parametrize('url_name', ['projects-detail', 'projects-stats', 'projects-tasks'])
+    def test_304_se_invariato(self, client_collaboratore, progetto, task, url_name):
+        url = reverse(url_name, args=[progetto.id])
+        response = client_collaboratore.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response['ETag']
+        assert not response.has_header('Last-Modified')
+
+        response = client_collaboratore.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+
+    @pytest.mark.positivo
+    def test_modifica_task_cambia_etag(self, client_collaboratore, progetto, task):
+        url = reverse('projects-tasks', args=[progetto.id])
+        etag = client_collaboratore.get(url)['ETag']
+
+        task.titolo = 'Titolo modificato'
+        task.save()
+        response = client_collaboratore.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]['titolo'] == 'Titolo modificato'
+
+    @pytest.mark.positivo
+    def test_cambio_stato_cambia_etag_stats(self, client_collaboratore, progetto, task):
+        url = reverse('projects-stats', args=[progetto.id])
+        etag = client_collaboratore.get(url)['ETag']
+
+        task.stato = 'DONE'
+        task.save()
+        response = client_collaboratore.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['done_tasks'] == 1
+
+    @pytest.mark.positivo
+    def test_modifica_collaboratori_cambia_etag(self, client_proprietario, progetto, user_estraneo):
+        url = reverse('projects-detail', args=[progetto.id])
+        etag = client_proprietario.get(url)['ETag']
+
+        progetto.collaboratori.add(user_estraneo)
+        response = client_proprietario.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['collaboratori']) == 2
+
+    @pytest.mark.negativo
+    @pytest.mark.parametrize('url_name', ['projects-stats', 'projects-tasks'])
+    def test_if_modified_since_ignorato(self, client_collaboratore, progetto, task, url_name):
+        # La data di ultima modifica non copre contatori e rimozioni: conta solo l'ETag
+        url = reverse(url_name, args=[progetto.id])
+        client_collaboratore.get(url)
+        task.stato = 'DONE'
+        task.save()
+        response = client_collaboratore.get(url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.positivo
+    def test_eliminazione_task_cambia_etag(self, client_collaboratore, progetto, task, task_creato_dal_collaboratore):
+        url = reverse('projects-tasks', args=[progetto.id])
+        etag = client_collaboratore.get(url)['ETag']
+
+        Task.objects.filter(pk=task.pk).delete()
+        response = client_collaboratore.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert [t['id'] for t in response.data] == [task_creato_dal_collaboratore.id]
+
+    @pytest.mark.positivo
+    @pytest.mark.parametrize('url_name', ['projects-detail', 'projects-tasks'])
+    def test_modifica_utente_cambia_etag(self, client_collaboratore, progetto, task, user_proprietario, url_name):
+        url = reverse(url_name, args=[progetto.id])
+        etag = client_collaboratore.get(url)['ETag']
+
+        user_proprietario.username = 'rinominato'
+        user_proprietario.save()
+        response = client_collaboratore.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.positivo
+    def test_task_scaduto_cambia_etag(self, client_collaboratore, progetto, task):
+        Task.objects.filter(pk=task.pk).update(scadenza=timezone.now() + timedelta(hours=1))
+        url = reverse('projects-tasks', args=[progetto.id])
+        etag = client_collaboratore.get(url)['ETag']
+
+        # Il task diventa in ritardo senza che data_aggiornamento cambi, come allo scadere
+        # della scadenza (l'UPDATE massivo non aggiorna i campi auto_now)
+        Task.objects.filter(pk=task.pk).update(scadenza=timezone.now() - timedelta(hours=1))
+        response = client_collaboratore.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]['check_ritardo'] is True
+
+    @pytest.mark.negativo
+    def test_estraneo_non_riceve_304(self, client_collaboratore, client_estraneo, progetto):
+        url = reverse('projects-detail', args=[progetto.id])
+        etag = client_collaboratore.get(url)['ETag']
+
+        response = client_estraneo.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
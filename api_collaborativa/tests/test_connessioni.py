@@ -0,0 +1,176 @@
+import gc
+import threading
+import time
+
+import pytest
+from django.db import OperationalError, connections
+from django.db.utils import load_backend
+from django.urls import reverse
+from rest_framework import status
+
+from api_collaborativa.db import connessioni
+
+
+@pytest.fixture
+def crea_wrapper(tmp_path, django_db_blocker):
+    """
+    Crea wrapper del backend SQLite con pool su un database temporaneo: ognuno è una
+    connessione di Django che preleva e restituisce le connessioni del pool `alias`.
+    """
+    backend = load_backend('api_collaborativa.db.sqlite3')
+    wrappers = []
+
+    def crea(alias='pool_test', **pool):
+        settings_dict = connections.configure_settings({
+            'default': connections.settings['default'],
+            alias: {
+                'ENGINE': 'api_collaborativa.db.sqlite3',
+                'NAME': str(tmp_path / 'pool.sqlite3'),
+                'POOL': {'DIMENSIONE': 2, 'ATTESA': 1, 'DURATA': 300, **pool},
+            },
+        })[alias]
+        wrapper = backend.DatabaseWrapper(settings_dict, alias=alias)
+        wrapper.inc_thread_sharing()
+        wrappers.append(wrapper)
+        return wrapper
+
+    crea.wrappers = wrappers
+    with django_db_blocker.unblock():
+        yield crea
+        for wrapper in wrappers:
+            wrapper.close()
+    with connessioni._lock:
+        pool = connessioni._pool.pop('pool_test', None)
+    if pool is not None:
+        pool.chiudi()
+
+
+def metriche_pool():
+    return connessioni.metriche()['pool_test']
+
+
+class TestPoolConnessioni:
+    """
+    Test del pool delle connessioni con il backend SQLite: riuso, attesa, riciclo e health check.
+    """
+
+    @pytest.mark.positivo
+    def test_connessione_riusata(self, crea_wrapper):
+        wrapper = crea_wrapper()
+        wrapper.ensure_connection()
+        connessione = wrapper.connection
+        wrapper.close()
+        assert metriche_pool()['libere'] == 1
+
+        # Un'altra connessione di Django (es. la richiesta successiva di un altro thread)
+        altro = crea_wrapper()
+        with altro.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        assert altro.connection is connessione
+        metriche = metriche_pool()
+        assert (metriche['prelievi'], metriche['riusate'], metriche['create']) == (2, 1, 1)
+        assert (metriche['aperte'], metriche['libere']) == (1, 0)
+
+    @pytest.mark.positivo
+    def test_attesa_di_una_connessione_libera(self, crea_wrapper):
+        occupata = crea_wrapper(DIMENSIONE=1)
+        occupata.ensure_connection()
+        threading.Timer(0.2, occupata.close).start()
+
+        wrapper = crea_wrapper(DIMENSIONE=1)
+        wrapper.ensure_connection()
+        metriche = metriche_pool()
+        assert metriche['attese'] == 1
+        assert metriche['attesa_massima_ms'] >= 150
+        assert metriche['create'] == 1
+
+    @pytest.mark.negativo
+    def test_attesa_scaduta(self, crea_wrapper):
+        crea_wrapper(DIMENSIONE=1, ATTESA=0.1).ensure_connection()
+        with pytest.raises(OperationalError):
+            crea_wrapper(DIMENSIONE=1, ATTESA=0.1).ensure_connection()
+        metriche = metriche_pool()
+        assert metriche['scaduti'] == 1
+        assert metriche['aperte'] == 1
+
+    @pytest.mark.negativo
+    def test_connessione_scaduta_riciclata(self, crea_wrapper):
+        wrapper = crea_wrapper(DURATA=0.1)
+        wrapper.ensure_connection()
+        connessione = wrapper.connection
+        wrapper.close()
+        time.sleep(0.15)
+
+        wrapper.ensure_connection()
+        assert wrapper.connection is not connessione
+        metriche = metriche_pool()
+        assert (metriche['riciclate'], metriche['chiuse'], metriche['create']) == (1, 1, 2)
+        assert metriche['aperte'] == 1
+
+    @pytest.mark.negativo
+    def test_connessione_non_valida_scartata(self, crea_wrapper):
+        wrapper = crea_wrapper()
+        wrapper.ensure_connection()
+        connessione = wrapper.connection
+        wrapper.close()
+        # Connessione chiusa dal server mentre era libera nel pool
+        connessione.close()
+
+        wrapper.ensure_connection()
+        assert wrapper.connection is not connessione
+        assert metriche_pool()['scartate'] == 1
+
+    @pytest.mark.negativo
+    def test_chiusa_in_transazione_non_riusata(self, crea_wrapper):
+        wrapper = crea_wrapper()
+        wrapper.ensure_connection()
+        wrapper.set_autocommit(False)
+        wrapper.in_atomic_block = True
+        wrapper.close()
+        wrapper.in_atomic_block = False
+        assert metriche_pool()['libere'] == 0
+        assert metriche_pool()['aperte'] == 0
+
+    @pytest.mark.negativo
+    def test_wrapper_eliminato_libera_il_posto(self, crea_wrapper):
+        wrapper = crea_wrapper(DIMENSIONE=1, ATTESA=0.1)
+        wrapper.ensure_connection()
+        wrapper.dec_thread_sharing()
+        crea_wrapper.wrappers.remove(wrapper)
+        del wrapper
+        gc.collect()
+        crea_wrapper(DIMENSIONE=1, ATTESA=0.1).ensure_connection()
+        assert metriche_pool()['chiuse'] == 1
+
+    @pytest.mark.negativo
+    def test_pool_disattivato(self, crea_wrapper):
+        wrapper = crea_wrapper(DIMENSIONE=0)
+        wrapper.ensure_connection()
+        wrapper.close()
+        assert 'pool_test' not in connessioni.metriche()
+
+    @pytest.mark.negativo
+    def test_nuovi_parametri_nuovo_pool(self, crea_wrapper, tmp_path):
+        wrapper = crea_wrapper()
+        wrapper.ensure_connection()
+        wrapper.close()
+        altro = crea_wrapper()
+        altro.settings_dict['NAME'] = str(tmp_path / 'test_pool.sqlite3')
+        altro.ensure_connection()
+        metriche = metriche_pool()
+        assert (metriche['prelievi'], metriche['create']) == (1, 1)
+
+
+@pytest.mark.django_db
+class TestMetricheConnessioni:
+    """
+    Metriche dei pool esposte dall'endpoint delle metriche.
+    """
+
+    @pytest.mark.positivo
+    def test_metriche(self, client_proprietario, user_proprietario):
+        user_proprietario.is_staff = True
+        user_proprietario.save()
+        response = client_proprietario.get(reverse('metrics'))
+        assert response.status_code == status.HTTP_200_OK
+        assert isinstance(response.data['connessioni'], dict)
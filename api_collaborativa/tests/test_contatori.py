@@ -0,0 +1,97 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from progetti.models import Progetto, Rimozione, Task
+
+
+def contatori(progetto):
+    progetto.refresh_from_db()
+    return progetto.todo_tasks, progetto.in_progress_tasks, progetto.done_tasks
+
+
+@pytest.mark.django_db
+class TestContatoriTask:
+    """
+    Test di verifica dei contatori denormalizzati dei task su Progetto:
+    ogni scrittura sui task (singola o massiva) deve mantenerli allineati.
+    """
+
+    @pytest.mark.positivo
+    def test_creazione_e_cambio_stato(self, progetto, task):
+        assert contatori(progetto) == (1, 0, 0)
+
+        task.stato = 'DONE'
+        task.save()
+        assert contatori(progetto) == (0, 0, 1)
+        assert progetto.percentuale_completamento() == 100.0
+
+    @pytest.mark.positivo
+    def test_eliminazione(self, progetto, task):
+        task.delete()
+        assert contatori(progetto) == (0, 0, 0)
+
+    @pytest.mark.negativo
+    def test_scritture_dallo_stesso_stato(self, progetto, task):
+        # Due richieste leggono il task nello stesso stato e lo salvano una dopo l'altra:
+        # la seconda calcola il delta dallo stato lasciato dalla prima, non da quello letto
+        prima, seconda = Task.objects.get(pk=task.pk), Task.objects.get(pk=task.pk)
+        prima.stato = 'DONE'
+        prima.save()
+        seconda.stato = 'IN_PROGRESS'
+        seconda.save()
+        assert contatori(progetto) == (0, 1, 0)
+
+        prima.delete()
+        seconda.delete()
+        assert contatori(progetto) == (0, 0, 0)
+
+    @pytest.mark.negativo
+    def test_spostamento_con_update_fields(self, progetto, task, user_proprietario):
+        altro = Progetto.objects.create(nome='Altro', proprietario=user_proprietario)
+        task.progetto_id = altro.id
+        task.save(update_fields=['progetto_id'])
+        assert contatori(progetto) == (0, 0, 0)
+        assert contatori(altro) == (1, 0, 0)
+        assert Rimozione.objects.filter(tipo=Rimozione.TASK, oggetto_id=task.id, progetto_id=progetto.id).exists()
+
+    @pytest.mark.positivo
+    def test_operazioni_massive(self, progetto, user_proprietario):
+        Task.objects.bulk_create([
+            Task(titolo=f'Task {i}', progetto=progetto, autore=user_proprietario)
+            for i in range(5)
+        ])
+        assert contatori(progetto) == (5, 0, 0)
+
+        Task.objects.filter(titolo__in=['Task 0', 'Task 1']).update(stato='IN_PROGRESS')
+        assert contatori(progetto) == (3, 2, 0)
+
+        tasks = list(Task.objects.filter(stato='TODO'))
+        for t in tasks:
+            t.stato = 'DONE'
+        Task.objects.bulk_update(tasks, ['stato'])
+        assert contatori(progetto) == (0, 2, 3)
+
+        Task.objects.filter(stato='DONE').delete()
+        assert contatori(progetto) == (0, 2, 0)
+
+    @pytest.mark.positivo
+    def test_eliminazione_autore(self, progetto, user_collaboratore, task_creato_dal_collaboratore, task):
+        user_collaboratore.delete()
+        assert contatori(progetto) == (1, 0, 0)
+
+    @pytest.mark.positivo
+    def test_comando_recount_corregge_disallineamenti(self, progetto, task):
+        Progetto.objects.filter(pk=progetto.pk).update(conteggio_done=7, conteggio_todo=0)
+        call_command('recount')
+        assert contatori(progetto) == (1, 0, 0)
+
+    @pytest.mark.positivo
+    def test_stats_usa_contatori(self, client_collaboratore, progetto, task):
+        url = reverse('projects-stats', args=[progetto.id])
+        response = client_collaboratore.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['task_totali'] == 1
+        assert response.data['todo_tasks'] == 1
+        assert response.data['percentuale_completamento'] == 0
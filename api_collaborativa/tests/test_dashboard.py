@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from progetti.models import Progetto, Task
+
+
+@pytest.mark.django_db
+class TestDashboard:
+    """
+    Test della dashboard con le statistiche di tutti i progetti dell'utente.
+    """
+
+    @pytest.fixture
+    def progetti(self, progetto, user_proprietario, user_collaboratore, user_estraneo):
+        adesso = timezone.now()
+        secondo = Progetto.objects.create(nome='Secondo', proprietario=user_collaboratore)
+        vuoto = Progetto.objects.create(nome='Vuoto', proprietario=user_proprietario)
+        vuoto.collaboratori.add(user_collaboratore)
+        privato = Progetto.objects.create(nome='Privato', proprietario=user_estraneo)
+        Task.objects.bulk_create([
+            Task(titolo='Scaduto', progetto=progetto, autore=user_proprietario,
+                 stato='TODO', scadenza=adesso - timedelta(days=1)),
+            Task(titolo='Completato', progetto=progetto, autore=user_proprietario,
+                 stato='DONE', scadenza=adesso - timedelta(days=1)),
+            Task(titolo='Futuro', progetto=progetto, autore=user_proprietario,
+                 stato='IN_PROGRESS', scadenza=adesso + timedelta(days=1)),
+            Task(titolo='Fatto', progetto=secondo, autore=user_collaboratore, stato='DONE'),
+            Task(titolo='Scaduto privato', progetto=privato, autore=user_estraneo,
+                 stato='TODO', scadenza=adesso - timedelta(days=1)),
+        ])
+        return progetto, secondo, vuoto
+
+    @pytest.mark.positivo
+    def test_statistiche_per_progetto_e_totali(self, client_collaboratore, progetti):
+        progetto, secondo, vuoto = progetti
+        response = client_collaboratore.get(reverse('projects-dashboard'))
+        assert response.status_code == status.HTTP_200_OK
+
+        righe = {p['id']: p for p in response.data['progetti']}
+        assert set(righe) == {progetto.id, secondo.id, vuoto.id}
+        assert righe[progetto.id] == {
+            'id': progetto.id, 'nome': progetto.nome, 'percentuale_completamento': 33.3,
+            'task_totali': 3, 'done_tasks': 1, 'in_progress_tasks': 1, 'todo_tasks': 1,
+            'task_in_ritardo': 1,
+        }
+        assert righe[secondo.id]['percentuale_completamento'] == 100
+        assert righe[vuoto.id]['task_totali'] == 0
+        assert response.data['totali'] == {
+            'progetti': 3, 'task_totali': 4, 'done_tasks': 2, 'in_progress_tasks': 1,
+            'todo_tasks': 1, 'task_in_ritardo': 1, 'percentuale_completamento': 50.0,
+        }
+
+    @pytest.mark.positivo
+    def test_una_sola_query(self, client_collaboratore, user_collaboratore, progetti):
+        # Autenticazione esclusa dal conteggio: l'utente è già noto
+        client_collaboratore.force_authenticate(user_collaboratore)
+        with CaptureQueriesContext(connection) as queries:
+            response = client_collaboratore.get(reverse('projects-dashboard'))
+        assert response.status_code == status.HTTP_200_OK
+        assert len(queries) == 1
+
+    @pytest.mark.negativo
+    def test_progetti_non_accessibili_esclusi(self, client_estraneo, progetti):
+        response = client_estraneo.get(reverse('projects-dashboard'))
+        assert response.status_code == status.HTTP_200_OK
+        assert [p['nome'] for p in response.data['progetti']] == ['Privato']
+        assert response.data['totali']['task_in_ritardo'] == 1
+
+    @pytest.mark.negativo
+    def test_richiede_autenticazione(self, api_client):
+        response = api_client.get(reverse('projects-dashboard'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,136 @@
+import json
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from progetti.models import EventoTask, Progetto, Task
+
+
+def eventi(progetto):
+    return list(EventoTask.objects.filter(progetto=progetto).order_by('pk').values_list('tipo', flat=True))
+
+
+def messaggi(response):
+    """Eventi del flusso SSE come lista di dizionari `id`, `event`, `data`"""
+    testo = b''.join(response).decode()
+    risultato = []
+    for blocco in testo.split('\n\n'):
+        campi = dict(riga.split(': ', 1) for riga in blocco.splitlines() if riga.startswith(('id:', 'event:', 'data:')))
+        if campi:
+            campi['data'] = json.loads(campi['data'])
+            risultato.append(campi)
+    return risultato
+
+
+@pytest.mark.django_db
+class TestEventiTask:
+    """
+    Test del registro degli eventi dei task.
+    """
+
+    @pytest.mark.positivo
+    def test_scritture_singole(self, progetto, task):
+        task.titolo = 'Nuovo titolo'
+        task.save(update_fields=['titolo'])
+        task.delete()
+        assert eventi(progetto) == ['creato', 'modificato', 'eliminato']
+
+    @pytest.mark.positivo
+    def test_operazioni_massive_e_spostamento(self, progetto, user_proprietario):
+        altro = Progetto.objects.create(nome='Altro', proprietario=user_proprietario)
+        Task.objects.bulk_create([
+            Task(titolo=f'Task {i}', progetto=progetto, autore=user_proprietario) for i in range(2)
+        ])
+        Task.objects.filter(titolo='Task 0').update(descrizione='Aggiornata')
+        Task.objects.filter(titolo='Task 1').update(progetto=altro)
+
+        assert eventi(progetto) == ['creato', 'creato', 'modificato', 'eliminato']
+        assert eventi(altro) == ['creato']
+
+    @pytest.mark.positivo
+    def test_notifica_nella_cache_condivisa(self, progetto, user_proprietario, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            task = Task.objects.create(titolo='Notificato', progetto=progetto, autore=user_proprietario)
+        ultimo = EventoTask.objects.filter(task_id=task.pk).latest('pk').pk
+        assert caches['condivisa'].get(f'progetti:eventi:{progetto.pk}:ultimo') == ultimo
+
+    @pytest.mark.positivo
+    def test_pulizia(self, progetto, task):
+        EventoTask.objects.update(data=timezone.now() - timezone.timedelta(days=8))
+        task.delete()
+        call_command('pulisci_eventi', giorni=7)
+        assert eventi(progetto) == ['eliminato']
+
+
+@pytest.mark.django_db
+class TestFlussoEventi:
+    """
+    Test del flusso SSE degli eventi di un progetto.
+    """
+
+    @pytest.fixture(autouse=True)
+    def flusso_breve(self, settings):
+        """Il flusso si chiude dopo il primo controllo"""
+        settings.EVENTI_SSE_DURATA = 0
+
+    @pytest.mark.positivo
+    def test_ripresa_da_last_event_id(self, client_collaboratore, progetto, task):
+        primo = EventoTask.objects.get(task_id=task.id)
+        task.titolo = 'Modificato'
+        task.save()
+        eliminato = Task.objects.create(titolo='Temporaneo', progetto=progetto, autore=task.autore)
+        eliminato.delete()
+
+        response = client_collaboratore.get(
+            reverse('projects-events', args=[progetto.id]), HTTP_LAST_EVENT_ID=str(primo.id)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'text/event-stream'
+
+        ricevuti = messaggi(response)
+        assert [m['event'] for m in ricevuti] == ['modificato', 'creato', 'eliminato']
+        assert ricevuti[0]['data']['task']['titolo'] == 'Modificato'
+        assert ricevuti[1]['data']['task'] is None and ricevuti[2]['data']['task'] is None
+        assert [int(m['id']) for m in ricevuti] == sorted(m['data']['id'] for m in ricevuti)
+
+    @pytest.mark.positivo
+    def test_senza_last_event_id_solo_nuovi_eventi(self, client_collaboratore, progetto, task):
+        response = client_collaboratore.get(reverse('projects-events', args=[progetto.id]))
+        assert response.status_code == status.HTTP_200_OK
+        assert messaggi(response) == []
+
+    @pytest.mark.positivo
+    def test_campi_del_task(self, client_collaboratore, progetto, task):
+        url = reverse('projects-events', args=[progetto.id]) + '?last_event_id=0&fields=id,stato'
+        ricevuti = messaggi(client_collaboratore.get(url))
+        assert ricevuti[0]['data']['task'] == {'id': task.id, 'stato': 'TODO'}
+
+    @pytest.mark.parametrize('rimosso', [False, True])
+    def test_keepalive_e_chiusura_se_non_piu_membro(self, client_collaboratore, progetto, user_collaboratore,
+                                                   settings, rimosso):
+        settings.EVENTI_SSE_KEEPALIVE = 0
+        response = client_collaboratore.get(reverse('projects-events', args=[progetto.id]))
+        if rimosso:
+            progetto.collaboratori.remove(user_collaboratore)
+        assert (b': keepalive' in b''.join(response)) is not rimosso
+
+    @pytest.mark.negativo
+    def test_progetto_non_accessibile(self, client_estraneo, progetto):
+        response = client_estraneo.get(reverse('projects-events', args=[progetto.id]))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.negativo
+    def test_autenticazione_richiesta(self, api_client, progetto):
+        response = api_client.get(reverse('projects-events', args=[progetto.id]))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.negativo
+    def test_last_event_id_non_valido(self, client_collaboratore, progetto):
+        response = client_collaboratore.get(
+            reverse('projects-events', args=[progetto.id]), HTTP_LAST_EVENT_ID='abc'
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from progetti.models import Task
+
+
+def contenuto(response):
+    assert response.streaming
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestExportTask:
+    """
+    Test dell'export in streaming dei task in formato NDJSON e CSV.
+    """
+
+    @pytest.fixture
+    def tasks(self, progetto, user_proprietario):
+        return Task.objects.bulk_create([
+            Task(titolo=f'Task {i}', progetto=progetto, autore=user_proprietario)
+            for i in range(15)
+        ])
+
+    @pytest.mark.positivo
+    def test_ndjson_task_del_progetto(self, client_collaboratore, progetto, tasks, settings):
+        settings.EXPORT_CHUNK_SIZE = 4
+        url = reverse('projects-tasks', args=[progetto.id]) + '?export=ndjson'
+        response = client_collaboratore.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/x-ndjson'
+        righe = [json.loads(r) for r in contenuto(response).splitlines()]
+        assert len(righe) == 15
+        assert righe[0]['autore']['username'] == 'owner'
+
+    @pytest.mark.positivo
+    def test_csv_lista_task(self, client_collaboratore, tasks):
+        response = client_collaboratore.get(reverse('tasks-list') + '?export=csv&fields=id,titolo,autore')
+        assert response.status_code == status.HTTP_200_OK
+        righe = list(csv.reader(io.StringIO(contenuto(response))))
+        assert righe[0] == ['id', 'titolo', 'autore']
+        assert len(righe) == 16
+
+    @pytest.mark.negativo
+    def test_formato_non_supportato(self, client_collaboratore, tasks):
+        response = client_collaboratore.get(reverse('tasks-list') + '?export=xml')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.negativo
+    def test_estraneo_non_esporta(self, client_estraneo, progetto, tasks):
+        url = reverse('projects-tasks', args=[progetto.id]) + '?export=ndjson'
+        response = client_estraneo.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
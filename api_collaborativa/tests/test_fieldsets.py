@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    """
+    Test dei parametri `fields` ed `expand` su progetti e task.
+    """
+
+    @pytest.mark.positivo
+    def test_fields_progetti(self, client_collaboratore, progetto):
+        response = client_collaboratore.get(reverse('projects-list') + '?fields=id,nome,task_totali')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'][0] == {'id': progetto.id, 'nome': progetto.nome, 'task_totali': 0}
+
+    @pytest.mark.positivo
+    def test_senza_collaboratori_nessun_prefetch(self, client_collaboratore, progetto):
+        with CaptureQueriesContext(connection) as completo:
+            client_collaboratore.get(reverse('projects-list'))
+        with CaptureQueriesContext(connection) as ridotto:
+            response = client_collaboratore.get(reverse('projects-list') + '?fields=id,nome')
+        assert response.status_code == status.HTTP_200_OK
+        assert len(ridotto.captured_queries) < len(completo.captured_queries)
+
+    @pytest.mark.positivo
+    def test_expand_progetti(self, client_collaboratore, progetto, user_proprietario, user_collaboratore):
+        url = reverse('projects-detail', args=[progetto.id]) + '?expand=proprietario'
+        response = client_collaboratore.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['proprietario']['username'] == user_proprietario.username
+        assert response.data['collaboratori'] == [user_collaboratore.id]
+
+    @pytest.mark.positivo
+    def test_task_come_id(self, client_collaboratore, task, user_proprietario):
+        response = client_collaboratore.get(reverse('tasks-list') + '?expand=&fields=id,titolo,autore')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'][0] == {'id': task.id, 'titolo': task.titolo, 'autore': user_proprietario.id}
+
+    @pytest.mark.positivo
+    @pytest.mark.parametrize('parametri', ['?fields=titolo', '?fields=titolo,autore&expand=autore', '?expand='])
+    def test_dettaglio_e_task_del_progetto(self, client_collaboratore, progetto, task, parametri):
+        for url in (reverse('tasks-detail', args=[task.id]), reverse('projects-tasks', args=[progetto.id])):
+            response = client_collaboratore.get(url + parametri)
+            assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.positivo
+    def test_scrittura_ignora_fields(self, client_proprietario, task):
+        url = reverse('tasks-detail', args=[task.id]) + '?fields=id'
+        response = client_proprietario.patch(url, {'titolo': 'Nuovo'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['titolo'] == 'Nuovo'
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from progetti.models import Task
+
+
+@pytest.mark.django_db
+class TestFiltriTask:
+    """
+    Test dei filtri e dell'ordinamento lato server sulle liste di task.
+    """
+
+    @pytest.fixture
+    def tasks(self, progetto, user_proprietario, user_collaboratore):
+        adesso = timezone.now()
+        return Task.objects.bulk_create([
+            Task(titolo='Scaduto', progetto=progetto, autore=user_proprietario,
+                 assegnatario=user_collaboratore, stato='TODO', scadenza=adesso - timedelta(days=2)),
+            Task(titolo='Scaduto ma completato', progetto=progetto, autore=user_proprietario,
+                 stato='DONE', scadenza=adesso - timedelta(days=1)),
+            Task(titolo='In corso', progetto=progetto, autore=user_collaboratore,
+                 assegnatario=user_collaboratore, stato='IN_PROGRESS', scadenza=adesso + timedelta(days=5)),
+            Task(titolo='Senza scadenza', progetto=progetto, autore=user_collaboratore, stato='TODO'),
+        ])
+
+    def titoli(self, client, parametri, url=None):
+        response = client.get((url or reverse('tasks-list')) + parametri)
+        assert response.status_code == status.HTTP_200_OK
+        risultati = response.data['results'] if isinstance(response.data, dict) else response.data
+        return [t['titolo'] for t in risultati]
+
+    @pytest.mark.positivo
+    def test_filtro_stato(self, client_collaboratore, tasks):
+        assert sorted(self.titoli(client_collaboratore, '?stato=TODO,IN_PROGRESS')) == [
+            'In corso', 'Scaduto', 'Senza scadenza'
+        ]
+
+    @pytest.mark.positivo
+    def test_filtro_assegnatario_e_autore(self, client_collaboratore, tasks, user_collaboratore):
+        assert sorted(self.titoli(client_collaboratore, f'?assegnatario={user_collaboratore.id}&stato=TODO')) == [
+            'Scaduto'
+        ]
+        assert sorted(self.titoli(client_collaboratore, '?assegnatario=null')) == [
+            'Scaduto ma completato', 'Senza scadenza'
+        ]
+        assert sorted(self.titoli(client_collaboratore, f'?autore={user_collaboratore.id}')) == [
+            'In corso', 'Senza scadenza'
+        ]
+
+    @pytest.mark.positivo
+    def test_filtro_scadenza_e_ritardo(self, client_collaboratore, progetto, tasks):
+        oggi = timezone.localdate()
+        assert sorted(self.titoli(client_collaboratore, f'?scadenza_dopo={oggi}')) == ['In corso']
+        url = reverse('projects-tasks', args=[progetto.id])
+        assert self.titoli(client_collaboratore, '?in_ritardo=true', url) == ['Scaduto']
+
+    @pytest.mark.positivo
+    def test_ordinamento(self, client_collaboratore, tasks):
+        assert self.titoli(client_collaboratore, '?ordering=-titolo') == [
+            'Senza scadenza', 'Scaduto ma completato', 'Scaduto', 'In corso'
+        ]
+
+    @pytest.mark.negativo
+    @pytest.mark.parametrize('parametri', [
+        '?stato=ARCHIVIATO', '?ordering=password', '?autore=abc', '?scadenza_prima=ieri',
+        '?cursor=&ordering=titolo',
+    ])
+    def test_parametri_non_validi(self, client_collaboratore, tasks, parametri):
+        response = client_collaboratore.get(reverse('tasks-list') + parametri)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,80 @@
+import logging
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+
+from autenticazione import hashing
+
+
+def registrazione(**campi):
+    dati = {
+        'username': 'nuovo', 'email': 'nuovo@example.com', 'password': 'Password-Sicura-123',
+        'password_confirm': 'Password-Sicura-123', 'nome': 'Nuovo', 'cognome': 'Utente',
+    }
+    dati.update(campi)
+    return dati
+
+
+@pytest.mark.django_db
+class TestHashingPassword:
+    """
+    Test di registrazione e login con l'hashing delle password nel pool limitato.
+    """
+
+    @pytest.mark.positivo
+    def test_registrazione_e_login(self, api_client, caplog):
+        # I log della registrazione sono formattati anche al livello DEBUG (come in pytest.ini)
+        caplog.set_level(logging.DEBUG)
+        response = api_client.post(reverse('register'), registrazione(), format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert User.objects.get(username='nuovo').check_password('Password-Sicura-123')
+
+        response = api_client.post(reverse('token_obtain_pair'),
+                                   {'username': 'nuovo', 'password': 'Password-Sicura-123'})
+        assert response.status_code == status.HTTP_200_OK
+        assert 'access' in response.data
+
+    @pytest.mark.negativo
+    @pytest.mark.parametrize('username', ['owner', 'inesistente'])
+    def test_credenziali_errate(self, api_client, user_proprietario, username):
+        response = api_client.post(reverse('token_obtain_pair'), {'username': username, 'password': 'errata'})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.negativo
+    def test_email_duplicata_senza_distinzione_maiuscole(self, api_client, user_proprietario, caplog):
+        caplog.set_level(logging.DEBUG)
+        user_proprietario.email = 'owner@example.com'
+        user_proprietario.save()
+        response = api_client.post(reverse('register'), registrazione(email='Owner@Example.com'), format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'email' in response.data['errors']
+        assert any(r.getMessage().startswith('Registrazione non valida') for r in caplog.records)
+
+    @pytest.mark.negativo
+    def test_coda_piena(self, api_client, user_proprietario, settings):
+        settings.HASHING_CODA_MASSIMA = 0
+        rifiutati = hashing.metriche()['rifiutati']
+        response = api_client.post(reverse('token_obtain_pair'), {'username': 'owner', 'password': 'testpass'})
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        response = api_client.post(reverse('register'), registrazione(), format='json')
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert not User.objects.filter(username='nuovo').exists()
+        assert hashing.metriche()['rifiutati'] == rifiutati + 2
+
+    @pytest.mark.positivo
+    def test_metriche(self, api_client, user_proprietario):
+        eseguiti = hashing.metriche()['eseguiti']
+        api_client.post(reverse('token_obtain_pair'), {'username': 'owner', 'password': 'testpass'})
+        user_proprietario.is_staff = True
+        user_proprietario.save()
+        api_client.force_authenticate(user_proprietario)
+        response = api_client.get(reverse('metrics'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['hashing']['eseguiti'] == eseguiti + 1
+        assert response.data['hashing']['in_corso'] == 0
+
+    @pytest.mark.negativo
+    def test_metriche_solo_amministratori(self, client_proprietario):
+        assert client_proprietario.get(reverse('metrics')).status_code == status.HTTP_403_FORBIDDEN
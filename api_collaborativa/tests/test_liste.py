@@ -0,0 +1,109 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+
+from progetti import renderers
+from progetti.liste import ListaRapida, ListaTaskRapida
+from progetti.models import Progetto, Task
+from progetti.serializers import TaskSerializer
+
+URL_LISTE = [
+    ('projects-list', ''),
+    ('projects-list', '?cursor='),
+    ('projects-list', '?expand=proprietario'),
+    ('projects-list', '?expand=&fields=id,collaboratori,percentuale_completamento'),
+    ('projects-list', '?fields=nome,task_totali,done_tasks,data_aggiornamento'),
+    ('tasks-list', ''),
+    ('tasks-list', '?cursor=&autore=1'),
+    ('tasks-list', '?expand=assegnatario&ordering=scadenza'),
+    ('tasks-list', '?fields=id,check_ritardo,scadenza,progetto&stato=TODO'),
+    ('tasks-overdue', ''),
+]
+
+
+@pytest.fixture
+def dati(progetto, user_proprietario, user_collaboratore):
+    """Progetti con collaboratori condivisi e task con e senza assegnatario e scadenza"""
+    altri = [User.objects.create_user(username=f'utente{i}', email=f'u{i}@example.com', first_name='Àgata ')
+             for i in range(3)]
+    secondo = Progetto.objects.create(nome='Secondo "progetto"', descrizione='', proprietario=user_collaboratore)
+    secondo.collaboratori.add(user_proprietario, *altri)
+    progetto.collaboratori.add(*altri[:2])
+    ieri = timezone.now() - timedelta(days=1)
+    for i, (p, stato) in enumerate([(progetto, 'TODO'), (progetto, 'DONE'), (secondo, 'IN_PROGRESS'),
+                                    (secondo, 'DONE'), (progetto, 'TODO')]):
+        Task.objects.create(
+            titolo=f'Task {i}', descrizione='ünicode\n', progetto=p, stato=stato,
+            autore=user_proprietario if i % 2 else user_collaboratore,
+            assegnatario=altri[i % 3] if i % 2 else None,
+            scadenza=ieri if i < 3 else None,
+        )
+
+
+def percorso_drf(monkeypatch):
+    """Disattiva lista rapida e orjson: le risposte sono prodotte dai serializer e da JSONRenderer"""
+    monkeypatch.setattr(ListaRapida, 'per_serializer', classmethod(lambda cls, serializer: None))
+    monkeypatch.setattr(renderers, 'orjson', None)
+
+
+@pytest.mark.django_db
+class TestListeRapide:
+    """
+    Test della serializzazione rapida delle liste: output identico al percorso dei serializer.
+    """
+
+    @pytest.mark.positivo
+    @pytest.mark.parametrize('url_name, parametri', URL_LISTE)
+    def test_json_identico_ai_serializer(self, client_proprietario, dati, monkeypatch, url_name, parametri):
+        url = reverse(url_name) + parametri
+        chiamate = []
+        serializza = ListaRapida.serializza
+        monkeypatch.setattr(ListaRapida, 'serializza', lambda self, righe: chiamate.append(1) or serializza(self, righe))
+        rapida = client_proprietario.get(url)
+        assert rapida.status_code == status.HTTP_200_OK
+        assert chiamate, "Lista rapida non usata"
+
+        percorso_drf(monkeypatch)
+        serializer = client_proprietario.get(url)
+        assert serializer.status_code == status.HTTP_200_OK
+        assert rapida.content == serializer.content
+
+    @pytest.mark.positivo
+    def test_query_non_aumentano(self, client_proprietario, dati, monkeypatch):
+        for url_name in ('projects-list', 'tasks-list'):
+            client_proprietario.get(reverse(url_name))
+            with CaptureQueriesContext(connection) as rapida:
+                client_proprietario.get(reverse(url_name))
+            with monkeypatch.context() as m:
+                percorso_drf(m)
+                with CaptureQueriesContext(connection) as serializer:
+                    client_proprietario.get(reverse(url_name))
+            assert len(rapida.captured_queries) <= len(serializer.captured_queries)
+
+    @pytest.mark.positivo
+    def test_utenti_condivisi_tra_righe(self, user_proprietario, dati):
+        lista = ListaTaskRapida.per_serializer(TaskSerializer())
+        righe = lista.serializza(list(lista.queryset(Task.objects.all())))
+        autori = [riga['autore'] for riga in righe if riga['autore']['id'] == user_proprietario.id]
+        assert len(autori) > 1
+        assert all(autore is autori[0] for autore in autori)
+
+    @pytest.mark.negativo
+    def test_lista_vuota(self, client_estraneo):
+        for url_name in ('projects-list', 'tasks-list', 'tasks-overdue'):
+            response = client_estraneo.get(reverse(url_name))
+            assert response.status_code == status.HTTP_200_OK
+            assert response.data['results'] == []
+
+    @pytest.mark.negativo
+    def test_renderer_con_tipi_non_nativi(self):
+        dati = {'data': timezone.now(), 'importo': Decimal('1.50'), 'testo': 'a b'}
+        assert renderers.FastJSONRenderer().render(dati) == JSONRenderer().render(dati)
@@ -0,0 +1,87 @@
+import pytest
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import RequestFactory
+
+from progetti import membership
+from progetti.membership import is_member_id
+
+
+@pytest.mark.django_db
+class TestMembership:
+    """
+    Test della verifica di appartenenza a un progetto: al più una query per
+    progetto e per request, cache tra request invalidata dalle modifiche ai collaboratori.
+    """
+
+    @pytest.fixture(autouse=True)
+    def cache_tra_request(self, settings):
+        settings.MEMBERSHIP_CACHE_TIMEOUT = 300
+
+    @pytest.mark.positivo
+    def test_proprietario_senza_query(self, progetto, user_proprietario, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            assert progetto.is_member(user_proprietario)
+
+    @pytest.mark.positivo
+    def test_una_query_per_request(self, progetto, user_collaboratore, django_assert_num_queries, settings):
+        settings.MEMBERSHIP_CACHE_TIMEOUT = 0
+        request = RequestFactory().get('/')
+        with django_assert_num_queries(1):
+            assert progetto.is_member(user_collaboratore, request)
+            assert progetto.is_member(user_collaboratore, request)
+            assert progetto.is_member(user_collaboratore.id, request)
+
+    @pytest.mark.positivo
+    def test_cache_tra_request(self, progetto, user_collaboratore, django_assert_num_queries):
+        assert progetto.is_member(user_collaboratore, RequestFactory().get('/'))
+        with django_assert_num_queries(0):
+            assert progetto.is_member(user_collaboratore, RequestFactory().get('/'))
+
+    @pytest.mark.negativo
+    def test_invalidazione_su_rimozione_collaboratore(self, progetto, user_collaboratore):
+        assert progetto.is_member(user_collaboratore)
+        progetto.collaboratori.remove(user_collaboratore)
+        assert not progetto.is_member(user_collaboratore)
+
+    @pytest.mark.negativo
+    def test_invalidazione_al_commit(self, progetto, user_collaboratore, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            progetto.collaboratori.remove(user_collaboratore)
+            # Una request concorrente legge i dati precedenti al commit e li memorizza
+            chiave = f'progetti:membri:{progetto.pk}:{membership._versione(progetto.pk)}:{user_collaboratore.pk}'
+            cache.set(chiave, True)
+        assert not progetto.is_member(user_collaboratore)
+
+    @pytest.mark.negativo
+    def test_invalidazione_in_un_altro_processo(self, progetto, user_collaboratore, monkeypatch):
+        # Cache locale di un altro processo del server; le versioni sono nella cache condivisa
+        altro_processo = LocMemCache('altro_processo', {})
+        altro_processo.clear()
+        with monkeypatch.context() as m:
+            m.setattr(membership, 'cache', altro_processo)
+            assert progetto.is_member(user_collaboratore)
+
+        progetto.collaboratori.remove(user_collaboratore)
+
+        monkeypatch.setattr(membership, 'cache', altro_processo)
+        assert not progetto.is_member(user_collaboratore)
+
+    @pytest.mark.negativo
+    def test_cache_disattivata_di_default(self, progetto, user_collaboratore, django_assert_num_queries,
+                                          settings):
+        del settings.MEMBERSHIP_CACHE_TIMEOUT
+        assert progetto.is_member(user_collaboratore, RequestFactory().get('/'))
+        with django_assert_num_queries(1):
+            assert progetto.is_member(user_collaboratore, RequestFactory().get('/'))
+
+    @pytest.mark.positivo
+    def test_invalidazione_su_aggiunta_lato_utente(self, progetto, user_estraneo):
+        assert not progetto.is_member(user_estraneo)
+        user_estraneo.collaboratori_progetti.add(progetto)
+        assert progetto.is_member(user_estraneo)
+
+    @pytest.mark.negativo
+    def test_progetto_inesistente(self, user_proprietario):
+        assert not is_member_id(999999, user_proprietario)
+        assert not is_member_id('non-un-id', user_proprietario)
@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from progetti.models import Progetto, Task
+
+
+def scorri_pagine(client, url):
+    """Segue i link `next` fino all'ultima pagina e restituisce gli ID letti"""
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert 'count' not in response.data
+        ids.extend(item['id'] for item in response.data['results'])
+        url = response.data['next']
+    return ids
+
+
+@pytest.mark.django_db
+class TestPaginazioneKeyset:
+    """
+    Test della paginazione keyset opzionale (parametro `cursor`) su task e progetti.
+    """
+
+    @pytest.mark.positivo
+    def test_scorrimento_task_completo_e_stabile(self, client_collaboratore, progetto, user_proprietario):
+        Task.objects.bulk_create([
+            Task(titolo=f'Task {i}', progetto=progetto, autore=user_proprietario)
+            for i in range(25)
+        ])
+        ids = scorri_pagine(client_collaboratore, reverse('tasks-list') + '?cursor=')
+        attesi = list(Task.objects.order_by('-data_creazione', '-id').values_list('id', flat=True))
+        assert ids == attesi
+
+    @pytest.mark.positivo
+    def test_task_del_progetto(self, client_collaboratore, progetto, user_proprietario):
+        Task.objects.bulk_create([
+            Task(titolo=f'Task {i}', progetto=progetto, autore=user_proprietario)
+            for i in range(12)
+        ])
+        url = reverse('projects-tasks', args=[progetto.id]) + '?cursor='
+        assert len(scorri_pagine(client_collaboratore, url)) == 12
+
+    @pytest.mark.positivo
+    def test_nessun_count(self, client_proprietario, user_proprietario):
+        for i in range(3):
+            Progetto.objects.create(nome=f'P{i}', proprietario=user_proprietario)
+        with CaptureQueriesContext(connection) as queries:
+            response = client_proprietario.get(reverse('projects-list') + '?cursor=')
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == 3
+        assert not any('COUNT(' in q['sql'].upper() for q in queries.captured_queries)
+
+    @pytest.mark.positivo
+    def test_senza_cursor_paginazione_numerata(self, client_collaboratore, task):
+        response = client_collaboratore.get(reverse('tasks-list'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 1
+
+    @pytest.mark.negativo
+    def test_cursor_non_valido(self, client_collaboratore, task):
+        response = client_collaboratore.get(reverse('tasks-list') + '?cursor=xyz')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -107,3 +107,54 @@ class TestProgettoViewSet:
         response = client_collaboratore.get(url)
         assert response.status_code == status.HTTP_200_OK
         assert any(p['id'] == progetto.id for p in response.data['results'])
+
+
+@pytest.mark.django_db
+class TestGestioneCollaboratori:
+    """
+    Test dell'aggiunta e rimozione di più collaboratori con una sola richiesta.
+    """
+    @pytest.mark.positivo
+    def test_aggiunta_e_rimozione_in_blocco(self, client_proprietario, progetto, user_proprietario,
+                                           user_collaboratore, user_estraneo):
+        """
+        Test Steps:
+        - Il proprietario aggiunge l'estraneo e rimuove il collaboratore in una sola richiesta
+        - Verifica gli ID applicati, ignorati e sconosciuti
+        """
+        url = reverse('projects-manage-collaborators', args=[progetto.id])
+        response = client_proprietario.post(url, {
+            'add': [user_estraneo.id, user_proprietario.id, 999999],
+            'remove': [user_collaboratore.id],
+        }, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['add'] == {
+            'applicati': [user_estraneo.id],
+            'ignorati': [user_proprietario.id],
+            'sconosciuti': [999999],
+        }
+        assert response.data['remove']['applicati'] == [user_collaboratore.id]
+        assert list(progetto.collaboratori.values_list('id', flat=True)) == [user_estraneo.id]
+        assert progetto.is_member(user_estraneo)
+        assert not progetto.is_member(user_collaboratore)
+
+    @pytest.mark.negativo
+    def test_stesso_utente_in_add_e_remove(self, client_proprietario, progetto, user_estraneo):
+        url = reverse('projects-manage-collaborators', args=[progetto.id])
+        response = client_proprietario.post(url, {
+            'add': [user_estraneo.id], 'remove': [user_estraneo.id],
+        }, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.negativo
+    @pytest.mark.parametrize('body', [[1, 2], 5, 'add'])
+    def test_body_non_oggetto(self, client_proprietario, progetto, body):
+        url = reverse('projects-manage-collaborators', args=[progetto.id])
+        response = client_proprietario.post(url, body, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.negativo
+    def test_collaboratore_non_puo_gestire_collaboratori(self, client_collaboratore, progetto, user_estraneo):
+        url = reverse('projects-manage-collaborators', args=[progetto.id])
+        response = client_collaboratore.post(url, {'add': [user_estraneo.id]}, format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,171 @@
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connections, models, transaction
+from django.urls import reverse
+from rest_framework import status
+
+from progetti import membership, repliche, risposte
+from progetti.models import Progetto, Task
+
+ALIAS_REPLICA = 'replica_test'
+
+
+@pytest.fixture
+def replica(tmp_path, settings, django_db_blocker):
+    """
+    Database SQLite separato, con lo schema completo, configurato come unica replica.
+    I dati scritti solo qui permettono di riconoscere le letture servite dalla replica.
+    """
+    connections.settings[ALIAS_REPLICA] = connections.configure_settings({
+        'default': connections.settings['default'],
+        ALIAS_REPLICA: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(tmp_path / 'replica.sqlite3')},
+    })[ALIAS_REPLICA]
+    with django_db_blocker.unblock():
+        call_command('migrate', database=ALIAS_REPLICA, verbosity=0)
+    settings.DATABASE_REPLICHE = [ALIAS_REPLICA]
+    settings.RISPOSTE_CACHE_TIMEOUT = 0
+    yield ALIAS_REPLICA
+    connections[ALIAS_REPLICA].close()
+    del connections[ALIAS_REPLICA]
+    del connections.settings[ALIAS_REPLICA]
+
+
+@pytest.fixture
+def progetto_solo_in_replica(replica, user_proprietario):
+    """Lo stesso utente sulla replica, con un progetto che non esiste su default"""
+    User.objects.using(replica).create(id=user_proprietario.id, username=user_proprietario.username)
+    return Progetto.objects.using(replica).create(nome='Solo replica', proprietario_id=user_proprietario.id)
+
+
+def nomi_progetti(client):
+    response = client.get(reverse('projects-list'))
+    assert response.status_code == status.HTTP_200_OK
+    return [p['nome'] for p in response.data['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRepliche:
+    """
+    Test del router delle letture verso le repliche, con un database SQLite come replica.
+    Con transaction=True: dentro la transazione del test le letture resterebbero su default.
+    """
+
+    @pytest.mark.positivo
+    def test_get_dalla_replica(self, client_proprietario, progetto, progetto_solo_in_replica):
+        assert nomi_progetti(client_proprietario) == ['Solo replica']
+        response = client_proprietario.get(reverse('tasks-list'))
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.positivo
+    def test_read_your_writes(self, client_proprietario, progetto_solo_in_replica, settings):
+        response = client_proprietario.post(reverse('projects-list'), {'nome': 'Nuovo', 'descrizione': 'x'})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert not Progetto.objects.using(ALIAS_REPLICA).filter(nome='Nuovo').exists()
+
+        # Subito dopo la scrittura l'utente legge da default e vede il nuovo progetto
+        assert nomi_progetti(client_proprietario) == ['Nuovo']
+
+        # Scaduta la finestra (nella cache condivisa tra i processi) le letture tornano sulla replica
+        caches['condivisa'].clear()
+        assert nomi_progetti(client_proprietario) == ['Solo replica']
+
+    @pytest.mark.positivo
+    def test_finestra_per_utente(self, client_proprietario, client_collaboratore, progetto,
+                                 progetto_solo_in_replica, user_collaboratore):
+        User.objects.using(ALIAS_REPLICA).create(id=user_collaboratore.id, username=user_collaboratore.username)
+        client_collaboratore.post(reverse('projects-list'), {'nome': 'Del collaboratore', 'descrizione': 'x'})
+        assert nomi_progetti(client_proprietario) == ['Solo replica']
+
+    @pytest.mark.negativo
+    def test_senza_repliche(self, client_proprietario, progetto, settings):
+        settings.DATABASE_REPLICHE = []
+        assert nomi_progetti(client_proprietario) == [progetto.nome]
+
+    @pytest.mark.negativo
+    def test_transazione_e_scrittura_su_default(self, replica, rf, user_proprietario):
+        request = rf.get('/')
+        request.user = user_proprietario
+        token = repliche.inizia(request)
+        try:
+            router = repliche.ReplicaRouter()
+            assert router.db_for_read(Progetto) == replica
+            with transaction.atomic():
+                assert router.db_for_read(Progetto) is None
+            assert router.db_for_write(Progetto) is None
+            assert router.db_for_read(Progetto) is None
+        finally:
+            repliche.termina(request, token)
+        assert router.db_for_read(Progetto) is None
+        assert not router.allow_migrate(replica, 'progetti')
+
+    @pytest.mark.positivo
+    def test_export_in_streaming_dalla_replica(self, client_proprietario, progetto_solo_in_replica,
+                                               user_proprietario):
+        # Solo l'INSERT sulla replica, senza i contatori e gli eventi scritti su default da Task.save
+        task = Task(titolo='Task in replica', progetto_id=progetto_solo_in_replica.id, autore_id=user_proprietario.id)
+        models.Model.save(task, using=ALIAS_REPLICA)
+        response = client_proprietario.get(reverse('tasks-list') + '?export=ndjson')
+        assert response.status_code == status.HTTP_200_OK
+        # Il contenuto è prodotto dopo la fine della view, sempre dalla replica
+        assert b'Task in replica' in b''.join(response.streaming_content)
+
+    @pytest.mark.negativo
+    def test_risposte_dalla_replica_non_memorizzate(self, client_proprietario, progetto, replica,
+                                                     user_proprietario, settings):
+        settings.RISPOSTE_CACHE_TIMEOUT = 60
+        # La replica in ritardo ha ancora il nome precedente dello stesso progetto, la cui
+        # versione è appena cambiata: la risposta letta dalla replica non è memorizzata
+        User.objects.using(replica).create(id=user_proprietario.id, username=user_proprietario.username)
+        Progetto.objects.using(replica).create(id=progetto.id, nome='Nome precedente',
+                                               proprietario_id=user_proprietario.id)
+        assert nomi_progetti(client_proprietario) == ['Nome precedente']
+        settings.DATABASE_REPLICHE = []
+        assert nomi_progetti(client_proprietario) == [progetto.nome]
+
+    @pytest.mark.negativo
+    def test_membership_dalla_replica_non_memorizzata(self, rf, progetto_solo_in_replica, user_proprietario,
+                                                      settings):
+        settings.MEMBERSHIP_CACHE_TIMEOUT = 60
+        request = rf.get('/')
+        request.user = user_proprietario
+        token = repliche.inizia(request)
+        try:
+            assert membership.is_member_id(progetto_solo_in_replica.id, user_proprietario)
+        finally:
+            repliche.termina(request, token)
+        # Su default il progetto non esiste: il risultato della replica non era in cache
+        assert not membership.is_member_id(progetto_solo_in_replica.id, user_proprietario)
+
+    @pytest.mark.positivo
+    def test_risposte_dalla_replica_memorizzate_senza_modifiche_recenti(self, client_proprietario,
+                                                                       progetto_solo_in_replica, settings):
+        settings.RISPOSTE_CACHE_TIMEOUT = 60
+        settings.REPLICA_STICKY_SECONDI = 1
+        assert nomi_progetti(client_proprietario) == ['Solo replica']
+        # Trascorso il ritardo massimo della replica dall'ultima modifica la risposta è memorizzata
+        time.sleep(1.1)
+        hit = risposte.metriche()['hit']
+        assert nomi_progetti(client_proprietario) == ['Solo replica']
+        assert nomi_progetti(client_proprietario) == ['Solo replica']
+        assert risposte.metriche()['hit'] == hit + 1
+
+    @pytest.mark.positivo
+    def test_membership_dalla_replica_memorizzata_senza_modifiche_recenti(self, rf, progetto_solo_in_replica,
+                                                                          user_proprietario, settings):
+        settings.MEMBERSHIP_CACHE_TIMEOUT = 60
+        settings.REPLICA_STICKY_SECONDI = 1
+        membership._versione(progetto_solo_in_replica.id)
+        time.sleep(1.1)
+        request = rf.get('/')
+        request.user = user_proprietario
+        token = repliche.inizia(request)
+        try:
+            assert membership.is_member_id(progetto_solo_in_replica.id, user_proprietario)
+        finally:
+            repliche.termina(request, token)
+        # Il progetto esiste solo sulla replica: la risposta arriva dalla cache
+        assert membership.is_member_id(progetto_solo_in_replica.id, user_proprietario)
@@ -0,0 +1,68 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from progetti.models import Progetto, Task
+
+
+@pytest.mark.django_db
+class TestRicercaFullText:
+    """
+    Test della ricerca full-text su task e progetti.
+    """
+
+    @pytest.fixture
+    def dati(self, progetto, user_proprietario, user_estraneo):
+        progetto.descrizione = 'Migrazione del database di fatturazione'
+        progetto.save()
+        Task.objects.create(titolo='Fatturazione elettronica', descrizione='Invio delle fatture',
+                            progetto=progetto, autore=user_proprietario)
+        Task.objects.create(titolo='Report mensile', descrizione='Riepilogo della fatturazione',
+                            progetto=progetto, autore=user_proprietario)
+        Task.objects.create(titolo='Logo', progetto=progetto, autore=user_proprietario)
+        privato = Progetto.objects.create(nome='Fatturazione privata', proprietario=user_estraneo)
+        Task.objects.create(titolo='Fatturazione riservata', progetto=privato, autore=user_estraneo)
+
+    def cerca(self, client, parametri):
+        response = client.get(reverse('search') + parametri)
+        assert response.status_code == status.HTTP_200_OK
+        return response.data
+
+    @pytest.mark.positivo
+    def test_ricerca_ordinata_per_rilevanza(self, client_collaboratore, progetto, dati):
+        risultati = self.cerca(client_collaboratore, '?q=fatturazione')
+        assert [p['id'] for p in risultati['progetti']] == [progetto.id]
+        # Il termine nel titolo pesa più del termine nella descrizione
+        assert [t['titolo'] for t in risultati['task']] == ['Fatturazione elettronica', 'Report mensile']
+
+    @pytest.mark.positivo
+    def test_tutti_i_termini_e_prefissi(self, client_collaboratore, dati):
+        risultati = self.cerca(client_collaboratore, '?q=fattur invio&tipo=task')
+        assert 'progetti' not in risultati
+        assert [t['titolo'] for t in risultati['task']] == ['Fatturazione elettronica']
+
+    @pytest.mark.positivo
+    def test_indice_aggiornato_da_modifiche_ed_eliminazioni(self, client_collaboratore, progetto, dati):
+        Task.objects.filter(titolo='Logo').update(titolo='Logo per la fatturazione')
+        Task.objects.filter(titolo='Report mensile').delete()
+        risultati = self.cerca(client_collaboratore, '?q=fatturazione&tipo=task')
+        assert sorted(t['titolo'] for t in risultati['task']) == [
+            'Fatturazione elettronica', 'Logo per la fatturazione'
+        ]
+
+    @pytest.mark.positivo
+    def test_sintassi_speciale_ignorata(self, client_collaboratore, dati):
+        risultati = self.cerca(client_collaboratore, '?q="fatturazione*(&limite=1')
+        assert len(risultati['task']) == 1
+
+    @pytest.mark.negativo
+    def test_progetti_non_accessibili_esclusi(self, client_estraneo, dati):
+        risultati = self.cerca(client_estraneo, '?q=fatturazione')
+        assert [p['nome'] for p in risultati['progetti']] == ['Fatturazione privata']
+        assert [t['titolo'] for t in risultati['task']] == ['Fatturazione riservata']
+
+    @pytest.mark.negativo
+    @pytest.mark.parametrize('parametri', ['', '?q=', '?q=test&tipo=utenti', '?q=test&limite=0'])
+    def test_parametri_non_validi(self, client_collaboratore, parametri):
+        response = client_collaboratore.get(reverse('search') + parametri)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
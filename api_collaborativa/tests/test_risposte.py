@@ -0,0 +1,127 @@
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from progetti import risposte
+from progetti.models import Progetto, Task
+
+
+def conta_query(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    return response, len(queries.captured_queries)
+
+
+@pytest.mark.django_db
+class TestCacheRisposte:
+    """
+    Test della cache delle risposte di lista progetti e statistiche.
+    """
+
+    @pytest.mark.positivo
+    @pytest.mark.parametrize('url_name', ['projects-list', 'projects-stats'])
+    def test_seconda_richiesta_dalla_cache(self, client_collaboratore, progetto, task, url_name):
+        url = reverse(url_name, args=[progetto.id] if url_name == 'projects-stats' else [])
+        hit = risposte.metriche()['hit']
+        prima, query_prima = conta_query(client_collaboratore, url)
+        seconda, query_seconda = conta_query(client_collaboratore, url)
+        assert seconda.content == prima.content
+        assert query_seconda < query_prima
+        assert risposte.metriche()['hit'] == hit + 1
+
+    @pytest.mark.positivo
+    def test_scrittura_task_invalida(self, client_collaboratore, progetto, task):
+        url_lista, url_stats = reverse('projects-list'), reverse('projects-stats', args=[progetto.id])
+        client_collaboratore.get(url_lista), client_collaboratore.get(url_stats)
+
+        response = client_collaboratore.patch(reverse('tasks-detail', args=[task.id]), {'stato': 'DONE'})
+        assert response.status_code == status.HTTP_200_OK
+        assert client_collaboratore.get(url_lista).data['results'][0]['done_tasks'] == 1
+        assert client_collaboratore.get(url_stats).data['done_tasks'] == 1
+
+        # Scritture massive senza segnali dei modelli
+        Task.objects.filter(pk=task.pk).update(stato='TODO')
+        assert client_collaboratore.get(url_lista).data['results'][0]['done_tasks'] == 0
+        Task.objects.filter(pk=task.pk).delete()
+        assert client_collaboratore.get(url_stats).data['task_totali'] == 0
+
+    @pytest.mark.negativo
+    def test_scrittura_in_un_altro_processo(self, client_collaboratore, progetto, task, monkeypatch):
+        # Cache locale delle risposte di un altro processo; le versioni sono nella cache condivisa
+        altro_processo = LocMemCache('altro_processo_risposte', {})
+        altro_processo.clear()
+        url = reverse('projects-list')
+        with monkeypatch.context() as m:
+            m.setattr(risposte, '_cache', lambda: altro_processo)
+            assert client_collaboratore.get(url).data['results'][0]['nome'] == progetto.nome
+
+        progetto.nome = 'Rinominato'
+        progetto.save()
+
+        monkeypatch.setattr(risposte, '_cache', lambda: altro_processo)
+        assert client_collaboratore.get(url).data['results'][0]['nome'] == 'Rinominato'
+
+    @pytest.mark.positivo
+    def test_modifica_progetto_e_utenti_invalida(self, client_collaboratore, progetto, user_proprietario):
+        url = reverse('projects-list')
+        client_collaboratore.get(url)
+
+        progetto.nome = 'Rinominato'
+        progetto.save()
+        assert client_collaboratore.get(url).data['results'][0]['nome'] == 'Rinominato'
+
+        user_proprietario.email = 'nuova@example.com'
+        user_proprietario.save()
+        assert client_collaboratore.get(url).data['results'][0]['proprietario']['email'] == 'nuova@example.com'
+
+    @pytest.mark.positivo
+    def test_nuovo_progetto_nella_lista(self, client_collaboratore, progetto, user_proprietario, user_collaboratore):
+        url = reverse('projects-list')
+        assert client_collaboratore.get(url).data['count'] == 1
+        nuovo = Progetto.objects.create(nome='Nuovo', proprietario=user_proprietario)
+        nuovo.collaboratori.add(user_collaboratore)
+        assert client_collaboratore.get(url).data['count'] == 2
+
+    @pytest.mark.positivo
+    def test_chiave_per_utente_e_parametri(self, client_proprietario, client_collaboratore, progetto):
+        url = reverse('projects-list')
+        client_proprietario.get(url)
+        miss = risposte.metriche()['miss']
+        client_collaboratore.get(url)
+        client_collaboratore.get(url + '?fields=id')
+        assert risposte.metriche()['miss'] == miss + 2
+        assert list(client_collaboratore.get(url + '?fields=id').data['results'][0]) == ['id']
+
+    @pytest.mark.negativo
+    def test_collaboratore_rimosso(self, client_collaboratore, progetto, user_collaboratore):
+        url = reverse('projects-stats', args=[progetto.id])
+        assert client_collaboratore.get(url).status_code == status.HTTP_200_OK
+        progetto.collaboratori.remove(user_collaboratore)
+        assert client_collaboratore.get(url).status_code == status.HTTP_404_NOT_FOUND
+        assert client_collaboratore.get(reverse('projects-list')).data['count'] == 0
+
+    @pytest.mark.negativo
+    def test_utente_eliminato(self, client_proprietario, progetto, user_collaboratore):
+        url = reverse('projects-list')
+        client_proprietario.get(url)
+        user_collaboratore.delete()
+        assert client_proprietario.get(url).data['results'][0]['collaboratori'] == []
+
+    @pytest.mark.negativo
+    def test_cache_disattivata(self, client_collaboratore, progetto, settings):
+        settings.RISPOSTE_CACHE_TIMEOUT = 0
+        miss = risposte.metriche()['miss']
+        client_collaboratore.get(reverse('projects-list'))
+        assert risposte.metriche()['miss'] == miss
+
+    @pytest.mark.positivo
+    def test_metriche(self, client_proprietario, user_proprietario):
+        user_proprietario.is_staff = True
+        user_proprietario.save()
+        response = client_proprietario.get(reverse('metrics'))
+        assert response.status_code == status.HTTP_200_OK
+        assert {'hit', 'miss', 'invalidazioni', 'hit_ratio'} <= set(response.data['risposte'])
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from progetti.models import Progetto, Task
+from progetti.pagination import OptionalKeysetPagination
+
+
+@pytest.mark.django_db
+class TestTaskInRitardo:
+    """
+    Test del ritardo calcolato dal database e degli endpoint dei task in ritardo.
+    """
+
+    @pytest.fixture
+    def tasks(self, progetto, user_proprietario):
+        adesso = timezone.now()
+        altro = Progetto.objects.create(nome='Altro', proprietario=user_proprietario)
+        return Task.objects.bulk_create([
+            Task(titolo='Molto in ritardo', progetto=progetto, autore=user_proprietario,
+                 stato='IN_PROGRESS', scadenza=adesso - timedelta(days=5)),
+            Task(titolo='In ritardo', progetto=altro, autore=user_proprietario,
+                 stato='TODO', scadenza=adesso - timedelta(days=1)),
+            Task(titolo='Completato', progetto=progetto, autore=user_proprietario,
+                 stato='DONE', scadenza=adesso - timedelta(days=2)),
+            Task(titolo='Futuro', progetto=progetto, autore=user_proprietario,
+                 stato='TODO', scadenza=adesso + timedelta(days=2)),
+            Task(titolo='Senza scadenza', progetto=progetto, autore=user_proprietario, stato='TODO'),
+        ])
+
+    @pytest.mark.positivo
+    def test_annotazione_coincide_con_check_ritardo(self, tasks):
+        for task in Task.objects.con_ritardo():
+            assert task.in_ritardo == task.check_ritardo()
+
+    @pytest.mark.positivo
+    def test_overdue_di_tutti_i_progetti(self, client_proprietario, tasks):
+        response = client_proprietario.get(reverse('tasks-overdue'))
+        assert response.status_code == status.HTTP_200_OK
+        assert [t['titolo'] for t in response.data['results']] == ['Molto in ritardo', 'In ritardo']
+        assert all(t['check_ritardo'] for t in response.data['results'])
+
+    @pytest.mark.positivo
+    def test_overdue_del_progetto(self, client_collaboratore, progetto, tasks):
+        response = client_collaboratore.get(reverse('projects-overdue', args=[progetto.id]))
+        assert response.status_code == status.HTTP_200_OK
+        assert [t['titolo'] for t in response.data] == ['Molto in ritardo']
+
+    @pytest.mark.positivo
+    @pytest.mark.parametrize('url_name, parametri', [
+        ('tasks-overdue', '?cursor='),
+        ('tasks-overdue', '?cursor=&fields=id'),
+        ('projects-overdue', '?cursor='),
+    ])
+    def test_overdue_cursor_per_scadenza(self, client_proprietario, progetto, user_proprietario,
+                                         monkeypatch, url_name, parametri):
+        monkeypatch.setattr(OptionalKeysetPagination, 'page_size', 2)
+        adesso = timezone.now()
+        # Creati dal più vecchio per scadenza: l'ordinamento di default delle liste è l'opposto
+        Task.objects.bulk_create([
+            Task(titolo=f'Task {i}', progetto=progetto, autore=user_proprietario,
+                 scadenza=adesso - timedelta(days=6 - i))
+            for i in range(1, 6)
+        ])
+        args = [progetto.id] if url_name == 'projects-overdue' else []
+        url = reverse(url_name, args=args) + parametri
+        ids = []
+        while url:
+            response = client_proprietario.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            ids.extend(t['id'] for t in response.data['results'])
+            url = response.data['next']
+        assert ids == list(Task.objects.in_ritardo().order_by('scadenza', 'id').values_list('id', flat=True))
+
+    @pytest.mark.positivo
+    def test_lista_senza_calcolo_in_python(self, client_proprietario, tasks, monkeypatch):
+        monkeypatch.setattr(Task, 'check_ritardo', lambda self: pytest.fail('check_ritardo chiamato'))
+        response = client_proprietario.get(reverse('tasks-list'))
+        assert response.status_code == status.HTTP_200_OK
+        ritardi = {t['titolo']: t['check_ritardo'] for t in response.data['results']}
+        assert ritardi == {
+            'Molto in ritardo': True, 'In ritardo': True, 'Completato': False,
+            'Futuro': False, 'Senza scadenza': False,
+        }
+
+    @pytest.mark.positivo
+    def test_completamento_aggiorna_check_ritardo(self, client_proprietario, tasks):
+        url = reverse('tasks-detail', args=[tasks[0].id])
+        response = client_proprietario.patch(url, {'stato': 'DONE'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['check_ritardo'] is False
+
+    @pytest.mark.positivo
+    def test_indice_parziale_usato(self, tasks):
+        piano = Task.objects.in_ritardo().order_by('scadenza', 'id').explain()
+        assert 'task_scad_aperti_idx' in piano
+
+    @pytest.mark.negativo
+    def test_overdue_progetto_estraneo(self, client_estraneo, progetto, tasks):
+        response = client_estraneo.get(reverse('projects-overdue', args=[progetto.id]))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
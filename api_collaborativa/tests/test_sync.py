@@ -0,0 +1,147 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from progetti import sync
+from progetti.models import Progetto, Rimozione, Task
+from progetti.sync import codifica_cursore
+
+
+def invecchia():
+    """Sposta nel passato le modifiche esistenti, oltre il margine della sincronizzazione"""
+    passato = timezone.now() - timedelta(hours=1)
+    Progetto.objects.update(data_aggiornamento=passato)
+    Task.objects.update(data_aggiornamento=passato)
+    Rimozione.objects.update(data=passato)
+
+
+def sincronizza(client, cursore=None):
+    parametri = {'since': cursore} if cursore else {}
+    response = client.get(reverse('changes'), parametri)
+    assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+def ids(righe):
+    return sorted(riga['id'] for riga in righe)
+
+
+@pytest.mark.django_db
+class TestSincronizzazioneIncrementale:
+    """
+    Test dell'endpoint di sincronizzazione incrementale `changes`.
+    """
+
+    @pytest.fixture
+    def iniziale(self, client_collaboratore, progetto, task, user_proprietario):
+        altro = Progetto.objects.create(nome='Altro', proprietario=user_proprietario)
+        Task.objects.create(titolo='Fuori', progetto=altro, autore=user_proprietario)
+        dati = sincronizza(client_collaboratore)
+        invecchia()
+        return dati
+
+    @pytest.mark.positivo
+    def test_sincronizzazione_completa(self, iniziale, progetto, task):
+        assert ids(iniziale['progetti']) == [progetto.id]
+        assert ids(iniziale['task']) == [task.id]
+        assert iniziale['rimozioni'] == {'progetti': [], 'task': []}
+        assert iniziale['completo'] is True
+
+    @pytest.mark.positivo
+    def test_solo_modifiche_e_task_eliminati(self, client_collaboratore, iniziale, progetto, task,
+                                             user_proprietario):
+        assert sincronizza(client_collaboratore, iniziale['cursor'])['task'] == []
+
+        task.titolo = 'Modificato'
+        task.save()
+        nuovo = Task.objects.create(titolo='Nuovo', progetto=progetto, autore=user_proprietario)
+        eliminato = Task.objects.create(titolo='Temporaneo', progetto=progetto, autore=user_proprietario)
+        eliminato_id = eliminato.id
+        eliminato.delete()
+
+        dati = sincronizza(client_collaboratore, iniziale['cursor'])
+        assert ids(dati['task']) == sorted([task.id, nuovo.id])
+        assert dati['rimozioni'] == {'progetti': [], 'task': [eliminato_id]}
+        # I contatori del progetto sono cambiati: il progetto è inviato di nuovo
+        assert ids(dati['progetti']) == [progetto.id]
+        assert dati['progetti'][0]['task_totali'] == 2
+
+    @pytest.mark.positivo
+    def test_contatori_aggiornati(self, client_collaboratore, iniziale, progetto, task):
+        # Cambio di stato massivo: aggiorna i contatori senza salvare il progetto
+        Task.objects.filter(pk=task.pk).update(stato='DONE')
+        dati = sincronizza(client_collaboratore, iniziale['cursor'])
+        assert ids(dati['progetti']) == [progetto.id]
+        assert dati['progetti'][0]['done_tasks'] == 1
+
+    @pytest.mark.positivo
+    def test_task_spostato_in_progetto_non_accessibile(self, client_collaboratore, iniziale, task):
+        altro = Progetto.objects.get(nome='Altro')
+        Task.objects.filter(pk=task.pk).update(progetto=altro)
+        dati = sincronizza(client_collaboratore, iniziale['cursor'])
+        assert dati['rimozioni']['task'] == [task.id]
+
+    @pytest.mark.positivo
+    def test_perdita_e_ripristino_accesso(self, client_collaboratore, iniziale, progetto, user_collaboratore):
+        progetto.collaboratori.remove(user_collaboratore)
+        dati = sincronizza(client_collaboratore, iniziale['cursor'])
+        assert dati['rimozioni'] == {'progetti': [progetto.id], 'task': []}
+
+        progetto.collaboratori.add(user_collaboratore)
+        dati = sincronizza(client_collaboratore, iniziale['cursor'])
+        assert dati['rimozioni'] == {'progetti': [], 'task': []}
+        assert ids(dati['progetti']) == [progetto.id]
+
+    @pytest.mark.positivo
+    def test_progetto_eliminato(self, client_collaboratore, iniziale, progetto):
+        progetto_id = progetto.id
+        progetto.delete()
+        dati = sincronizza(client_collaboratore, iniziale['cursor'])
+        assert dati['rimozioni'] == {'progetti': [progetto_id], 'task': []}
+
+    @pytest.mark.positivo
+    def test_pagine_successive(self, client_collaboratore, progetto, user_proprietario, monkeypatch):
+        monkeypatch.setattr(sync, 'SYNC_LIMITE', 2)
+        Task.objects.bulk_create([
+            Task(titolo=f'Task {i}', progetto=progetto, autore=user_proprietario) for i in range(5)
+        ])
+        invecchia()
+
+        ricevuti, cursore, completo = [], None, False
+        while not completo:
+            dati = sincronizza(client_collaboratore, cursore)
+            ricevuti += ids(dati['task'])
+            cursore, completo = dati['cursor'], dati['completo']
+        assert sorted(ricevuti) == list(progetto.tasks.order_by('pk').values_list('pk', flat=True))
+
+    @pytest.mark.positivo
+    def test_modifiche_recenti_inviate_di_nuovo(self, client_collaboratore, task):
+        """Le righe entro il margine sono ripetute: un commit in ritardo non va perso"""
+        cursore = sincronizza(client_collaboratore)['cursor']
+        assert ids(sincronizza(client_collaboratore, cursore)['task']) == [task.id]
+
+    @pytest.mark.positivo
+    def test_numero_di_query(self, client_collaboratore, iniziale, django_assert_max_num_queries):
+        with django_assert_max_num_queries(6):
+            sincronizza(client_collaboratore, iniziale['cursor'])
+
+    @pytest.mark.negativo
+    @pytest.mark.parametrize('cursore', ['non-valido', codifica_cursore({})])
+    def test_cursore_non_valido(self, client_collaboratore, cursore):
+        response = client_collaboratore.get(reverse('changes'), {'since': cursore})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.negativo
+    def test_cursore_scaduto(self, client_collaboratore, settings):
+        passato = (timezone.now() - timedelta(days=settings.RIMOZIONI_GIORNI + 1), 0)
+        cursore = codifica_cursore({flusso: passato for flusso in sync.FLUSSI})
+        response = client_collaboratore.get(reverse('changes'), {'since': cursore})
+        assert response.status_code == status.HTTP_410_GONE
+
+    @pytest.mark.negativo
+    def test_autenticazione_richiesta(self, api_client):
+        response = api_client.get(reverse('changes'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,144 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from autenticazione import blacklist
+from autenticazione.blacklist import FiltroBloom
+from autenticazione.tokens import RefreshToken
+
+
+def refresh(api_client, token):
+    return api_client.post(reverse('token_refresh'), {'refresh': token})
+
+
+class TestFiltroBloom:
+    """
+    Test del filtro di Bloom usato per la blacklist.
+    """
+
+    @pytest.mark.positivo
+    def test_nessun_falso_negativo(self):
+        filtro = FiltroBloom(1000)
+        valori = [f'jti-{i}' for i in range(1000)]
+        for valore in valori:
+            filtro.aggiungi(valore)
+        assert all(valore in filtro for valore in valori)
+        falsi_positivi = sum(f'altro-{i}' in filtro for i in range(10000))
+        assert falsi_positivi < 300
+
+
+@pytest.mark.django_db
+class TestBlacklistToken:
+    """
+    Test della verifica della blacklist dei refresh token con il filtro in memoria.
+    """
+
+    @pytest.fixture(autouse=True)
+    def filtro_attivo(self, settings):
+        settings.BLACKLIST_FILTRO_DURATA = 30
+
+    @pytest.mark.positivo
+    def test_token_non_revocato_senza_query(self, user_proprietario, django_assert_num_queries):
+        token = RefreshToken.for_user(user_proprietario)
+        blacklist.forse_revocato('riscaldamento')
+        with django_assert_num_queries(0):
+            RefreshToken(str(token))
+
+    @pytest.mark.negativo
+    def test_token_ruotato_rifiutato(self, api_client, user_proprietario):
+        token = str(RefreshToken.for_user(user_proprietario))
+        assert refresh(api_client, token).status_code == status.HTTP_200_OK
+        assert refresh(api_client, token).status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.negativo
+    def test_token_dopo_logout_rifiutato(self, client_proprietario, api_client, user_proprietario):
+        token = str(RefreshToken.for_user(user_proprietario))
+        blacklist.forse_revocato('riscaldamento')
+        response = client_proprietario.post(reverse('logout'), {'refresh': token})
+        assert response.status_code == status.HTTP_200_OK
+        assert refresh(api_client, token).status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.negativo
+    def test_revoca_da_altro_processo(self, api_client, user_proprietario, django_capture_on_commit_callbacks):
+        """Revoca scritta senza passare dal processo: il cambio di versione aggiorna il filtro"""
+        token = RefreshToken.for_user(user_proprietario)
+        blacklist.forse_revocato('riscaldamento')
+        outstanding = OutstandingToken.objects.get(jti=token['jti'])
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=outstanding)])
+        with django_capture_on_commit_callbacks(execute=True):
+            blacklist.registra_revoca('altro')
+        assert refresh(api_client, str(token)).status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.positivo
+    def test_versione_nella_cache_condivisa(self, django_capture_on_commit_callbacks):
+        versione = blacklist._versione()
+        assert caches['condivisa'].get(blacklist._chiave_versione()) == versione
+        with django_capture_on_commit_callbacks(execute=True):
+            blacklist.registra_revoca('revocato')
+        # Gli altri processi leggono la nuova versione dalla cache condivisa
+        assert caches['condivisa'].get(blacklist._chiave_versione()) not in (None, versione)
+
+    @pytest.mark.positivo
+    def test_ricostruzione_fuori_dal_lock(self, monkeypatch):
+        ricostruisci = blacklist._ricostruisci
+        in_corso, sblocca = threading.Event(), threading.Event()
+
+        def lenta(versione):
+            if not in_corso.is_set():
+                in_corso.set()
+                sblocca.wait(5)
+            return ricostruisci(versione)
+
+        def verifica():
+            esiti.append(blacklist.forse_revocato('secondo'))
+
+        monkeypatch.setattr(blacklist, '_ricostruisci', lenta)
+        esiti = []
+        thread = threading.Thread(target=blacklist.forse_revocato, args=('primo',))
+        thread.start()
+        try:
+            assert in_corso.wait(5)
+            # Mentre un thread ricostruisce il filtro, le verifiche degli altri non attendono
+            altro = threading.Thread(target=verifica)
+            altro.start()
+            altro.join(1)
+            assert esiti == [False]
+        finally:
+            sblocca.set()
+            thread.join()
+
+    @pytest.mark.negativo
+    def test_filtro_disattivato(self, user_proprietario, settings, django_assert_num_queries):
+        settings.BLACKLIST_FILTRO_DURATA = 0
+        token = RefreshToken.for_user(user_proprietario)
+        with django_assert_num_queries(1):
+            RefreshToken(str(token))
+
+
+@pytest.mark.django_db
+class TestCompattazioneToken:
+    """
+    Test del comando `compatta_token`.
+    """
+
+    @pytest.mark.positivo
+    def test_elimina_solo_i_token_scaduti(self, user_proprietario):
+        adesso = timezone.now()
+        token = OutstandingToken.objects.bulk_create([
+            OutstandingToken(jti=f'jti-{i}', token='t', user=user_proprietario,
+                             expires_at=adesso + timedelta(days=-1 if i < 5 else 1))
+            for i in range(8)
+        ])
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=t) for t in token[3:6]])
+
+        call_command('compatta_token', blocco=2)
+
+        assert sorted(OutstandingToken.objects.values_list('jti', flat=True)) == ['jti-5', 'jti-6', 'jti-7']
+        assert list(BlacklistedToken.objects.values_list('token__jti', flat=True)) == ['jti-5']
@@ -0,0 +1,79 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from autenticazione.authentication import CachedUserJWTAuthentication
+
+
+def autentica(user, token=None):
+    """Autentica una request con il token JWT dell'utente"""
+    token = token or RefreshToken.for_user(user).access_token
+    request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    return CachedUserJWTAuthentication().authenticate(request)[0]
+
+
+@pytest.mark.django_db
+class TestCacheUtenti:
+    """
+    Test dell'autenticazione JWT con la cache degli utenti.
+    """
+
+    @pytest.mark.positivo
+    def test_nessuna_query_con_utente_in_cache(self, user_proprietario, django_assert_num_queries):
+        token = RefreshToken.for_user(user_proprietario).access_token
+        with django_assert_num_queries(1):
+            autentica(user_proprietario, token)
+        with django_assert_num_queries(0):
+            utente = autentica(user_proprietario, token)
+        assert utente == user_proprietario
+        assert (utente.username, utente.is_active) == ('owner', True)
+
+    @pytest.mark.positivo
+    def test_invalidazione_su_modifica(self, user_proprietario):
+        autentica(user_proprietario)
+        user_proprietario.email = 'nuova@example.com'
+        user_proprietario.save()
+        assert autentica(user_proprietario).email == 'nuova@example.com'
+
+    @pytest.mark.positivo
+    def test_cache_disabilitata(self, user_proprietario, settings, django_assert_num_queries):
+        settings.UTENTI_CACHE_TIMEOUT = 0
+        token = RefreshToken.for_user(user_proprietario).access_token
+        autentica(user_proprietario, token)
+        with django_assert_num_queries(1):
+            autentica(user_proprietario, token)
+
+    @pytest.mark.positivo
+    def test_profilo_senza_query(self, client_proprietario, user_proprietario, django_assert_num_queries):
+        client_proprietario.get(reverse('profile'))
+        with django_assert_num_queries(0):
+            response = client_proprietario.get(reverse('profile'))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['date_joined'] is not None
+
+    @pytest.mark.positivo
+    def test_proprietario_del_progetto_creato(self, client_proprietario, user_proprietario):
+        user_proprietario.email = 'owner@example.com'
+        user_proprietario.save()
+        response = client_proprietario.post(reverse('projects-list'), {'nome': 'Nuovo'})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['proprietario']['email'] == 'owner@example.com'
+
+    @pytest.mark.negativo
+    def test_utente_disattivato(self, client_proprietario, user_proprietario):
+        assert client_proprietario.get(reverse('projects-list')).status_code == status.HTTP_200_OK
+        user_proprietario.is_active = False
+        user_proprietario.save()
+        response = client_proprietario.get(reverse('projects-list'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.negativo
+    def test_utente_eliminato(self, client_estraneo, user_estraneo):
+        assert client_estraneo.get(reverse('projects-list')).status_code == status.HTTP_200_OK
+        user_estraneo.delete()
+        assert client_estraneo.get(reverse('projects-list')).status_code == status.HTTP_401_UNAUTHORIZED
+        # Anche la view asincrona degli eventi legge l'utente dalla cache
+        response = client_estraneo.get(reverse('projects-events', args=[1]))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED